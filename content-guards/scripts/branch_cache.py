@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Cache of a repository's branch refs, shared by all its worktrees.
+
+Linked worktrees share one ref store, so what ref_store reads is cached
+once per git common directory: the branch names in packed-refs, and the
+loose ref files of every directory under refs/heads and refs/remotes.
+
+Each part is validated by stat alone. Creating, deleting or updating a
+loose ref renames a file inside its directory and so moves that
+directory's mtime; packing or deleting a packed ref rewrites packed-refs.
+A check therefore costs one stat per ref directory, and only what changed
+is read again: after `git checkout -b feat/x` in any worktree, the next
+check relists refs/heads/feat alone, not every branch in the repository.
+
+Like git's racy-index check, a directory (or packed-refs) modified within
+RACY_SECONDS of being read is not trusted on the next check, since a
+second change in the same filesystem timestamp tick would not move its
+mtime.
+"""
+
+import os
+import time
+from pathlib import Path
+
+from guard_state import content_hash, load_json, locked, save_json, state_path
+from ref_store import HEADS, REMOTES, packed_refs, split_refs, uses_reftable
+
+RACY_SECONDS = 1.0
+
+
+def _cache_path(common_dir: Path) -> Path:
+    return state_path("branch-refs", f"{content_hash(str(common_dir))[:24]}.json")
+
+
+def _mtime(path: Path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return -1
+
+
+def _trusted(mtime: int, cached: object, read_at: float) -> bool:
+    return (
+        isinstance(cached, dict)
+        and cached.get("mtime") == mtime
+        and read_at - mtime / 1e9 >= RACY_SECONDS
+    )
+
+
+def _scan(common_dir: Path, rel: str, mtime: int) -> dict:
+    """Loose refs and subdirectories of one ref directory."""
+    refs, subdirs = [], []
+    if mtime >= 0:
+        with os.scandir(common_dir / rel) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    subdirs.append(f"{rel}/{entry.name}")
+                elif not entry.name.endswith(".lock"):
+                    refs.append(f"{rel}/{entry.name}")
+    return {"mtime": mtime, "refs": sorted(refs), "subdirs": sorted(subdirs)}
+
+
+def _refresh(common_dir: Path, entry: dict) -> tuple[dict, int]:
+    """
+    Bring entry up to date, rereading only the parts whose mtime moved.
+    Returns the new entry and how many parts were reread.
+    """
+    read_at = entry.get("read_at", 0.0)
+    now = time.time()
+    reread = 0
+
+    packed = entry.get("packed")
+    mtime = _mtime(common_dir / "packed-refs")
+    if not _trusted(mtime, packed, read_at):
+        # Stat before reading: a change made meanwhile leaves the mtime stale
+        names = [r for r in packed_refs(common_dir) if r.startswith((HEADS, REMOTES))]
+        packed = {"mtime": mtime, "refs": names}
+        reread += 1
+
+    old_dirs = entry.get("dirs") if isinstance(entry.get("dirs"), dict) else {}
+    dirs: dict[str, dict] = {}
+    queue = [HEADS.rstrip("/"), REMOTES.rstrip("/")]
+    while queue:
+        rel = queue.pop()
+        mtime = _mtime(common_dir / rel)
+        cached = old_dirs.get(rel)
+        if not _trusted(mtime, cached, read_at):
+            cached = _scan(common_dir, rel, mtime)
+            reread += 1
+        dirs[rel] = cached
+        queue.extend(cached["subdirs"])
+
+    return {"read_at": now, "packed": packed, "dirs": dirs}, reread
+
+
+def cached_branch_refs(common_dir: Path) -> tuple[set[str], set[str]] | None:
+    """
+    Local and remote branch names as ref_store.read_branch_refs returns
+    them, served from the cache and refreshed incrementally.
+    """
+    if uses_reftable(common_dir) or not (common_dir / "refs").is_dir():
+        return None
+    path = _cache_path(common_dir)
+    with locked(path):  # One refresh at a time; the others reuse its result
+        entry = load_json(path, {})
+        try:
+            entry, reread = _refresh(common_dir, entry if isinstance(entry, dict) else {})
+        except (OSError, KeyError, TypeError, AttributeError):
+            try:
+                entry, reread = _refresh(common_dir, {})  # Corrupt entry: start over
+            except OSError:
+                return None
+        if reread:
+            save_json(path, entry)
+    refs = list(entry["packed"]["refs"])
+    for part in entry["dirs"].values():
+        refs.extend(part["refs"])
+    return split_refs(refs)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Shared upward config discovery for the content validators.
+
+The validators and limiters each look for their own config file by walking
+up from a directory (.token-limits.yaml, .readme-validator.yaml,
+.issue-limits.yaml, .url-policy.yaml, .markdownlint*). This module holds
+that walk, so every validator follows the same rules.
+
+Lookups are plain in-process walks: one stat per ancestor for a named
+config, one directory listing per ancestor for the .markdownlint* prefix.
+Nothing is persisted; a shared on-disk memo of directory listings cost more
+to load and rewrite in every hook process than the walk it saved.
+"""
+
+import os
+
+
+def _ancestors(start: str, max_levels: int | None = None):
+    """Directories from start upward to the root (or max_levels of them)."""
+    current = os.path.abspath(start)
+    levels = 0
+    while max_levels is None or levels < max_levels:
+        yield current
+        levels += 1
+        parent = os.path.dirname(current)
+        if parent == current:
+            return
+        current = parent
+
+
+def find_config(name: str, start: str, max_levels: int = 10) -> str | None:
+    """Nearest start-or-ancestor path of config file name, within max_levels."""
+    for directory in _ancestors(start, max_levels):
+        candidate = os.path.join(directory, name)
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def _has_markdownlint_config(directory: str) -> bool:
+    try:
+        with os.scandir(directory) as it:
+            return any(e.name.startswith(".markdownlint") for e in it)
+    except OSError:
+        return False
+
+
+def find_markdownlint_dir(start: str, home: str | None = None) -> str | None:
+    """
+    Nearest project directory containing a .markdownlint* config, or None.
+    Stops before $HOME and /, and at the first directory that contains .git
+    (after checking it), matching validate-markdown.sh's rules.
+    """
+    home = home if home is not None else os.environ.get("HOME", "")
+    home = os.path.abspath(home) if home else ""
+    for directory in _ancestors(start):
+        # $HOME and / are user/system scope, not project scope
+        if directory == home or directory == "/":
+            return None
+        if _has_markdownlint_config(directory):
+            return directory
+        if os.path.lexists(os.path.join(directory, ".git")):  # Stop at project root
+            return None
+    return None
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Local append-only ledger of issue/PR creations for the 24h rate limit.
+
+One ledger per repository and resource type holds creation times as
+fixed-width records ("%010d\\n", epoch seconds) in ascending order, so the
+number of creations in the sliding window is found by binary search over
+the file: O(log n) reads, and the file never needs to be parsed whole.
+
+record-gh-create.py appends a record after every successful create. The
+network is only consulted to reconcile: on a cold start (no ledger) and
+then every RECONCILE_SECONDS, enforce-issue-limits.py asks GitHub for the
+caller's recent creations and the ledger is rewritten from them, which also
+picks up items created outside the hooks and drops expired records.
+"""
+
+import os
+import time
+from datetime import datetime
+
+from guard_state import content_hash, load_json, locked, save_json, state_path
+
+RECORD = 11  # ten digits and a newline
+RECONCILE_SECONDS = 3600
+# Local records this close to the newest server-side creation are assumed
+# to be that creation (recorded a moment after gh returned); later ones are
+# kept, since search results may not include very recent items yet.
+SKEW_SECONDS = 60
+
+
+def parse_time(stamp: str) -> int:
+    """Epoch seconds of a GitHub ISO 8601 timestamp."""
+    return int(datetime.fromisoformat(stamp.replace("Z", "+00:00")).timestamp())
+
+
+class CreationLedger:
+    """Creation times of one resource type in one repository."""
+
+    def __init__(self, key: str, resource: str) -> None:
+        base = f"{content_hash(key)[:24]}-{resource}"
+        self.path = state_path("ledger", base + ".log")
+        self._meta = state_path("ledger", base + ".json")
+
+    def needs_reconcile(self, now: float | None = None) -> bool:
+        """True on a cold start and once the last reconcile is too old."""
+        meta = load_json(self._meta, {})
+        reconciled = meta.get("reconciled_at", 0) if isinstance(meta, dict) else 0
+        return not self.path.exists() or (now or time.time()) - reconciled >= RECONCILE_SECONDS
+
+    def count_since(self, start: float) -> int:
+        """Number of records at or after start (epoch seconds)."""
+        try:
+            with open(self.path, "rb") as f:
+                n = os.fstat(f.fileno()).st_size // RECORD  # Ignore a torn tail
+                lo, hi = 0, n
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    f.seek(mid * RECORD)
+                    if int(f.read(RECORD - 1)) < start:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                return n - lo
+        except (OSError, ValueError):
+            return 0
+
+    def _last(self) -> int:
+        try:
+            with open(self.path, "rb") as f:
+                n = os.fstat(f.fileno()).st_size // RECORD
+                if not n:
+                    return 0
+                f.seek((n - 1) * RECORD)
+                return int(f.read(RECORD - 1))
+        except (OSError, ValueError):
+            return 0
+
+    def append(self, when: float | None = None) -> None:
+        """Record one creation (kept monotonic so the file stays sorted)."""
+        with locked(self.path):
+            stamp = max(int(when or time.time()), self._last())
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "ab") as f:
+                    f.truncate(f.tell() - f.tell() % RECORD)
+                    f.write(b"%010d\n" % stamp)
+            except OSError:
+                pass
+
+    def reconcile(self, server_times: list[int], count: int, window_start: float) -> None:
+        """
+        Rewrite the ledger from the server's view of the window.
+
+        count is the server's exact total, which may exceed the times it
+        returned; missing entries are filled in with the oldest known time.
+        """
+        times = sorted(t for t in server_times if t >= window_start)
+        if count > len(server_times):
+            times = [times[0] if times else int(time.time())] * (count - len(server_times)) + times
+        newest = max(server_times, default=0)
+        with locked(self.path):
+            try:
+                data = self.path.read_bytes()
+                local = [
+                    int(data[i:i + RECORD - 1])
+                    for i in range(0, len(data) - RECORD + 1, RECORD)
+                ]
+            except (OSError, ValueError):
+                local = []
+            times += [t for t in local if t > newest + SKEW_SECONDS and t >= window_start]
+            body = b"".join(b"%010d\n" % t for t in sorted(times))
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                tmp.write_bytes(body)
+                os.replace(tmp, self.path)
+            except OSError:
+                return
+        save_json(self._meta, {"reconciled_at": time.time()})
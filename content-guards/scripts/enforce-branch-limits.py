@@ -12,6 +12,11 @@ Trigger commands:
 
 Limit: 100 total unique branches (local + remote deduplicated)
 
+Branches are read from the ref store (packed-refs plus loose refs) without
+spawning git, through a cache shared by every worktree of the repository
+that only rereads the ref directories that changed (see branch_cache.py).
+Repos on the reftable backend fall back to `git branch`.
+
 Exit codes:
   0 = allow the command
   2 = block the command (shows stderr to Claude)
@@ -20,9 +25,17 @@ Input: JSON from stdin with tool_input.command containing the Bash command
 """
 
 import json
+import os
 import shlex
 import subprocess
 import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from branch_cache import cached_branch_refs  # noqa: E402
+from ref_store import unique_branches  # noqa: E402
+from stale_branches import analyze, format_plan  # noqa: E402
+from repo_files import find_git_common_dir  # noqa: E402
 
 BRANCH_LIMIT = 100
 
@@ -90,9 +103,10 @@ def _is_branch_create(command: str) -> bool:
     return False
 
 
-def _count_unique_branches() -> int:
-    """Count unique branches across local and remote (deduplicated)."""
-    branches: set[str] = set()
+def _count_with_git() -> int:
+    """Count unique branches by asking git (for ref stores we cannot read)."""
+    local: set[str] = set()
+    remote: set[str] = set()
 
     # Local branches
     try:
@@ -103,7 +117,7 @@ def _count_unique_branches() -> int:
         for line in result.stdout.strip().splitlines():
             name = line.strip()
             if name:
-                branches.add(name)
+                local.add(name)
     except (subprocess.SubprocessError, ValueError):
         return 0  # fail-open: no local data, cannot make a judgment
 
@@ -115,28 +129,48 @@ def _count_unique_branches() -> int:
         )
         for line in result.stdout.strip().splitlines():
             name = line.strip()
-            if not name or name.endswith("/HEAD"):
-                continue
-            # Strip remote prefix (e.g. origin/main -> main)
-            short = name.split("/", 1)[1] if "/" in name else name
-            branches.add(short)
+            if name:
+                remote.add(name)
     except (subprocess.SubprocessError, ValueError):
-        pass  # fail-open: degrade to local-only count already in branches set
+        pass  # fail-open: degrade to local-only count
+
+    return len(unique_branches(local, remote))
 
-    return len(branches)
+
+def _count_unique_branches() -> int:
+    """Count unique branches across local and remote (deduplicated)."""
+    common = None if os.environ.get("GIT_DIR") else find_git_common_dir(Path.cwd())
+    refs = cached_branch_refs(common) if common is not None else None
+    if refs is None:
+        return _count_with_git()
+    return len(unique_branches(*refs))
+
+
+def _cleanup_plan() -> str:
+    """Ranked stale-branch summary for the block message ("" when unavailable)."""
+    try:
+        plan = analyze(timeout=10)
+    except (subprocess.SubprocessError, OSError, ValueError):
+        return ""  # fail-open: fall back to the generic advice
+    return format_plan(plan) + "\n\n" if plan else ""
 
 
 def _block_branch_limit(count: int) -> None:
     """Print branch limit block message and exit with code 2."""
+    prune = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prune-stale-branches.py")
     print(
         f"\n{'=' * 64}\n"
         f"BLOCKED: Branch limit exceeded\n"
         f"{'=' * 64}\n\n"
         f"  {count}/{BRANCH_LIMIT} unique branches (limit reached).\n\n"
+        f"{_cleanup_plan()}"
         "Required actions:\n"
         "  1. Delete merged or stale branches\n"
-        "  2. Run: git branch --merged main | grep -vE '^[* ]*main$' | xargs -n 1 git branch -d\n"
-        "  3. Run: git fetch --prune\n\n"
+        "  2. Run: git fetch --prune\n"
+        f"  3. Run: {prune}\n"
+        "     (dry run: lists the branches worth deleting, changes nothing)\n\n"
+        "Ask the user before deleting remote branches. Applying the plan with\n"
+        "--apply runs `git push --delete` on every remote; that is their call.\n\n"
         f"{'=' * 64}\n",
         file=sys.stderr,
         flush=True,
@@ -14,6 +14,18 @@ Rate limits (24h rolling window):
   - 25 issues created by @me
   - 25 PRs created by @me
 
+Optional org-wide limit (.issue-limits.yaml, see org_limits.py):
+  - open AI-created issues + PRs across an org's repositories
+
+All three checks are answered by one GraphQL query (issue_snapshot.py) with
+exact counts; if that fails, the hook falls back to `gh ... list` calls.
+Snapshots are cached per repo for a minute and refreshed single-flight
+(snapshot_cache.py), so parallel sessions share one fetch. The 24h window is
+counted from a local creation ledger (creation_ledger.py), so recent
+creations are only fetched to reconcile it. Near-duplicate titles are found
+in a persisted similarity index of all open items (title_index.py) and only
+warned about; exact duplicates are blocked.
+
 Exit codes:
   0 = allow the command
   2 = block the command (shows stderr to Claude)
@@ -24,10 +36,29 @@ Input: JSON from stdin with tool_input.command containing the Bash command
 import json
 import os
 import re
-import shlex
+import sqlite3
 import subprocess
 import sys
-from datetime import datetime, timedelta, timezone
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from creation_ledger import CreationLedger, parse_time  # noqa: E402
+from gh_command import CMD_RE, extract_title  # noqa: E402
+from gh_command import extract_repo_dir as _extract_repo_dir  # noqa: E402
+from issue_snapshot import (  # noqa: E402
+    AI_LABEL,
+    TITLE_WINDOW,
+    RepoSnapshot,
+    fetch_open_page,
+    fetch_snapshot,
+    rate_window_start,
+)
+from org_limits import cached_counts, fetch_counts, load_org_limit  # noqa: E402
+from snapshot_cache import cached_snapshot, repo_key  # noqa: E402
+from title_index import TitleIndex, duplicate_threshold  # noqa: E402
 
 # Hard limits: (total_open, ai_created_open) per resource type
 HARD_LIMITS = {"issue": (100, 25), "pr": (15, 15)}
@@ -35,7 +66,8 @@ HARD_LIMITS = {"issue": (100, 25), "pr": (15, 15)}
 # 24h rolling rate limit per resource type
 RATE_LIMIT_24H = 25
 
-_CMD_RE = re.compile(r"(?:^|\s)gh\s+(issue|pr)\s+(create|edit)(?:\s|$)")
+# Shared budget for all gh lookups of one hook run, under the 30s hook timeout
+LOOKUP_DEADLINE_SECONDS = 25
 
 _GH_ERRORS = (
     OSError,
@@ -46,65 +78,76 @@ _GH_ERRORS = (
 )
 
 
-def _extract_repo_dir(command: str) -> str | None:
-    """Extract target repo directory from cd prefix in bash commands."""
-    m = re.match(r'^\s*cd\s+("(?:[^"]+)"|\'(?:[^\']+)\'|[^\s;&]+)', command)
-    if m:
-        path = m.group(1).strip("'\"")
-        path = os.path.abspath(os.path.expanduser(path))
-        if not os.path.isdir(path):
-            return None
-        return path
-    return None
+def _remaining(deadline: float | None) -> float:
+    """Seconds left before deadline (a time.monotonic() value); 30 if none."""
+    if deadline is None:
+        return 30
+    return max(deadline - time.monotonic(), 0.1)
+
+
+def _run_gh_json(args: list[str], cwd: str | None = None, deadline: float | None = None) -> Any:
+    """Run a gh command that returns JSON; raises one of _GH_ERRORS on failure."""
+    result = subprocess.run(
+        ["gh", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=_remaining(deadline),
+        cwd=cwd,
+    )
+    return json.loads(result.stdout)
+
+
+def _warn_gh_failed(error: Exception) -> None:
+    print(
+        f"Warning: gh command failed: {error}. Allowing command to proceed.",
+        file=sys.stderr,
+    )
 
 
-def _gh_json(args: list[str], cwd: str | None = None) -> list[dict]:
+def _gh_json(args: list[str], cwd: str | None = None, deadline: float | None = None) -> list[dict]:
     """Run a gh command that returns JSON, fail-open on any error."""
     try:
-        result = subprocess.run(
-            ["gh", *args],
-            capture_output=True,
-            text=True,
-            check=True,
-            timeout=30,
-            cwd=cwd,
-        )
-        return json.loads(result.stdout)
+        return _run_gh_json(args, cwd=cwd, deadline=deadline)
     except _GH_ERRORS as e:
-        print(
-            f"Warning: gh command failed: {e}. Allowing command to proceed.",
-            file=sys.stderr,
-        )
+        _warn_gh_failed(e)
         return []
 
 
-def _get_counts(resource: str, cwd: str | None = None) -> tuple[int, int]:
+def _get_counts(
+    resource: str, cwd: str | None = None, deadline: float | None = None
+) -> tuple[int, int]:
     """Count total and AI-created open items for a resource type."""
     items = _gh_json([
         resource, "list", "--state", "open",
         "--json", "number,labels", "--limit", "100",
-    ], cwd=cwd)
+    ], cwd=cwd, deadline=deadline)
     total = len(items)
     ai_created = sum(
         1 for item in items
-        if any(label["name"] == "ai-created" for label in item.get("labels", []))
+        if any(label["name"] == AI_LABEL for label in item.get("labels", []))
     )
     return total, ai_created
 
 
-def _count_recent(resource: str, cwd: str | None = None) -> int:
-    """Count items created by @me in the last 24 hours."""
-    items = _gh_json([
-        resource, "list", "--state", "all",
-        "--author", "@me",
-        "--json", "createdAt", "--limit", "100",
-    ], cwd=cwd)
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
-    return sum(
-        1 for item in items
-        if item.get("createdAt")
-        and datetime.fromisoformat(item["createdAt"].replace("Z", "+00:00")) >= cutoff
-    )
+def _list_recent(
+    resource: str, cwd: str | None = None, deadline: float | None = None
+) -> list[str] | None:
+    """Creation times of items created by @me in the last 24 hours (None on failure)."""
+    try:
+        items = _run_gh_json([
+            resource, "list", "--state", "all",
+            "--author", "@me",
+            "--json", "createdAt", "--limit", "100",
+        ], cwd=cwd, deadline=deadline)
+    except _GH_ERRORS as e:
+        _warn_gh_failed(e)
+        return None
+    cutoff = rate_window_start().timestamp()
+    return [
+        item["createdAt"] for item in items
+        if item.get("createdAt") and parse_time(item["createdAt"]) >= cutoff
+    ]
 
 
 def _normalize_title(title: str) -> list[str]:
@@ -113,21 +156,49 @@ def _normalize_title(title: str) -> list[str]:
     return cleaned.split()[:4]
 
 
-def _check_duplicate(resource: str, label: str, command: str, cwd: str | None = None) -> None:
+def _list_titles(
+    resource: str, cwd: str | None = None, deadline: float | None = None
+) -> list[tuple[int, str]]:
+    """Numbers and titles of open items."""
+    items = _gh_json([
+        resource, "list", "--state", "open",
+        "--json", "title,number", "--limit", "100",
+    ], cwd=cwd, deadline=deadline)
+    return [(item["number"], item.get("title", "")) for item in items if "number" in item]
+
+
+def _list_snapshot(
+    resource: str, cwd: str | None, deadline: float, include_recent: bool
+) -> RepoSnapshot:
+    """
+    Fallback: the same snapshot from `gh ... list` calls (capped at 100).
+
+    The lookups are independent, so they run concurrently and the hook
+    waits for roughly one gh call instead of three. A lookup still running at
+    the deadline contributes nothing (fail open).
+    """
+    pool = ThreadPoolExecutor(max_workers=3)
+    counts = pool.submit(_get_counts, resource, cwd, deadline)
+    titles = pool.submit(_list_titles, resource, cwd, deadline)
+    futures = [counts, titles]
+    if include_recent:
+        futures.append(pool.submit(_list_recent, resource, cwd, deadline))
+    wait(futures, timeout=_remaining(deadline))
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    def result(future, default):
+        return future.result() if future.done() and not future.exception() else default
+
+    total, ai_created = result(counts, (0, 0))
+    snapshot = RepoSnapshot(total, ai_created, result(titles, []))
+    recent = result(futures[2], None) if include_recent else None
+    if recent is not None:
+        snapshot.recent_count, snapshot.recent = len(recent), recent
+    return snapshot
+
+
+def _check_duplicate(label: str, title: str | None, snapshot: RepoSnapshot) -> None:
     """Block if an open item has a similar title to the one being created."""
-    try:
-        tokens = shlex.split(command)
-    except ValueError:
-        return
-    # Extract --title value
-    title = None
-    for i, token in enumerate(tokens):
-        if token == "--title" and i + 1 < len(tokens):
-            title = tokens[i + 1]
-            break
-        if token.startswith("--title="):
-            title = token[len("--title="):]
-            break
     if not title:
         return
 
@@ -135,21 +206,84 @@ def _check_duplicate(resource: str, label: str, command: str, cwd: str | None =
     if len(proposed) < 2:
         return
 
-    items = _gh_json([
-        resource, "list", "--state", "open",
-        "--json", "title,number", "--limit", "100",
-    ], cwd=cwd)
-    for item in items:
-        existing_title = item.get("title", "")
+    for number, existing_title in snapshot.titles:
         existing_words = _normalize_title(existing_title)
         if len(existing_words) >= 2 and proposed == existing_words:
             _block(
                 f"Duplicate {label} detected",
-                f"Your title matches existing #{item['number']}: {existing_title!r}\n\n"
+                f"Your title matches existing #{number}: {existing_title!r}\n\n"
                 f"Ask the user before creating a duplicate {label}.",
             )
 
 
+def _synced_index(
+    resource: str, repo_dir: str | None, snapshot: RepoSnapshot | None, deadline: float
+) -> TitleIndex | None:
+    """
+    The repo's title index, first brought up to date from snapshot (a
+    GraphQL snapshot; None after a fallback). None if unavailable or stale.
+    """
+    try:
+        index = TitleIndex(repo_key(repo_dir), resource)
+        if snapshot is not None:
+            index.sync(
+                snapshot.updates,
+                len(snapshot.updates) < TITLE_WINDOW,
+                lambda cursor: fetch_open_page(
+                    resource, cursor, cwd=repo_dir, timeout=_remaining(deadline)
+                ),
+                deadline,
+            )
+        return index if index.trusted() else None
+    except (OSError, sqlite3.Error, KeyError, TypeError) as e:
+        print(f"Warning: title index unavailable: {e}", file=sys.stderr)
+        return None
+
+
+def _similar_warning(label: str, title: str | None, index: TitleIndex | None) -> str | None:
+    """
+    Warning when an open item's title is a near-duplicate of the proposed
+    one. Similar titles are often distinct work, so this never blocks.
+    """
+    if not title or index is None:
+        return None
+    try:
+        matches = index.similar(title, duplicate_threshold())
+    except sqlite3.Error:
+        return None
+    if not matches:
+        return None
+    number, existing_title, score = matches[0]
+    return (
+        f"Possible duplicate {label}: your title is {score:.0%} similar to existing "
+        f"#{number}: {existing_title!r}. Check that it is not the same work."
+    )
+
+
+def _check_org_limit(repo_dir: str | None, deadline: float) -> None:
+    """Block if the org's open AI-created items reach its configured cap."""
+    limit = load_org_limit(repo_dir)
+    if limit is None:
+        return
+    counts = cached_counts(limit, lambda: fetch_counts(limit, timeout=_remaining(deadline)))
+    if counts is None:
+        return  # fail-open: warned by fetch_counts
+    total = sum(counts.values())
+    if total < limit.max_ai_created:
+        return
+    top = sorted(((n, r) for r, n in counts.items() if n), reverse=True)[:5]
+    breakdown = "\n".join(f"  {repo}: {n}" for n, repo in top)
+    _block(
+        "Org-wide AI-created limit exceeded",
+        f"AI-created issues and PRs open across {limit.name}: "
+        f"{total}/{limit.max_ai_created} (limit reached)\n"
+        f"{breakdown}\n\n"
+        f"Required actions:\n"
+        f"  1. Close or resolve completed AI-created items in these repositories\n"
+        f"  2. Ask the user for explicit permission to create more",
+    )
+
+
 def _block(reason: str, details: str) -> None:
     """Print block message and exit with code 2."""
     indented = "\n".join(f"  {line}" if line else "" for line in details.splitlines())
@@ -172,7 +306,7 @@ def main() -> None:
         sys.exit(0)
 
     command = hook_input.get("tool_input", {}).get("command", "")
-    match = _CMD_RE.search(command)
+    match = CMD_RE.search(command)
     if not match:
         sys.exit(0)
 
@@ -188,12 +322,45 @@ def main() -> None:
     # Extract target repo directory from cd prefix (fixes CWD bug)
     repo_dir = _extract_repo_dir(command)
 
+    # The 24h window comes from the local ledger; recent creations are only
+    # fetched to reconcile it (cold start, then periodically)
+    ledger = CreationLedger(repo_key(repo_dir), resource)
+    reconcile = ledger.needs_reconcile()
+
+    # One round trip answers every check below, shared with concurrent
+    # sessions through the per-repo cache; both paths share one deadline
+    deadline = time.monotonic() + LOOKUP_DEADLINE_SECONDS
+    snapshot = cached_snapshot(
+        resource,
+        repo_dir,
+        lambda: fetch_snapshot(
+            resource, cwd=repo_dir, timeout=_remaining(deadline), include_recent=reconcile
+        ),
+        require_recent=reconcile,
+    )
+    graphql_snapshot = snapshot
+    if snapshot is None:
+        snapshot = _list_snapshot(resource, repo_dir, deadline, include_recent=reconcile)
+    if reconcile and snapshot.recent_count is not None:
+        ledger.reconcile(
+            [parse_time(t) for t in snapshot.recent],
+            snapshot.recent_count,
+            rate_window_start().timestamp(),
+        )
+
     # Create-only checks: duplicate detection and hard limits
+    warning = None
     if action == "create":
-        _check_duplicate(resource, label, command, cwd=repo_dir)
+        title = extract_title(command)
+        _check_duplicate(label, title, snapshot)
+        if title:
+            index = _synced_index(resource, repo_dir, graphql_snapshot, deadline)
+            warning = _similar_warning(label, title, index)
+            if warning:  # Also shown with any block below
+                print(f"Warning: {warning}", file=sys.stderr)
 
         total_limit, ai_limit = HARD_LIMITS[resource]
-        total, ai_created = _get_counts(resource, cwd=repo_dir)
+        total, ai_created = snapshot.total, snapshot.ai_created
 
         reasons = []
         if total >= total_limit:
@@ -209,10 +376,11 @@ def main() -> None:
                 f"  1. Close or resolve duplicate and completed {label}s\n"
                 f"  2. Ask the user for explicit permission to create more {label}s",
             )
+        _check_org_limit(repo_dir, deadline)
 
     # 24h rate limit (create only — edits are always allowed)
     if action == "create":
-        recent = _count_recent(resource, cwd=repo_dir)
+        recent = ledger.count_since(rate_window_start().timestamp())
         if recent >= RATE_LIMIT_24H:
             _block(
                 "Rate limit exceeded",
@@ -220,6 +388,8 @@ def main() -> None:
                 "The user can re-run the blocked command directly in their\n"
                 "terminal to bypass this rate limit.",
             )
+        if warning:
+            print(json.dumps({"systemMessage": warning}))
 
 
 if __name__ == "__main__":
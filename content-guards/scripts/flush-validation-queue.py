@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Claude Code Stop hook that runs the validations deferred during the turn.
+
+With CONTENT_GUARDS_DEFERRED=1, validate-markdown.sh and validate-readme.py
+only queue edited files (validation_queue.py). At the end of the turn this
+hook drains the session's queue and runs each queued validator once per
+file, in parallel. Each run is the normal hook fed a synthetic
+PostToolUse input, so checks and messages match immediate mode.
+
+Every failing file is reported with its validator's message. Failures are
+not re-queued: like an immediate PostToolUse block, each is reported once,
+and editing the file queues it again. The whole flush stops after
+TOTAL_SECONDS, inside the hook's timeout; files it did not get to are
+re-queued for the next Stop.
+
+Without CONTENT_GUARDS_DEFERRED=1 nothing is queued, and the hook exits
+before touching the queue.
+
+Exit codes:
+  0 = allow (nothing queued, or every file passed)
+  2 = block (at least one file failed; messages on stderr)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from validation_queue import deferred_enabled, drain, enqueue  # noqa: E402
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+VALIDATORS = {
+    "markdown": os.path.join(SCRIPT_DIR, "validate-markdown.sh"),
+    "readme": os.path.join(SCRIPT_DIR, "validate-readme.py"),
+}
+TIMEOUT_SECONDS = 30  # Per validation, as in hooks.json
+TOTAL_SECONDS = 100  # Whole flush, below the Stop hook's 120 s timeout in hooks.json
+MAX_WORKERS = 8
+
+
+def run_validator(validator: str, path: str, timeout: float = TIMEOUT_SECONDS) -> str | None:
+    """
+    Run one validator on path; its message when it blocks, else None.
+    Raises subprocess.TimeoutExpired when it runs past timeout.
+    """
+    script = VALIDATORS.get(validator)
+    if script is None:
+        return None
+    # Each file is validated once here, so lint it whole
+    env = dict(os.environ, CONTENT_GUARDS_DEFERRED="0", CONTENT_GUARDS_INCREMENTAL_LINT="0")
+    try:
+        result = subprocess.run(
+            [script],
+            input=json.dumps({"tool_name": "Write", "tool_input": {"file_path": path}}),
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            env=env,
+        )
+    except OSError:
+        return None  # Fail open
+    if result.returncode != 2:
+        return None
+    return result.stderr.strip() or f"{validator} validation failed for: {path}"
+
+
+def flush(queue: dict[str, list[str]], session_id: str = "") -> list[str]:
+    """
+    Validate every queued (path, validator) once within TOTAL_SECONDS;
+    blocking messages in queue order. Jobs cut off by the deadline go back
+    on the session's queue.
+    """
+    jobs = [(validator, path) for path, validators in queue.items() for validator in validators]
+    if not jobs:
+        return []
+    deadline = time.monotonic() + TOTAL_SECONDS
+
+    def run(job: tuple[str, str]) -> str | None:
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            try:
+                return run_validator(*job, timeout=min(TIMEOUT_SECONDS, remaining))
+            except subprocess.TimeoutExpired:
+                if remaining >= TIMEOUT_SECONDS:
+                    return None  # Fail open: the validator itself timed out
+        enqueue(session_id, *job)
+        return None
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(jobs))) as pool:
+        results = pool.map(run, jobs)
+        return [message for message in results if message]
+
+
+def main() -> None:
+    if not deferred_enabled():
+        sys.exit(0)  # Nothing is queued in immediate mode
+    try:
+        hook_input = json.load(sys.stdin)
+    except (json.JSONDecodeError, ValueError):
+        sys.exit(0)  # Invalid input, fail open
+    if not isinstance(hook_input, dict):
+        sys.exit(0)
+
+    session_id = str(hook_input.get("session_id", ""))
+    failures = flush(drain(session_id), session_id)
+    if not failures:
+        sys.exit(0)
+
+    print("Deferred validation failed for files edited this turn:", file=sys.stderr)
+    for message in failures:
+        print("", file=sys.stderr)
+        print(message, file=sys.stderr)
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
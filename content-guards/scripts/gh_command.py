@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Parsing of `gh issue/pr create|edit` Bash commands, shared by the
+enforce-issue-limits.py (PreToolUse) and record-gh-create.py (PostToolUse)
+hooks.
+"""
+
+import os
+import re
+import shlex
+
+CMD_RE = re.compile(r"(?:^|\s)gh\s+(issue|pr)\s+(create|edit)(?:\s|$)")
+
+
+def extract_repo_dir(command: str) -> str | None:
+    """Extract target repo directory from cd prefix in bash commands."""
+    m = re.match(r'^\s*cd\s+("(?:[^"]+)"|\'(?:[^\']+)\'|[^\s;&]+)', command)
+    if m:
+        path = m.group(1).strip("'\"")
+        path = os.path.abspath(os.path.expanduser(path))
+        if not os.path.isdir(path):
+            return None
+        return path
+    return None
+
+
+def _flag_values(command: str, long: str, short: str | None = None) -> list[str]:
+    """Values of every --long VALUE / --long=VALUE (and -s VALUE) occurrence."""
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        return []
+    names = {long, short} - {None}
+    values = []
+    for i, token in enumerate(tokens):
+        if token in names and i + 1 < len(tokens):
+            values.append(tokens[i + 1])
+        elif token.startswith(long + "="):
+            values.append(token[len(long) + 1:])
+    return values
+
+
+def extract_title(command: str) -> str | None:
+    """Return the --title value of a gh create command, if any."""
+    values = _flag_values(command, "--title")
+    return values[0] if values else None
+
+
+def extract_labels(command: str) -> set[str]:
+    """Labels passed with --label/-l (repeated or comma-separated)."""
+    return {
+        label.strip()
+        for value in _flag_values(command, "--label", "-l")
+        for label in value.split(",")
+        if label.strip()
+    }
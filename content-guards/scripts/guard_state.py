@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Shared on-disk state for content-guards hooks and CLIs.
+
+All caches live under one directory so they can be inspected or wiped
+together:
+
+  $CONTENT_GUARDS_CACHE_DIR              (explicit override, used by tests)
+  $XDG_CACHE_HOME/content-guards         (default)
+  ~/.cache/content-guards                (fallback)
+
+Every helper fails open: a cache that cannot be read behaves like an empty
+cache, and a cache that cannot be written is silently skipped.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+
+def cache_dir() -> Path:
+    """Return the content-guards cache directory (not created here)."""
+    override = os.environ.get("CONTENT_GUARDS_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(base) / "content-guards"
+
+
+def state_path(*parts: str) -> Path:
+    """Return a path inside the cache directory."""
+    return cache_dir().joinpath(*parts)
+
+
+def content_hash(text: str | bytes) -> str:
+    """Stable SHA-256 hex digest of text or bytes."""
+    data = text.encode("utf-8") if isinstance(text, str) else text
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_json(path: Path, default: Any = None) -> Any:
+    """Read a JSON document, returning default when missing or corrupt."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path: Path, data: Any) -> None:
+    """Atomically replace path with data serialized as JSON."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+@contextmanager
+def locked(path: Path) -> Iterator[bool]:
+    """
+    Hold an exclusive advisory lock on path + '.lock' for the block.
+
+    Yields False (and does not lock) when the lock file cannot be opened,
+    so callers degrade to unlocked behavior instead of failing.
+    """
+    lock_path = path.with_name(path.name + ".lock")
+    try:
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        yield False
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield True
+    finally:
+        os.close(fd)
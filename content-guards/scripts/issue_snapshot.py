@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Everything enforce-issue-limits.py needs to know about a repository, fetched
+in one GitHub GraphQL round trip:
+
+  - exact number of open issues/PRs (totalCount, not a truncated list)
+    and titles of the most recently created open items (duplicate check)
+  - exact number of open items labeled "ai-created"
+  - the most recently updated items in any state, which keep the local
+    title index (title_index.py) current
+  - creation times and exact count of the caller's items in the last 24h,
+    only when the local creation ledger needs reconciling
+
+`gh api graphql` fills {owner} and {repo} from the repository of the working
+directory, so no extra call is needed to resolve them.
+"""
+
+import json
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+AI_LABEL = "ai-created"
+TITLE_WINDOW = 100
+RATE_WINDOW = timedelta(hours=24)
+
+_CONNECTIONS = {"issue": "issues", "pr": "pullRequests"}
+_SEARCH_TYPES = {"issue": "is:issue", "pr": "is:pr"}
+
+_QUERY = """
+query($owner: String!, $name: String!%(recent_var)s) {
+  repository(owner: $owner, name: $name) {
+    open: %(conn)s(states: OPEN, first: %(window)d,
+                   orderBy: {field: CREATED_AT, direction: DESC}) {
+      totalCount
+      nodes { number title }
+    }
+    ai: %(conn)s(states: OPEN, labels: ["%(label)s"]) { totalCount }
+    updated: %(conn)s(first: %(window)d, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      nodes { number title state updatedAt }
+    }
+  }%(recent)s
+}
+"""
+
+_RECENT = """
+  recent: search(type: ISSUE, query: $recent, first: 100) {
+    issueCount
+    nodes { ... on Issue { createdAt } ... on PullRequest { createdAt } }
+  }"""
+
+_OPEN_PAGE = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    page: %(conn)s(states: OPEN, first: %(window)d, after: $cursor,
+                   orderBy: {field: UPDATED_AT, direction: DESC}) {
+      nodes { number title state updatedAt }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+
+@dataclass
+class RepoSnapshot:
+    """Open-item counts, titles and recent creations for one resource type."""
+
+    total: int
+    ai_created: int
+    titles: list[tuple[int, str]] = field(default_factory=list)
+    # {number, title, state, updatedAt} of recently updated items, newest first
+    updates: list[dict] = field(default_factory=list)
+    recent_count: int | None = None  # None when recent creations were not fetched
+    recent: list[str] = field(default_factory=list)  # createdAt, newest first
+
+
+def rate_window_start(now: datetime | None = None) -> datetime:
+    return (now or datetime.now(timezone.utc)) - RATE_WINDOW
+
+
+def build_query(resource: str, include_recent: bool = True) -> str:
+    return _QUERY % {
+        "conn": _CONNECTIONS[resource],
+        "window": TITLE_WINDOW,
+        "label": AI_LABEL,
+        "recent_var": ", $recent: String!" if include_recent else "",
+        "recent": _RECENT if include_recent else "",
+    }
+
+
+def recent_search(resource: str, since: datetime) -> str:
+    stamp = since.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return f"repo:{{owner}}/{{repo}} {_SEARCH_TYPES[resource]} author:@me created:>={stamp}"
+
+
+def _item(node: dict) -> dict:
+    return {
+        "number": int(node["number"]),
+        "title": str(node["title"]),
+        "state": str(node["state"]),
+        "updatedAt": str(node["updatedAt"]),
+    }
+
+
+def parse_snapshot(payload: object) -> RepoSnapshot | None:
+    """Build a snapshot from a GraphQL response, or None if it is not one."""
+    try:
+        repo = payload["data"]["repository"]  # type: ignore[index]
+        updates = [_item(n) for n in repo["updated"]["nodes"] if n]
+        snapshot = RepoSnapshot(
+            total=int(repo["open"]["totalCount"]),
+            ai_created=int(repo["ai"]["totalCount"]),
+            titles=[(int(n["number"]), str(n["title"])) for n in repo["open"]["nodes"] if n],
+            updates=updates,
+        )
+        recent = payload["data"].get("recent")  # type: ignore[index]
+        if recent is not None:
+            snapshot.recent_count = int(recent["issueCount"])
+            snapshot.recent = [n["createdAt"] for n in recent["nodes"] if n and n.get("createdAt")]
+        return snapshot
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def fetch_snapshot(
+    resource: str, cwd: str | None = None, timeout: float = 30, include_recent: bool = True
+) -> RepoSnapshot | None:
+    """One `gh api graphql` call; None on any failure (caller falls back)."""
+    args = [
+        "gh", "api", "graphql",
+        "-f", f"query={build_query(resource, include_recent)}",
+        "-F", "owner={owner}",
+        "-F", "name={repo}",
+    ]
+    if include_recent:
+        args += ["-F", f"recent={recent_search(resource, rate_window_start())}"]
+    try:
+        result = subprocess.run(
+            args,
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=timeout,
+            cwd=cwd,
+        )
+        return parse_snapshot(json.loads(result.stdout))
+    except (OSError, subprocess.SubprocessError, json.JSONDecodeError) as e:
+        print(f"Warning: gh api graphql failed: {e}", file=sys.stderr)
+        return None
+
+
+def fetch_open_page(
+    resource: str, cursor: str | None, cwd: str | None = None, timeout: float = 30
+) -> tuple[list[dict], str | None] | None:
+    """
+    One page of open items, most recently updated first, for (re)building
+    the title index. Returns (items, next cursor or None), or None on failure.
+    """
+    query = _OPEN_PAGE % {"conn": _CONNECTIONS[resource], "window": TITLE_WINDOW}
+    args = ["gh", "api", "graphql", "-f", f"query={query}", "-F", "owner={owner}", "-F", "name={repo}"]
+    if cursor:
+        args += ["-f", f"cursor={cursor}"]
+    try:
+        result = subprocess.run(
+            args, capture_output=True, text=True, check=True, timeout=timeout, cwd=cwd
+        )
+        page = json.loads(result.stdout)["data"]["repository"]["page"]
+        info = page["pageInfo"]
+        items = [_item(n) for n in page["nodes"] if n]
+        return items, info["endCursor"] if info["hasNextPage"] else None
+    except (OSError, subprocess.SubprocessError, ValueError, KeyError, TypeError) as e:
+        print(f"Warning: gh api graphql failed: {e}", file=sys.stderr)
+        return None
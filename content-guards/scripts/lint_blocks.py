@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Block fingerprints for incremental markdown linting.
+
+After a clean full lint of a large document, lint_worker.py remembers
+(through incremental_lint) a fingerprint of each block: the text from one ATX heading (outside code
+fences, via markdown_outline.py) to the next. On the next edit only the
+blocks whose fingerprint is new are linted, each with one line of context
+on either side so blank-line rules see the block boundaries.
+
+Rules that read the whole document are disabled for block lints
+(DOCUMENT_RULES) and covered instead by the fingerprints themselves:
+
+- heading rules (MD001, MD024, MD025, MD041, MD043) read only the heading
+  skeleton (headings plus the first line); any change to it forces a full
+  lint
+- link fragments and reference links (MD051-MD053) can point across
+  blocks; a changed block using them, or the loss of a block that defines
+  references, forces a full lint
+
+- style consistency rules (MD004, MD035, MD046, MD048-MD050) compare
+  every list marker, hr, code block, fence and emphasis against the first
+  one in the document; a clean full lint records the one style of each the
+  document uses, and a changed block that uses any other (or any style
+  where the document had none or several) forces a full lint
+
+The incremental path can only conclude "clean". Any violation in a block
+lint falls back to a full lint, which reports exact lines and applies
+fixes, so errors are always those of the real linter. Full lints also run
+every FULL_EVERY incremental passes.
+"""
+
+import os
+import re
+from collections.abc import Callable
+
+from guard_state import content_hash, load_json, save_json, state_path
+from markdown_outline import parse_outline
+
+MIN_LINES = 400  # Smaller documents are cheap to lint in full
+FULL_EVERY = 10
+DOCUMENT_RULES = ("MD001", "MD024", "MD025", "MD041", "MD043", "MD051", "MD052", "MD053")
+
+_REF_DEF_RE = re.compile(r"^ {0,3}\[[^\]]+\]:", re.MULTILINE)
+_CROSS_REF_RE = re.compile(r"\]\[|\]\(#|^ {0,3}\[[^\]]+\]:", re.MULTILINE)
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+# Style markers, matched generously: a false match only costs a full lint
+_HR_RE = re.compile(r"^ {0,3}(?:(?:\*[ \t]*){3,}|(?:-[ \t]*){3,}|(?:_[ \t]*){3,})$")
+_ATX_RE = re.compile(r"^ {0,3}#{1,6}(?:[ \t]|$)")
+_BULLET_RE = re.compile(r"^[ \t]*([-*+])(?:[ \t]|$)")
+_CODE_SPAN_RE = re.compile(r"(`+).*?\1")
+_STRONG_RE = re.compile(r"\*\*|__")
+_EMPHASIS_RE = re.compile(r"(?<![*\\])\*(?!\*)|(?<![_\w])_(?!_)|(?<!_)_(?![_\w])")
+
+
+def split_blocks(content: str) -> list[list[str]]:
+    """Lines of content split at every ATX heading outside code fences."""
+    lines = content.split("\n")
+    starts = [h.line for h in parse_outline(content).headings if h.line > 0]
+    bounds = [0, *starts, len(lines)]
+    return [lines[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def skeleton(blocks: list[list[str]]) -> str:
+    """Fingerprint of what the heading rules read: the first line and every heading."""
+    firsts = [b[0] if b else "" for b in blocks]
+    return content_hash("\n".join(firsts))
+
+
+def fingerprint(block: list[str]) -> str:
+    return content_hash("\n".join(block))[:32]
+
+
+def styles(block: list[str]) -> dict[str, list[str]]:
+    """Style markers of one block for the consistency rules, by rule."""
+    found = {rule: set() for rule in ("MD004", "MD035", "MD046", "MD048", "MD049", "MD050")}
+    fence = None
+    in_paragraph = False  # An indented line continues a paragraph, not a code block
+    for line in block:
+        match = _FENCE_RE.match(line)
+        if fence is not None:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+            continue
+        if match:
+            fence = match.group(1)
+            found["MD046"].add("fenced")
+            found["MD048"].add(fence[0])
+        elif not in_paragraph and line.strip() and line.expandtabs()[:4] == "    ":
+            found["MD046"].add("indented")
+        elif _HR_RE.match(line):
+            found["MD035"].add(line.strip())
+        else:
+            bullet = _BULLET_RE.match(line)
+            if bullet:
+                found["MD004"].add(bullet.group(1))
+            text = _CODE_SPAN_RE.sub("", line[bullet.end():] if bullet else line)
+            found["MD050"].update(_STRONG_RE.findall(text))
+            found["MD049"].update(m.group()[0] for m in _EMPHASIS_RE.finditer(_STRONG_RE.sub("", text)))
+        in_paragraph = bool(line.strip()) and not match and not _ATX_RE.match(line) and not _HR_RE.match(line)
+    return {rule: sorted(marks) for rule, marks in found.items() if marks}
+
+
+def lint_units(blocks: list[list[str]], changed: list[int]) -> list[str]:
+    """
+    Text to lint for the changed blocks: runs of adjacent changed blocks,
+    plus a stand-in for the previous line and the next block's heading.
+    """
+    units = []
+    i = 0
+    changed_set = set(changed)
+    while i < len(blocks):
+        if i not in changed_set:
+            i += 1
+            continue
+        start = i
+        while i + 1 < len(blocks) and i + 1 in changed_set:
+            i += 1
+        text = [line for block in blocks[start:i + 1] for line in block]
+        if start > 0:
+            before = blocks[start - 1][-1] if blocks[start - 1] else ""
+            # A lone fence line would open a code block; any non-blank text
+            # stands in equally for the blank-line rules
+            text.insert(0, "" if not before.strip() else "text" if _FENCE_RE.match(before) else before)
+        if i + 1 < len(blocks):
+            text.append(blocks[i + 1][0])
+        units.append("\n".join(text) + ("\n" if i + 1 < len(blocks) else ""))
+        i += 1
+    return units
+
+
+class BlockCache:
+    """Per-file fingerprints of the last clean lint, keyed by lint settings."""
+
+    def __init__(self, path: str, settings: str):
+        self.path = state_path("lint-blocks", content_hash(os.path.abspath(path))[:24] + ".json")
+        self.settings = settings
+
+    def changed_blocks(self, blocks: list[list[str]]) -> list[int] | None:
+        """Indexes of blocks to lint, or None when a full lint is needed."""
+        entry = load_json(self.path, {})
+        if not isinstance(entry, dict) or entry.get("settings") != self.settings:
+            return None
+        if entry.get("passes", FULL_EVERY) >= FULL_EVERY or entry.get("skeleton") != skeleton(blocks):
+            return None
+        known = set(entry.get("blocks", []))
+        prints = [fingerprint(b) for b in blocks]
+        if not set(entry.get("ref_blocks", [])) <= set(prints):
+            return None  # A block defining references changed or was removed
+        changed = [i for i, fp in enumerate(prints) if fp not in known]
+        if any(_CROSS_REF_RE.search("\n".join(blocks[i])) for i in changed):
+            return None
+        recorded = entry.get("styles", {})
+        for i in changed:
+            for rule, marks in styles(blocks[i]).items():
+                if len(recorded.get(rule, [])) != 1 or marks != recorded[rule]:
+                    return None  # Consistency with the rest of the document is unknown
+        return changed
+
+    def record_clean(self, blocks: list[list[str]], incremental: bool) -> None:
+        passes = 0
+        document = {}
+        for block in blocks:
+            for rule, marks in styles(block).items():
+                document.setdefault(rule, set()).update(marks)
+        if incremental:
+            entry = load_json(self.path, {})
+            passes = (entry.get("passes", 0) if isinstance(entry, dict) else 0) + 1
+        save_json(self.path, {
+            "settings": self.settings,
+            "passes": passes,
+            "skeleton": skeleton(blocks),
+            "blocks": [fingerprint(b) for b in blocks],
+            "ref_blocks": [fingerprint(b) for b in blocks if _REF_DEF_RE.search("\n".join(b))],
+            "styles": {rule: sorted(marks) for rule, marks in document.items()},
+        })
+
+    def forget(self) -> None:
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+def lint_settings(module: str, directory: str, argv: list[str], file_path: str) -> str:
+    """
+    Everything a lint result depends on besides the file: the linter, the
+    arguments and the markdownlint configs from directory down to the file.
+    --config files are stamped by content: the hook's built-in fallback is
+    written to a fresh temp directory on every run.
+    """
+    stamps = [module, str(os.stat(module).st_mtime_ns), directory]
+    flags = iter(argv[:-1])
+    for flag in flags:
+        stamps.append(flag)
+        if flag == "--config":
+            with open(os.path.join(directory, next(flags)), "rb") as f:
+                stamps.append(content_hash(f.read()))
+    current = os.path.dirname(file_path)
+    while True:
+        for name in sorted(os.listdir(current)):
+            if name.startswith(".markdownlint"):
+                stamps += [current, name, str(os.stat(os.path.join(current, name)).st_mtime_ns)]
+        if current == directory or os.path.dirname(current) == current:
+            break
+        current = os.path.dirname(current)
+    return content_hash("\0".join(stamps))
+
+
+def incremental_lint(
+    module: str, directory: str, argv: list[str], request: Callable[[dict], dict | None]
+) -> tuple["BlockCache", dict | None] | None:
+    """
+    (cache, response) when argv lints one large Markdown file; response is
+    a clean result when the changed blocks lint clean, else None. request
+    sends one lint payload to the worker.
+    """
+    if os.environ.get("CONTENT_GUARDS_INCREMENTAL_LINT", "1") == "0" or not argv:
+        return None
+    file_path = os.path.join(directory, argv[-1])
+    if not file_path.endswith(".md") or argv[-1].startswith("-"):
+        return None
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            content = f.read()
+        if content.count("\n") < MIN_LINES:
+            return None
+        cache = BlockCache(file_path, lint_settings(module, directory, argv, file_path))
+    except (OSError, UnicodeDecodeError, StopIteration):
+        return None
+    blocks = split_blocks(content)
+    changed = cache.changed_blocks(blocks)
+    if changed is None:
+        return cache, None
+    if changed:
+        units = {f"block-{i}": text for i, text in enumerate(lint_units(blocks, changed))}
+        response = request({
+            "directory": directory,
+            "argv": argv[:-1],
+            "nonFileContents": units,
+            "optionsOverride": {"fix": False, "config": dict.fromkeys(DOCUMENT_RULES, False)},
+        })
+        if response is None or response["code"] != 0:
+            return cache, None
+    cache.record_clean(blocks, incremental=True)
+    return cache, {"code": 0, "output": ""}
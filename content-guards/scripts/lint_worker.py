@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Client for the persistent markdownlint worker (markdownlint-worker.mjs).
+
+validate-markdown.sh used to start a fresh Node process for every Markdown
+edit, and Node startup plus loading markdownlint-cli2 and its rules
+dominated the hook's wall time. The worker keeps them loaded and serves
+lint requests over a Unix socket; it is started on demand by the first
+request and exits after IDLE_SECONDS without one.
+
+One worker runs per user, cache directory and markdownlint-cli2
+installation, so upgrading markdownlint-cli2 (or this plugin) starts a new
+one instead of reusing stale code. Its socket lives in a per-user temp
+directory; if that directory is not private to the user, the CLI is used.
+
+For large documents that last linted clean, only the blocks changed since
+are linted (lint_blocks.py); any finding is confirmed by a full lint.
+
+Set CONTENT_GUARDS_LINT_WORKER=0 to always use the CLI, or
+CONTENT_GUARDS_INCREMENTAL_LINT=0 to always lint whole files.
+
+CLI (used by validate-markdown.sh):
+  lint_worker.py lint <dir> [markdownlint-cli2 args...]
+    Lint through the worker from <dir>, starting it if needed. Prints the
+    linter's output and exits with its code (0 clean, 1 lint errors, 2
+    linter failure), or exits 3 with no output when the worker is
+    unavailable and the caller should run the CLI itself.
+  lint_worker.py stop
+    Stop the worker, if one is running.
+"""
+
+import json
+import os
+import shutil
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from functools import partial
+
+from guard_state import cache_dir, content_hash, locked, state_path
+from lint_blocks import incremental_lint, split_blocks
+
+UNAVAILABLE = 3
+IDLE_SECONDS = 600
+START_TIMEOUT = 5.0
+REQUEST_TIMEOUT = 25.0
+WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "markdownlint-worker.mjs")
+
+
+def module_path() -> str | None:
+    """markdownlint-cli2's main module, found from its executable."""
+    override = os.environ.get("CONTENT_GUARDS_MARKDOWNLINT_MODULE")
+    if override:
+        return override if os.path.isfile(override) else None
+    exe = shutil.which("markdownlint-cli2")
+    if not exe:
+        return None
+    base = os.path.dirname(os.path.realpath(exe))
+    for candidate in (
+        os.path.join(base, "markdownlint-cli2.mjs"),  # npm: bin links into the package
+        os.path.join(base, "..", "lib", "node_modules", "markdownlint-cli2", "markdownlint-cli2.mjs"),
+    ):
+        if os.path.isfile(candidate):
+            return os.path.realpath(candidate)
+    return None
+
+
+def _private_dir(directory: str) -> bool:
+    """
+    Create directory if needed and check that only this user can use it: a
+    directory someone else created (or a symlink) could hold their socket.
+    """
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.lstat(directory)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and stat.S_IMODE(st.st_mode) == 0o700
+    )
+
+
+def socket_path(module: str) -> str | None:
+    """
+    Worker socket for this user, cache directory, module and worker
+    version. Kept under the temp dir: socket paths are limited to ~100 bytes.
+    None when the socket directory is not private (use the CLI instead).
+    """
+    try:
+        worker_mtime = os.stat(WORKER).st_mtime_ns
+    except OSError:
+        worker_mtime = 0
+    key = content_hash(f"{cache_dir()}\0{module}\0{worker_mtime}")[:16]
+    directory = os.path.join(tempfile.gettempdir(), f"content-guards-{os.getuid()}")
+    if not _private_dir(directory):
+        return None
+    return os.path.join(directory, f"mdl-{key}.sock")
+
+
+def _request(path: str, payload: dict, timeout: float) -> dict | None:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        response = json.loads(data)
+        return response if isinstance(response, dict) and "code" in response else None
+    except (OSError, ValueError):
+        return None
+
+
+def _alive(path: str) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(0.5)
+            sock.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def _start(path: str, module: str) -> bool:
+    """Start a worker (once, across concurrent hooks) and wait for its socket."""
+    with locked(state_path("markdownlint-worker")):
+        if _alive(path):
+            return True
+        node = shutil.which("node")
+        if not node:
+            return False
+        try:
+            subprocess.Popen(
+                [node, WORKER, path, module, str(IDLE_SECONDS)],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,  # Outlive this hook
+            )
+        except OSError:
+            return False
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            if _alive(path):
+                return True
+            time.sleep(0.02)
+        return False
+
+
+def _request_worker(module: str, payload: dict) -> dict | None:
+    path = socket_path(module)
+    if path is None:
+        return None
+    response = _request(path, payload, REQUEST_TIMEOUT) if _alive(path) else None
+    if response is None and _start(path, module):
+        response = _request(path, payload, REQUEST_TIMEOUT)
+    return response
+
+
+def lint(directory: str, argv: list[str]) -> dict | None:
+    """Lint through the worker; None when it is unavailable."""
+    if os.environ.get("CONTENT_GUARDS_LINT_WORKER", "1") == "0":
+        return None
+    module = module_path()
+    if module is None:
+        return None
+    directory = os.path.abspath(directory)
+    incremental = incremental_lint(module, directory, argv, partial(_request_worker, module))
+    if incremental is not None and incremental[1] is not None:
+        return incremental[1]
+
+    response = _request_worker(module, {"directory": directory, "argv": argv})
+    if incremental is not None and response is not None:
+        cache = incremental[0]
+        if response["code"] == 0:
+            try:  # Fix mode may have rewritten the file
+                with open(os.path.join(directory, argv[-1]), encoding="utf-8") as f:
+                    cache.record_clean(split_blocks(f.read()), incremental=False)
+            except (OSError, UnicodeDecodeError):
+                cache.forget()
+        else:
+            cache.forget()
+    return response
+
+
+def stop() -> bool:
+    module = module_path()
+    path = socket_path(module) if module is not None else None
+    return path is not None and _request(path, {"op": "stop"}, 5) is not None
+
+
+def main() -> None:
+    if len(sys.argv) >= 3 and sys.argv[1] == "lint":
+        try:
+            response = lint(sys.argv[2], sys.argv[3:])
+        except Exception:  # Fail open to the CLI
+            response = None
+        if response is None:
+            sys.exit(UNAVAILABLE)
+        if response.get("output"):
+            print(response["output"])
+        sys.exit(int(response["code"]))
+    if len(sys.argv) == 2 and sys.argv[1] == "stop":
+        sys.exit(0 if stop() else 1)
+    print("usage: lint_worker.py lint <dir> [args...] | lint_worker.py stop", file=sys.stderr)
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Single-pass Markdown outline: ATX headings, section spans and fenced code
+blocks.
+
+The README validator needs all three, and used to rescan the document for
+each. parse_outline walks the lines once, tracking fences the way
+CommonMark does (``` or ~~~, at least three, closed by a fence of the same
+character at least as long), so `# comment` lines inside a shell code
+block are not mistaken for headings.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+_HEADING_RE = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})(.*)$")
+
+
+@dataclass
+class Heading:
+    level: int
+    text: str
+    line: int  # 0-based line of the heading
+    end: int = 0  # line after its section: the next heading of the same or higher level
+
+
+@dataclass
+class CodeBlock:
+    start: int  # 0-based line of the opening fence
+    end: int  # line of the closing fence (last line if unclosed)
+    info: str  # info string, e.g. "bash"
+
+
+@dataclass
+class Outline:
+    headings: list[Heading] = field(default_factory=list)
+    code_blocks: list[CodeBlock] = field(default_factory=list)
+    lines: int = 0
+
+    def titles(self, max_level: int = 6) -> list[str]:
+        return [h.text for h in self.headings if h.level <= max_level]
+
+    def find(self, title: str, max_level: int = 6) -> Heading | None:
+        """First heading titled title (case-insensitive), if any."""
+        wanted = title.lower()
+        for h in self.headings:
+            if h.level <= max_level and h.text.lower() == wanted:
+                return h
+        return None
+
+    def code_in(self, heading: Heading) -> list[CodeBlock]:
+        """Code blocks inside heading's section (subsections included)."""
+        return [b for b in self.code_blocks if heading.line < b.start < heading.end]
+
+
+def parse_outline(content: str) -> Outline:
+    outline = Outline()
+    fence: tuple[str, int] | None = None  # (fence char, length) while inside one
+    line_no = -1
+    for line_no, line in enumerate(content.splitlines()):
+        match = _FENCE_RE.match(line)
+        if fence is not None:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= fence[1] \
+                    and not match.group(2).strip():
+                outline.code_blocks[-1].end = line_no
+                fence = None
+            continue
+        if match and not (match.group(1)[0] == "`" and "`" in match.group(2)):
+            fence = (match.group(1)[0], len(match.group(1)))
+            outline.code_blocks.append(CodeBlock(line_no, line_no, match.group(2).strip()))
+            continue
+        match = _HEADING_RE.match(line)
+        if match:
+            outline.headings.append(Heading(len(match.group(1)), (match.group(2) or "").strip(), line_no))
+
+    outline.lines = line_no + 1
+    if fence is not None:  # Unclosed fence runs to the end of the document
+        outline.code_blocks[-1].end = line_no
+    # Close each section at the next heading of the same or higher level
+    open_sections: list[Heading] = []
+    for h in outline.headings:
+        while open_sections and open_sections[-1].level >= h.level:
+            open_sections.pop().end = h.line
+        open_sections.append(h)
+    for h in open_sections:
+        h.end = outline.lines
+    return outline
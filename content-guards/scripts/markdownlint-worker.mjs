@@ -0,0 +1,108 @@
+#!/usr/bin/env node
+// Long-lived markdownlint-cli2 worker for validate-markdown.sh.
+//
+// Usage: markdownlint-worker.mjs SOCKET MODULE IDLE_SECONDS
+//
+// Loads markdownlint-cli2 (MODULE, its markdownlint-cli2.mjs) once and
+// serves lint requests on the Unix socket SOCKET, so each Markdown edit
+// pays for a socket round trip instead of a Node cold start plus module
+// and rule loading. Exits after IDLE_SECONDS without a request.
+//
+// Protocol: one JSON line per connection.
+//   request:  {"directory": "/abs/dir", "argv": ["--config", "x", "file.md"]}
+//             optionally with "nonFileContents" and "optionsOverride", passed
+//             through to markdownlint-cli2 (block lints, see lint_blocks.py)
+//             {"op": "stop"}
+//   response: {"code": 0|1|2, "output": "..."}
+//
+// Requests run one at a time: markdownlint-cli2 may rewrite files (fix
+// mode), and lint results must not interleave.
+
+import fs from "node:fs";
+import net from "node:net";
+import { pathToFileURL } from "node:url";
+
+const [socketPath, modulePath, idleArg] = process.argv.slice(2);
+const idleMs = Number(idleArg || 600) * 1000;
+
+const { main } = await import(pathToFileURL(modulePath).href);
+
+let idleTimer;
+let queue = Promise.resolve();
+
+function shutdown() {
+  server.close();
+  try {
+    fs.unlinkSync(socketPath);
+  } catch {
+    // Already gone
+  }
+  process.exit(0);
+}
+
+function resetIdle() {
+  clearTimeout(idleTimer);
+  idleTimer = setTimeout(shutdown, idleMs);
+}
+
+async function lint(request) {
+  const lines = [];
+  const log = (message) => lines.push(message);
+  let code;
+  try {
+    code = await main({
+      directory: request.directory,
+      argv: request.argv,
+      nonFileContents: request.nonFileContents,
+      optionsOverride: request.optionsOverride,
+      logMessage: log,
+      logError: log,
+    });
+  } catch (error) {
+    lines.push(String(error && error.stack ? error.stack : error));
+    code = 2;
+  }
+  return { code, output: lines.join("\n") };
+}
+
+const server = net.createServer((socket) => {
+  resetIdle();
+  let buffer = "";
+  socket.setEncoding("utf8");
+  socket.on("data", (chunk) => {
+    buffer += chunk;
+    const end = buffer.indexOf("\n");
+    if (end < 0) {
+      return;
+    }
+    let request;
+    try {
+      request = JSON.parse(buffer.slice(0, end));
+    } catch {
+      socket.end(JSON.stringify({ code: 2, output: "invalid request" }) + "\n");
+      return;
+    }
+    if (request.op === "stop") {
+      socket.end(JSON.stringify({ code: 0, output: "" }) + "\n", shutdown);
+      return;
+    }
+    queue = queue.then(async () => {
+      const response = await lint(request);
+      socket.end(JSON.stringify(response) + "\n");
+      resetIdle();
+    });
+  });
+  socket.on("error", () => {});
+});
+
+// A socket file left by a crashed worker would make listen() fail
+try {
+  fs.unlinkSync(socketPath);
+} catch {
+  // Nothing to clean up
+}
+server.listen(socketPath, () => {
+  fs.chmodSync(socketPath, 0o600);
+  resetIdle();
+});
+server.on("error", () => process.exit(1));
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Optional org-wide cap on open AI-created issues and PRs.
+
+Agents that work across every repository of an org can stay under each
+repo's own cap while flooding the org as a whole. An .issue-limits.yaml
+found upward from the target repository (one in a directory holding all of
+an org's checkouts covers them all) turns on an aggregate cap:
+
+  org:
+    name: JacobPEvans
+    max_ai_created: 60      # open ai-created issues + PRs across the repos
+    repos:                  # optional; default: the owner's first 100
+      - claude-code-plugins #   non-archived repositories
+      - nix-config
+
+Counts for every repository come from one GraphQL query (one aliased
+repository field per configured repo, or one page of the owner's
+repositories), cached per org for TTL seconds and refreshed single-flight
+like the per-repo snapshots. record-gh-create.py bumps the cached count
+after an ai-created create, so it stays correct for its whole TTL.
+"""
+
+import json
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from config_discovery import find_config
+from guard_state import content_hash, load_json, locked, save_json, state_path
+from issue_snapshot import AI_LABEL
+
+CONFIG_NAME = ".issue-limits.yaml"
+TTL_SECONDS = 60
+MAX_REPOS = 100
+
+_COUNTS = (
+    'issues(states: OPEN, labels: ["%(label)s"]) { totalCount } '
+    'pullRequests(states: OPEN, labels: ["%(label)s"]) { totalCount }'
+) % {"label": AI_LABEL}
+
+
+@dataclass(frozen=True)
+class OrgLimit:
+    """An org-wide cap from .issue-limits.yaml."""
+
+    name: str
+    max_ai_created: int
+    repos: tuple[str, ...] = field(default_factory=tuple)
+
+
+def load_org_limit(start: str | None) -> OrgLimit | None:
+    """The org cap configured for the repository at start, if any."""
+    found = find_config(CONFIG_NAME, str(start or Path.cwd()), max_levels=10)
+    if not found:
+        return None
+    try:
+        import yaml
+        with open(found, encoding="utf-8") as f:
+            org = (yaml.safe_load(f) or {})["org"]
+        repos = tuple(str(r) for r in org.get("repos") or ())
+        return OrgLimit(str(org["name"]), int(org["max_ai_created"]), repos[:MAX_REPOS])
+    except Exception:
+        return None  # fail-open: a broken config disables the org cap
+
+
+def build_query(limit: OrgLimit) -> str:
+    if limit.repos:
+        owner = json.dumps(limit.name)
+        fields = "\n".join(
+            f"  r{i}: repository(owner: {owner}, name: {json.dumps(repo)}) {{ name {_COUNTS} }}"
+            for i, repo in enumerate(limit.repos)
+        )
+        return f"query OrgLimits {{\n{fields}\n}}"
+    return (
+        "query OrgLimits($login: String!) {\n"
+        "  owner: repositoryOwner(login: $login) {\n"
+        f"    repositories(first: {MAX_REPOS}, isArchived: false) {{ nodes {{ name {_COUNTS} }} }}\n"
+        "  }\n"
+        "}"
+    )
+
+
+def parse_counts(payload: object) -> dict[str, int] | None:
+    """Open AI-created items per repository name, or None if not a response."""
+    try:
+        data = payload["data"]  # type: ignore[index]
+        if "owner" in data:
+            nodes = data["owner"]["repositories"]["nodes"] if data["owner"] else []
+        else:
+            nodes = list(data.values())
+        return {
+            n["name"]: int(n["issues"]["totalCount"]) + int(n["pullRequests"]["totalCount"])
+            for n in nodes if n  # Missing or inaccessible repos come back null
+        }
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+
+def fetch_counts(limit: OrgLimit, timeout: float = 30) -> dict[str, int] | None:
+    """One `gh api graphql` call for every repository; None on failure."""
+    args = ["gh", "api", "graphql", "-f", f"query={build_query(limit)}"]
+    if not limit.repos:
+        args += ["-F", f"login={limit.name}"]
+    try:
+        result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+        # A configured repo that does not exist is a GraphQL error (non-zero
+        # exit) alongside the data for the others, which still counts
+        counts = parse_counts(json.loads(result.stdout))
+    except (OSError, subprocess.SubprocessError, json.JSONDecodeError) as e:
+        print(f"Warning: gh api graphql failed: {e}", file=sys.stderr)
+        return None
+    if counts is None:
+        print(f"Warning: org counts unavailable: {result.stderr.strip()}", file=sys.stderr)
+    return counts
+
+
+def _cache_path(limit: OrgLimit) -> Path:
+    key = "\n".join((limit.name.lower(), *sorted(limit.repos)))
+    return state_path("org-counts", f"{content_hash(key)[:24]}.json")
+
+
+def _fresh(entry: object) -> dict[str, int] | None:
+    if not isinstance(entry, dict) or not isinstance(entry.get("counts"), dict):
+        return None
+    age = time.time() - entry.get("fetched_at", 0)
+    return entry["counts"] if 0 <= age < TTL_SECONDS else None
+
+
+def cached_counts(
+    limit: OrgLimit, fetch: Callable[[], dict[str, int] | None]
+) -> dict[str, int] | None:
+    """Return fresh cached per-repo counts, or fetch them (single-flight)."""
+    path = _cache_path(limit)
+    counts = _fresh(load_json(path))
+    if counts is not None:
+        return counts
+    with locked(path):
+        counts = _fresh(load_json(path))
+        if counts is not None:
+            return counts
+        counts = fetch()
+        if counts is not None:
+            save_json(path, {"fetched_at": time.time(), "counts": counts})
+        return counts
+
+
+def record_org_created(limit: OrgLimit, owner: str, repo: str) -> bool:
+    """Account for a just-created ai-created item in the cached counts, if any."""
+    if owner.lower() != limit.name.lower() or (limit.repos and repo not in limit.repos):
+        return False
+    path = _cache_path(limit)
+    with locked(path):
+        entry = load_json(path)
+        counts = _fresh(entry)
+        if counts is None:
+            return False
+        counts[repo] = counts.get(repo, 0) + 1
+        save_json(path, {**entry, "counts": counts})
+        return True
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Stale-branch cleanup plan and batch delete.
+
+Shows the ranked plan the branch-limiter prints when it blocks, and with
+--apply deletes the branches in it: one `git branch -d` for merged local
+branches and one `git push <remote> --delete` per remote for merged
+remote branches. Gone-on-remote local branches are only deleted with
+--include-gone (via `git branch -D`, since they are usually squash-merged).
+
+Usage:
+  prune-stale-branches.py [--base REF] [--min-age-days N] [--top N]
+                          [--include-gone] [--apply] [--json]
+
+  --base REF         branch to check merges against (default: main, master
+                     or origin/HEAD)
+  --min-age-days N   report unmerged branches idle this long (default: 90)
+  --top N            candidates to list in the text report (default: 20)
+  --include-gone     also delete local branches whose upstream is gone
+  --apply            run the delete commands (default: print them)
+  --json             emit the plan as JSON instead of text
+
+Run `git fetch --prune` first so gone and merged remote branches are current.
+
+Exit codes:
+  0 = plan shown or applied
+  1 = a delete command failed
+  2 = usage or git error
+"""
+
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stale_branches import DEFAULT_MIN_AGE_DAYS, analyze, delete_commands, format_plan  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plan and batch-delete stale git branches.")
+    parser.add_argument("--base")
+    parser.add_argument("--min-age-days", type=int, default=DEFAULT_MIN_AGE_DAYS)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--include-gone", action="store_true")
+    parser.add_argument("--apply", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    try:
+        plan = analyze(args.base, args.min_age_days, timeout=60)
+    except (subprocess.SubprocessError, OSError, ValueError) as e:
+        print(f"prune-stale-branches: {e}", file=sys.stderr)
+        sys.exit(2)
+    commands = delete_commands(plan, args.include_gone)
+
+    if args.json:
+        print(json.dumps({
+            "branches": [asdict(b) for b in plan],
+            "commands": commands,
+        }, indent=2))
+    else:
+        print(format_plan(plan, args.top))
+        print()
+        if not commands:
+            print("Nothing to delete.")
+        for command in commands:
+            print(("Running: " if args.apply else "Would run: ") + shlex.join(command))
+
+    if not args.apply:
+        sys.exit(0)
+    failed = False
+    for command in commands:
+        failed |= subprocess.run(command).returncode != 0
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Persistent README compliance index, one per repository.
+
+Maps each README (relative to the repository root) to its size, mtime,
+content hash, governing .readme-validator.yaml and validation result. A
+README is re-read only when its size or mtime moved, and re-validated only
+when its content hash or its config changed, so auditing a monorepo with
+hundreds of plugin READMEs costs one stat per README once the index is
+warm. The readme-validator hook and scan-markdown.py (and through it the
+/validate-readme skill) share the index, so either keeps it current for
+the other.
+
+`readme_index.py failing [PATH]` lists the non-compliant READMEs recorded
+for the repository containing PATH without touching the READMEs; run
+scan-markdown.py --no-lint first to bring the index up to date.
+
+Config changes are caught through config_discovery: creating or removing a
+nearer .readme-validator.yaml changes the governing path, and editing one
+changes its stamp (mtime and size).
+"""
+
+import os
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from guard_state import content_hash, load_json, locked, save_json, state_path
+from readme_rules import RESULT_VERSION, find_config_file, load_config, validate
+from repo_files import find_git_root
+
+# A file modified this close to when it was indexed may change again within
+# the same mtime tick, so its stat is not trusted (as git does)
+RACY_SECONDS = 2
+
+
+def _stamp(path: Path | None) -> list | None:
+    if path is None:
+        return None
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [str(path), st.st_mtime_ns, st.st_size]
+
+
+class ReadmeIndex:
+    """Compliance entries for the READMEs under one repository root."""
+
+    def __init__(self, root: Path):
+        self.root = root.resolve()
+        self.path = state_path("readme-index", content_hash(str(self.root))[:24] + ".json")
+        data = load_json(self.path, {})
+        valid = isinstance(data, dict) and data.get("version") == RESULT_VERSION
+        self.entries: dict[str, dict] = data.get("entries", {}) if valid else {}
+        self._changed: dict[str, dict | None] = {}
+
+    @classmethod
+    def for_path(cls, path: Path) -> "ReadmeIndex":
+        """The index of the repository containing path (else its directory)."""
+        parent = path.resolve().parent
+        return cls(find_git_root(parent) or parent)
+
+    def check(
+        self,
+        path: Path,
+        validator: Callable[[str, dict], tuple[list[str], list[str]]] = validate,
+    ) -> tuple[list[str], list[str]] | None:
+        """(errors, warnings) for path, from the index while still current."""
+        path = path.resolve()
+        rel = os.path.relpath(path, self.root)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        config_file = find_config_file(path)
+        config = _stamp(config_file)
+        entry = self.entries.get(rel)
+        fresh = entry is not None and entry.get("config") == config
+        racy = fresh and entry["mtime"] >= entry["indexed"] - RACY_SECONDS * 1_000_000_000
+        if fresh and not racy and [entry["mtime"], entry["size"]] == [st.st_mtime_ns, st.st_size]:
+            return entry["errors"], entry["warnings"]
+
+        try:
+            content = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+        digest = content_hash(content)
+        if fresh and entry["hash"] == digest:
+            errors, warnings = entry["errors"], entry["warnings"]
+        else:
+            errors, warnings = validator(content, load_config(path))
+        self._set(rel, {
+            "mtime": st.st_mtime_ns,
+            "size": st.st_size,
+            "indexed": time.time_ns(),
+            "hash": digest,
+            "config": config,
+            "errors": errors,
+            "warnings": warnings,
+        })
+        return errors, warnings
+
+    def prune(self, under: Path, present: set[Path]) -> None:
+        """Drop entries below under whose READMEs are not in present."""
+        prefix = os.path.relpath(under.resolve(), self.root)
+        keep = {os.path.relpath(p.resolve(), self.root) for p in present}
+        for rel in list(self.entries):
+            inside = prefix == "." or rel == prefix or rel.startswith(prefix + os.sep)
+            if inside and rel not in keep:
+                self._set(rel, None)
+
+    def failing(self) -> dict[str, list[str]]:
+        """Errors of every indexed README that is not compliant."""
+        return {rel: e["errors"] for rel, e in sorted(self.entries.items()) if e["errors"]}
+
+    def _set(self, rel: str, entry: dict | None) -> None:
+        if entry is None:
+            self.entries.pop(rel, None)
+        else:
+            self.entries[rel] = entry
+        self._changed[rel] = entry
+
+    def save(self) -> None:
+        """Merge this run's changes into the stored index."""
+        if not self._changed:
+            return
+        with locked(self.path):
+            data = load_json(self.path, {})
+            valid = isinstance(data, dict) and data.get("version") == RESULT_VERSION
+            entries = data.get("entries", {}) if valid else {}
+            for rel, entry in self._changed.items():
+                if entry is None:
+                    entries.pop(rel, None)
+                else:
+                    entries[rel] = entry
+            save_json(self.path, {"version": RESULT_VERSION, "entries": entries})
+        self.entries = entries
+        self._changed = {}
+
+
+def main() -> None:
+    if len(sys.argv) in (2, 3) and sys.argv[1] == "failing":
+        start = Path(sys.argv[2] if len(sys.argv) == 3 else ".").resolve()
+        index = ReadmeIndex(find_git_root(start) or start)
+        failing = index.failing()
+        for rel, errors in failing.items():
+            print(rel)
+            for error in errors:
+                print(f"  - {error}")
+        sys.exit(1 if failing else 0)
+    print("usage: readme_index.py failing [PATH]", file=sys.stderr)
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
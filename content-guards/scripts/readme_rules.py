@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+README validation rules shared by the readme-validator hook
+(validate-readme.py) and the repo-wide scanner (scan-markdown.py).
+
+A README is parsed once into an outline (markdown_outline.py) that every
+check reads. Results are cached in the README index (readme_index.py).
+
+Configuration: .readme-validator.yaml (searched upward from the README)
+"""
+
+from pathlib import Path
+
+from config_discovery import find_config
+from markdown_outline import Outline, parse_outline
+
+README_RE = r"README.*\.md$"
+
+# Bump when validation logic changes, so cached results are not reused
+RESULT_VERSION = 1
+
+
+def find_config_file(start_path: Path) -> Path | None:
+    """
+    Search upward from file's directory for .readme-validator.yaml.
+
+    Walks up to 10 directory levels, similar to how git finds .git/.
+    The walk is shared with the other validators through config_discovery.
+    """
+    current = start_path if start_path.is_dir() else start_path.parent
+    found = find_config(".readme-validator.yaml", str(current), max_levels=10)
+    return Path(found) if found else None
+
+
+def parse_simple_yaml(text: str) -> dict:
+    """Parse the subset of YAML used by .readme-validator.yaml (scalars and lists)."""
+    result: dict = {}
+    current_key = None
+    current_list: list[str] | None = None
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and current_key is not None:
+            if current_list is None:
+                current_list = []
+            current_list.append(stripped[2:].strip())
+            continue
+        if current_key is not None:
+            if current_list is not None:
+                result[current_key] = current_list
+            current_list = None
+            current_key = None
+        if ":" in stripped:
+            key, _, value = stripped.partition(":")
+            key = key.strip()
+            value = value.strip()
+            if value:
+                result[key] = value
+            else:
+                current_key = key
+    if current_key is not None and current_list is not None:
+        result[current_key] = current_list
+    return result
+
+
+def load_config(file_path: Path) -> dict:
+    """Load README validation config from .readme-validator.yaml."""
+    defaults = {
+        "required_sections": ["Installation", "Usage"],
+        "optional_sections": ["Contributing", "License", "API"],
+    }
+    config_path = find_config_file(file_path)
+    if not config_path:
+        return defaults
+    try:
+        text = config_path.read_text(encoding="utf-8")
+        config = parse_simple_yaml(text)
+        return {
+            "required_sections": config.get(
+                "required_sections", defaults["required_sections"]
+            ),
+            "optional_sections": config.get(
+                "optional_sections", defaults["optional_sections"]
+            ),
+        }
+    except (OSError, ValueError):
+        return defaults
+
+
+def check_required_sections(outline: Outline, required: list[str]) -> list[str]:
+    """Check that all required sections exist. Returns list of missing section names."""
+    headings_lower = {h.lower() for h in outline.titles(max_level=3)}
+    return [s for s in required if s.lower() not in headings_lower]
+
+
+def check_install_code_blocks(outline: Outline) -> bool:
+    """Check that the Installation section contains at least one code block."""
+    heading = outline.find("Installation", max_level=3)
+    if heading is None:
+        return True  # No Installation section; required-sections check handles this
+    return bool(outline.code_in(heading))
+
+
+def validate(content: str, config: dict) -> tuple[list[str], list[str]]:
+    """Errors and warnings for README content, from a single outline pass."""
+    outline = parse_outline(content)
+    errors = []
+    warnings = []
+
+    missing = check_required_sections(outline, config["required_sections"])
+    if missing:
+        errors.append(f"Missing required sections: {', '.join(missing)}")
+
+    if not check_install_code_blocks(outline):
+        warnings.append(
+            "Installation section has no code blocks "
+            "(expected at least one ``` code block with install steps)"
+        )
+
+    # Check optional sections (warnings only)
+    missing_optional = check_required_sections(outline, config["optional_sections"])
+    if missing_optional:
+        warnings.append(f"Missing optional sections: {', '.join(missing_optional)}")
+    return errors, warnings
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Claude Code PostToolUse hook that records successful `gh issue create` and
+`gh pr create` commands.
+
+Appends the creation to the local ledger that enforce-issue-limits.py
+counts its 24h rate limit from, and bumps the cached repo snapshot (open
+count, AI-created count, titles), the title similarity index and, for
+ai-created items, the org-wide counts (org_limits.py), so none of them
+needs a network call to stay correct after a create.
+
+A create counts as successful when gh printed the new item's URL.
+
+Always exits 0: recording never blocks anything.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from creation_ledger import CreationLedger  # noqa: E402
+from gh_command import CMD_RE, extract_labels, extract_repo_dir, extract_title  # noqa: E402
+from issue_snapshot import AI_LABEL  # noqa: E402
+from org_limits import load_org_limit, record_org_created  # noqa: E402
+from snapshot_cache import record_created, repo_key  # noqa: E402
+from title_index import TitleIndex  # noqa: E402
+
+_URL_RE = re.compile(r"https://[^/\s]+/([^/\s]+)/([^/\s]+)/(?:issues|pull)/(\d+)")
+
+
+def _stdout(tool_response: object) -> str:
+    if isinstance(tool_response, dict):
+        return str(tool_response.get("stdout", ""))
+    return str(tool_response or "")
+
+
+def main() -> None:
+    try:
+        hook_input = json.load(sys.stdin)
+    except (json.JSONDecodeError, ValueError):
+        sys.exit(0)
+
+    command = hook_input.get("tool_input", {}).get("command", "")
+    match = CMD_RE.search(command)
+    if not match or match.group(2) != "create":
+        sys.exit(0)
+
+    created = _URL_RE.search(_stdout(hook_input.get("tool_response")))
+    if not created:
+        sys.exit(0)  # Failed or interrupted create: nothing to record
+
+    resource, repo_dir = match.group(1), extract_repo_dir(command)
+    number, title = int(created.group(3)), extract_title(command) or ""
+    ai_created = AI_LABEL in extract_labels(command)
+    CreationLedger(repo_key(repo_dir), resource).append()
+    record_created(resource, repo_dir, number, title, ai_created)
+    limit = load_org_limit(repo_dir) if ai_created else None
+    if limit is not None:
+        record_org_created(limit, created.group(1), created.group(2))
+    if title:
+        try:
+            TitleIndex(repo_key(repo_dir), resource).add(number, title)
+        except (OSError, sqlite3.Error):
+            pass
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Read branch names straight from a repository's files ref store.
+
+Branch refs live in two places under the git common directory: the
+packed-refs file and loose ref files under refs/heads and refs/remotes.
+Reading both lists every branch without spawning git, which matters for
+repos with thousands of remote branches where `git branch -r` has to
+format every one of them just so the caller can count lines.
+
+Repositories using the reftable backend (or anything unreadable) return
+None so the caller can fall back to asking git.
+"""
+
+import os
+import re
+from pathlib import Path
+
+HEADS = "refs/heads/"
+REMOTES = "refs/remotes/"
+
+
+def uses_reftable(common_dir: Path) -> bool:
+    if (common_dir / "reftable").is_dir():
+        return True
+    try:
+        config = (common_dir / "config").read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return False
+    return re.search(r"^\s*refstorage\s*=\s*reftable\s*$", config, re.I | re.M) is not None
+
+
+def packed_refs(common_dir: Path) -> list[str]:
+    """Ref names in packed-refs (missing file means nothing is packed)."""
+    try:
+        with open(common_dir / "packed-refs", "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    names = []
+    for line in data.splitlines():
+        # "<sha> <refname>"; "#" is the header, "^" a peeled tag object
+        if not line or line[:1] in (b"#", b"^"):
+            continue
+        _, _, name = line.partition(b" ")
+        names.append(os.fsdecode(name.strip()))
+    return names
+
+
+def _loose(common_dir: Path, prefix: str) -> list[str]:
+    """Ref names of the loose ref files under prefix (e.g. refs/heads/)."""
+    names = []
+    base = common_dir / prefix
+    for dirpath, _, filenames in os.walk(base):
+        rel = os.path.relpath(dirpath, base)
+        for filename in filenames:
+            if filename.endswith(".lock"):
+                continue  # A ref update in progress, not a ref
+            name = filename if rel == "." else f"{rel}/{filename}"
+            names.append(prefix + name.replace(os.sep, "/"))
+    return names
+
+
+def read_branch_refs(common_dir: Path) -> tuple[set[str], set[str]] | None:
+    """
+    Local branch names ("main") and remote-tracking names ("origin/main")
+    of the repository whose common git directory is common_dir, or None
+    when the ref store cannot be read directly.
+    """
+    if uses_reftable(common_dir) or not (common_dir / "refs").is_dir():
+        return None
+    try:
+        refs = packed_refs(common_dir) + _loose(common_dir, HEADS) + _loose(common_dir, REMOTES)
+    except OSError:
+        return None
+    return split_refs(refs)
+
+
+def split_refs(refs: list[str]) -> tuple[set[str], set[str]]:
+    """Local branch and remote-tracking names among full ref names."""
+    local: set[str] = set()
+    remote: set[str] = set()
+    for ref in refs:
+        if ref.startswith(HEADS):
+            local.add(ref[len(HEADS):])
+        elif ref.startswith(REMOTES):
+            remote.add(ref[len(REMOTES):])
+    return local, remote
+
+
+def unique_branches(local: set[str], remote: set[str]) -> set[str]:
+    """
+    Branch names across local and remote, deduplicated: a remote-tracking
+    name counts under its name without the remote (origin/main -> main),
+    and each remote's HEAD symref is skipped.
+    """
+    branches = set(local)
+    for name in remote:
+        if name.endswith("/HEAD") or name == "HEAD":
+            continue
+        branches.add(name.split("/", 1)[1] if "/" in name else name)
+    return branches
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+File discovery shared by the repo-wide content-guards CLIs.
+
+Inside a git work tree the file list comes from git itself, so .gitignore,
+.git/info/exclude and global excludes are honoured exactly. Outside git,
+falls back to a directory walk that skips dot-directories.
+"""
+
+import os
+import subprocess
+from pathlib import Path
+
+
+def find_git_root(start: Path) -> Path | None:
+    """Walk upward from start to the directory containing .git (dir or file)."""
+    current = start.resolve()
+    while True:
+        if (current / ".git").exists():
+            return current
+        if current.parent == current:
+            return None
+        current = current.parent
+
+
+def find_git_common_dir(start: Path) -> Path | None:
+    """
+    The git directory shared by every worktree of the repository containing
+    start (the .git directory, or the main one for linked worktrees), found
+    without running git.
+    """
+    root = find_git_root(start)
+    if root is None:
+        return None
+    dotgit = root / ".git"
+    if dotgit.is_dir():
+        return dotgit
+    try:
+        line = dotgit.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not line.startswith("gitdir:"):
+        return None
+    gitdir = (root / line[len("gitdir:"):].strip()).resolve()
+    try:
+        common = (gitdir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return gitdir
+    return (gitdir / common).resolve()
+
+
+def _git_lines(args: list[str], cwd: Path) -> list[str]:
+    result = subprocess.run(
+        ["git", *args],
+        capture_output=True,
+        check=True,
+        timeout=60,
+        cwd=cwd,
+    )
+    return [p for p in result.stdout.decode("utf-8", "replace").split("\0") if p]
+
+
+def _walk(root: Path) -> list[Path]:
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        files.extend(Path(dirpath, name) for name in sorted(filenames))
+    return files
+
+
+def list_files(root: Path, since: str | None = None) -> list[Path]:
+    """
+    List regular files under root, honouring .gitignore.
+
+    With since, only files added/changed relative to that git ref (committed,
+    staged or unstaged) plus untracked files are returned.
+
+    Raises ValueError when since is given outside a git work tree, and
+    subprocess.SubprocessError / OSError when git itself fails.
+    """
+    root = root.resolve()
+    if find_git_root(root) is None:
+        if since:
+            raise ValueError(f"--since requires a git work tree: {root}")
+        return _walk(root)
+
+    untracked = _git_lines(
+        ["ls-files", "-z", "--others", "--exclude-standard", "--", "."], root
+    )
+    if since:
+        tracked = _git_lines(
+            ["diff", "-z", "--name-only", "--relative", "--diff-filter=d", since, "--"],
+            root,
+        )
+    else:
+        tracked = _git_lines(["ls-files", "-z", "--cached", "--", "."], root)
+
+    paths = (root / rel for rel in sorted(set(tracked) | set(untracked)))
+    return [p for p in paths if p.is_file()]
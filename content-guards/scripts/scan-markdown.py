@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Repo-wide Markdown and README validator.
+
+Applies the markdown-validator (markdownlint-cli2) and readme-validator
+rules to every Markdown file in a tree in one run, instead of one hook
+process per file.
+
+Usage:
+  scan-markdown.py [ROOT] [--since REF] [--jobs N] [--no-lint] [--json]
+
+  ROOT         directory to scan (default: current directory)
+  --since REF  only check files changed since REF (plus untracked files);
+               intended for pre-commit and CI runs
+  --jobs N     parallel markdownlint-cli2 runs (default: CPU count)
+  --no-lint    skip markdownlint-cli2; README rules only
+  --json       emit a machine-readable report instead of text
+
+Files are listed via git, so .gitignore is honoured; files under .claude/
+are skipped, as in the hooks. Configs are resolved once per directory:
+.readme-validator.yaml for README*.md files, and the nearest .markdownlint*
+project config (else ~/.markdownlint-cli2.yaml, else the hook's built-in
+fallback) for linting. Files sharing a lint directory and config are linted
+by one markdownlint-cli2 run, in batches spread over a thread pool.
+README results come from the repository's README index (readme_index.py),
+shared with the readme-validator hook: only READMEs whose content or
+config changed since they were last checked are read and validated, so
+--no-lint on an unchanged tree costs one stat per README.
+
+Unlike the hook, the scan never applies fixes.
+
+Exit codes:
+  0 = no errors (warnings allowed)
+  1 = one or more files have errors
+  2 = usage or git error
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config_discovery import find_markdownlint_dir  # noqa: E402
+from readme_index import ReadmeIndex  # noqa: E402
+from readme_rules import README_RE  # noqa: E402
+from repo_files import find_git_root, list_files  # noqa: E402
+
+BATCH_SIZE = 100  # Files per markdownlint-cli2 run
+LINT_TIMEOUT = 300
+
+# validate-markdown.sh's built-in fallback, without fix: true
+FALLBACK_CONFIG = """config:
+  default: true
+  MD013:
+    line_length: 160
+    heading_line_length: 120
+    code_block_line_length: 120
+    tables: false
+  MD060: false
+"""
+
+# markdownlint-cli2 default output: "path:line[:column] rule description"
+_LINT_LINE_RE = re.compile(r"^(.+?):(\d+)(?::\d+)? (.*)$")
+
+
+def _fallback_flags(tmp: str) -> list[str]:
+    """Config flags for files without a project config, as the hook picks them."""
+    home_config = Path.home() / ".markdownlint-cli2.yaml"
+    if home_config.is_file():
+        return ["--config", str(home_config)]
+    plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", "")
+    plugin_config = Path(plugin_root, "config", ".markdownlint-cli2.yaml")
+    if plugin_root and plugin_config.is_file():
+        return ["--config", str(plugin_config)]
+    fallback = Path(tmp, ".markdownlint-cli2.yaml")
+    fallback.write_text(FALLBACK_CONFIG, encoding="utf-8")
+    return ["--config", str(fallback)]
+
+
+def lint_groups(root: Path, paths: list[Path], fallback: list[str]) -> dict[tuple, list[Path]]:
+    """Group files by (lint directory, config flags), resolving each directory once."""
+    project_dirs: dict[Path, str | None] = {}
+    groups: dict[tuple, list[Path]] = defaultdict(list)
+    for path in paths:
+        directory = path.parent
+        if directory not in project_dirs:
+            project_dirs[directory] = find_markdownlint_dir(str(directory))
+        project = project_dirs[directory]
+        if project:
+            groups[(project, ())].append(path)
+        else:
+            groups[(str(root), tuple(fallback))].append(path)
+    return groups
+
+
+def run_lint(lint_dir: str, flags: tuple, batch: list[Path]) -> dict[Path, list[str]]:
+    """One markdownlint-cli2 run; lint errors per file."""
+    rels = {os.path.relpath(p, lint_dir): p for p in batch}
+    try:
+        result = subprocess.run(
+            ["markdownlint-cli2", *flags, *rels],
+            cwd=lint_dir,
+            capture_output=True,
+            text=True,
+            timeout=LINT_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        return {p: [f"markdownlint-cli2 failed: {e}"] for p in batch}
+
+    errors: dict[Path, list[str]] = defaultdict(list)
+    for line in (result.stdout + result.stderr).splitlines():
+        match = _LINT_LINE_RE.match(line)
+        if match and match.group(1) in rels:
+            errors[rels[match.group(1)]].append(f"line {match.group(2)}: {match.group(3)}")
+    if result.returncode not in (0, 1) or (result.returncode == 1 and not errors):
+        detail = (result.stderr or result.stdout).strip().splitlines()[-1:] or ["no output"]
+        return {p: [f"markdownlint-cli2 failed: {detail[0]}"] for p in batch}
+    return errors
+
+
+def scan(root: Path, since: str | None, jobs: int | None, lint: bool) -> dict:
+    """Validate every Markdown file under root and build a per-file report."""
+    paths = [
+        p for p in list_files(root, since)
+        if p.suffix == ".md" and ".claude" not in p.relative_to(root).parts
+    ]
+    lint = lint and shutil.which("markdownlint-cli2") is not None
+
+    lint_errors: dict[Path, list[str]] = {}
+    with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = []
+        if lint:
+            for (lint_dir, flags), members in lint_groups(root, paths, _fallback_flags(tmp)).items():
+                for i in range(0, len(members), BATCH_SIZE):
+                    futures.append(pool.submit(run_lint, lint_dir, flags, members[i:i + BATCH_SIZE]))
+
+        # README rules are cheap; check them while the linters run
+        index = ReadmeIndex(find_git_root(root) or root)
+        readmes = {p for p in paths if re.match(README_RE, p.name, re.IGNORECASE)}
+        readme: dict[Path, tuple[list[str], list[str]]] = {}
+        for path in readmes:
+            result = index.check(path)
+            if result is not None:
+                readme[path] = result
+        if since is None:
+            index.prune(root, readmes)  # Deleted or now-ignored READMEs
+        index.save()
+
+        for future in futures:
+            lint_errors.update(future.result())
+
+    files = []
+    for path in paths:
+        errors, warnings = readme.get(path, ([], []))
+        errors = lint_errors.get(path, []) + errors
+        status = "fail" if errors else "warn" if warnings else "pass"
+        files.append({
+            "file": str(path.relative_to(root)),
+            "status": status,
+            "errors": errors,
+            "warnings": warnings,
+        })
+    return {
+        "root": str(root),
+        "since": since,
+        "linted": lint,
+        "files": files,
+        "failures": sum(1 for f in files if f["status"] == "fail"),
+    }
+
+
+def print_text(report: dict) -> None:
+    for f in report["files"]:
+        if f["status"] == "pass":
+            continue
+        print(f"{f['status'].upper()}  {f['file']}")
+        for error in f["errors"]:
+            print(f"  - {error}")
+        for warning in f["warnings"]:
+            print(f"  ~ {warning}")
+    summary = f"Checked {len(report['files'])} Markdown files, {report['failures']} with errors"
+    if not report["linted"]:
+        summary += " (markdownlint-cli2 not run)"
+    print(summary)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Validate every Markdown file and README in a tree.")
+    parser.add_argument("root", nargs="?", default=".", type=Path)
+    parser.add_argument("--since", metavar="REF")
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--no-lint", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    root = args.root.resolve()
+    if not root.is_dir():
+        parser.error(f"not a directory: {args.root}")
+
+    try:
+        report = scan(root, args.since, args.jobs, not args.no_lint)
+    except (ValueError, OSError, subprocess.SubprocessError) as e:
+        print(f"scan-markdown: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_text(report)
+    sys.exit(1 if report["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
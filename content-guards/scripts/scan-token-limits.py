@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Repo-wide token limit scanner.
+
+Applies the same .token-limits.yaml rules as the validate-token-limits.py
+hook to every file in a tree, so existing violations and the total context
+cost of each directory are visible without touching files one by one.
+
+Usage:
+  scan-token-limits.py [ROOT] [--since REF] [--jobs N] [--top N] [--json]
+
+  ROOT         directory to scan (default: current directory)
+  --since REF  only recount files changed since REF (plus untracked files);
+               intended for pre-commit and CI runs. The report is labelled
+               incremental and has no per-directory totals, which would
+               count only the changed files
+  --jobs N     worker processes (default: CPU count)
+  --top N      directories to show in the text report (default: 20)
+  --json       emit a machine-readable report instead of text
+
+Files are listed via git, so .gitignore is honoured. Token counts are cached
+by content hash, so unchanged files cost one hash on subsequent runs.
+
+Directories matching directory_limits in .token-limits.yaml are checked
+against their aggregate budget, and their token index (used by the hook to
+enforce budgets incrementally) is rebuilt from the scan; with --since only
+the changed files' entries are updated.
+
+Exit codes:
+  0 = no violations
+  1 = one or more files exceed their limit or directories their budget
+  2 = usage or git error
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from repo_files import list_files  # noqa: E402
+from token_index import directory_budget, directory_total, record_directory  # noqa: E402
+from token_limits import (  # noqa: E402
+    cached_count_tokens,
+    find_config_file,
+    get_file_limit,
+    is_binary_path,
+    load_config,
+    load_directory_limits,
+)
+
+
+def _count_file(path: str) -> int | None:
+    """Worker: token count for one file, None when unreadable or uncountable."""
+    try:
+        content = Path(path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    if not content:
+        return 0
+    return cached_count_tokens(content)
+
+
+def _parent_dirs(rel: Path) -> list[str]:
+    """All ancestor directories of a relative path, including '.'."""
+    return ["."] + [str(p) for p in reversed(rel.parents) if str(p) != "."]
+
+
+def scan(root: Path, since: str | None, jobs: int | None) -> dict:
+    """Count every file under root and build per-file and per-directory reports."""
+    config_path = find_config_file(root)
+    limits, default_limit = load_config(config_path)
+    dir_limits = load_directory_limits(config_path)
+    paths = [p for p in list_files(root, since) if not is_binary_path(str(p))]
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        counts = list(pool.map(_count_file, [str(p) for p in paths], chunksize=16))
+
+    files = []
+    dirs: dict[str, dict[str, int]] = defaultdict(
+        lambda: {"files": 0, "tokens": 0, "violations": 0}
+    )
+    members: dict[str, dict[str, int]] = defaultdict(dict)
+    uncounted = 0
+    for path, tokens in zip(paths, counts):
+        if tokens is None:
+            uncounted += 1
+            continue
+        rel = path.relative_to(root)
+        limit = get_file_limit(str(path), limits, default_limit)
+        over = tokens > limit
+        files.append({"file": str(rel), "tokens": tokens, "limit": limit, "over": over})
+        for d in _parent_dirs(rel):
+            dirs[d]["files"] += 1
+            dirs[d]["tokens"] += tokens
+            dirs[d]["violations"] += int(over)
+            members[d][str(path)] = tokens
+
+    budgets = []
+    for d in dirs:
+        abs_dir = str(root if d == "." else root / d)
+        budget = directory_budget(abs_dir, dir_limits)
+        if budget is None:
+            continue
+        record_directory(abs_dir, members[d], complete=not since and not uncounted)
+        total = directory_total(abs_dir)
+        budgets.append({"directory": d, "tokens": total, "limit": budget, "over": total > budget})
+
+    return {
+        "root": str(root),
+        "since": since,
+        "incremental": since is not None,
+        "files": sorted(files, key=lambda f: f["file"]),
+        "directories": [] if since else [
+            {"directory": d, **stats}
+            for d, stats in sorted(dirs.items(), key=lambda kv: -kv[1]["tokens"])
+        ],
+        "budgets": sorted(budgets, key=lambda b: b["directory"]),
+        "uncounted": uncounted,
+        "violations": sum(1 for f in files if f["over"])
+        + sum(1 for b in budgets if b["over"]),
+    }
+
+
+def print_text(report: dict, top: int) -> None:
+    violations = [f for f in report["files"] if f["over"]]
+    if violations:
+        print(f"Token limit violations ({len(violations)}):")
+        for f in violations:
+            print(
+                f"  {f['file']}  {f['tokens']}/{f['limit']} "
+                f"(+{f['tokens'] - f['limit']})"
+            )
+        print()
+
+    over_budget = [b for b in report["budgets"] if b["over"]]
+    if over_budget:
+        print(f"Directory budget violations ({len(over_budget)}):")
+        for b in over_budget:
+            print(f"  {b['directory']}/  {b['tokens']}/{b['limit']} (+{b['tokens'] - b['limit']})")
+        print()
+
+    if report["incremental"]:
+        print(f"Incremental scan of files changed since {report['since']}; "
+              "run without --since for directory totals.")
+    else:
+        print("Directories by total tokens:")
+        for d in report["directories"][:top]:
+            print(
+                f"  {d['directory']:<48} {d['tokens']:>9} tokens "
+                f"{d['files']:>5} files {d['violations']:>4} over limit"
+            )
+    print()
+
+    scanned = f"{len(report['files'])}{' changed' if report['incremental'] else ''} files"
+    summary = f"Scanned {scanned}, {report['violations']} over limit or budget"
+    if report["uncounted"]:
+        summary += f" ({report['uncounted']} could not be counted — is atc installed?)"
+    print(summary)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scan a tree for token limit violations.")
+    parser.add_argument("root", nargs="?", default=".", type=Path)
+    parser.add_argument("--since", metavar="REF")
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    root = args.root.resolve()
+    if not root.is_dir():
+        parser.error(f"not a directory: {args.root}")
+
+    try:
+        report = scan(root, args.since, args.jobs)
+    except (ValueError, OSError, subprocess.SubprocessError) as e:
+        print(f"scan-token-limits: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_text(report, args.top)
+    sys.exit(1 if report["violations"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Per-repo cache of issue/PR snapshots shared by concurrent sessions.
+
+Parallel sub-agents often guard creates against the same repository at the
+same moment. Snapshots (issue_snapshot.RepoSnapshot) are cached for TTL
+seconds per repository and resource type, keyed by the git common
+directory so every worktree of a repo shares one entry. Refreshes are
+single-flight: the first process to find the entry stale takes a file lock
+and fetches; the others block on the lock and then read its result instead
+of issuing their own identical gh calls.
+
+record-gh-create.py bumps a cached snapshot after a successful create, so
+the cache stays correct for its whole TTL without a refetch.
+"""
+
+import os
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from guard_state import content_hash, load_json, locked, save_json, state_path
+from issue_snapshot import RepoSnapshot
+from repo_files import find_git_common_dir
+
+TTL_SECONDS = 60
+
+
+def repo_key(cwd: str | None = None) -> str:
+    """Stable identity of the repository containing cwd."""
+    start = Path(cwd or os.getcwd())
+    common = find_git_common_dir(start)
+    return str(common if common is not None else start.resolve())
+
+
+def _cache_path(key: str, resource: str) -> Path:
+    return state_path("issue-snapshots", f"{content_hash(key)[:24]}-{resource}.json")
+
+
+def _decode(entry: object) -> RepoSnapshot | None:
+    try:
+        data = dict(entry["snapshot"])  # type: ignore[index]
+        data["titles"] = [(int(n), str(t)) for n, t in data["titles"]]
+        return RepoSnapshot(**data)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _fresh(entry: object, require_recent: bool = False) -> RepoSnapshot | None:
+    if not isinstance(entry, dict):
+        return None
+    age = time.time() - entry.get("fetched_at", 0)
+    snapshot = _decode(entry) if 0 <= age < TTL_SECONDS else None
+    if snapshot is not None and require_recent and snapshot.recent_count is None:
+        return None
+    return snapshot
+
+
+def cached_snapshot(
+    resource: str,
+    cwd: str | None,
+    fetch: Callable[[], RepoSnapshot | None],
+    require_recent: bool = False,
+) -> RepoSnapshot | None:
+    """
+    Return a fresh cached snapshot, or fetch one (single-flight) and cache it.
+
+    With require_recent, a cached snapshot fetched without recent creations
+    does not count as fresh.
+    """
+    path = _cache_path(repo_key(cwd), resource)
+    snapshot = _fresh(load_json(path), require_recent)
+    if snapshot is not None:
+        return snapshot
+    with locked(path):
+        # Another process may have refreshed the entry while we waited
+        snapshot = _fresh(load_json(path), require_recent)
+        if snapshot is not None:
+            return snapshot
+        snapshot = fetch()
+        if snapshot is not None:
+            save_json(path, {"fetched_at": time.time(), "snapshot": asdict(snapshot)})
+        return snapshot
+
+
+def record_created(
+    resource: str, cwd: str | None, number: int, title: str, ai_created: bool
+) -> bool:
+    """Account for a just-created item in the cached snapshot, if any."""
+    path = _cache_path(repo_key(cwd), resource)
+    with locked(path):
+        entry = load_json(path)
+        snapshot = _fresh(entry)
+        if snapshot is None:
+            return False  # Nothing cached; the next check fetches anyway
+        snapshot.total += 1
+        snapshot.ai_created += int(ai_created)
+        snapshot.titles.insert(0, (number, title))
+        if snapshot.recent_count is not None:
+            snapshot.recent_count += 1
+            snapshot.recent.insert(0, datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
+        save_json(path, {**entry, "snapshot": asdict(snapshot)})
+        return True
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Stale-branch analysis for recovering from the branch limit.
+
+Every local and remote-tracking branch is classified from two bulk
+`git for-each-ref` queries, however many branches there are (one listing
+upstream tracking state and last-commit dates, one listing what is merged
+into the base branch), instead of one git process per branch:
+
+  merged  fully merged into the base branch: safe to delete
+  gone    local branch whose upstream was deleted on the remote (often
+          squash-merged): delete after review, needs `git branch -D`
+  old     no commit in at least min_age_days: review
+
+The plan deletes merged and (optionally) gone branches with one
+`git branch` call for local branches and one `git push --delete` call
+per remote.
+"""
+
+import subprocess
+import time
+from dataclasses import dataclass
+
+HEADS = "refs/heads/"
+REMOTES = "refs/remotes/"
+PROTECTED = ("main", "master")
+DEFAULT_MIN_AGE_DAYS = 90
+_RANK = {"merged": 0, "gone": 1, "old": 2}
+_FORMAT = "%(refname)%09%(upstream:track)%09%(committerdate:unix)%09%(worktreepath)%09%(symref)"
+
+
+@dataclass
+class StaleBranch:
+    name: str  # "feat/x" locally, "feat/x" on remote "origin"
+    remote: str | None
+    reason: str  # merged | gone | old
+    age_days: int
+
+    @property
+    def label(self) -> str:
+        return f"{self.remote}/{self.name}" if self.remote else self.name
+
+
+def _for_each_ref(args: list[str], cwd: str | None, timeout: float) -> list[list[str]]:
+    result = subprocess.run(
+        ["git", "for-each-ref", *args, HEADS, REMOTES],
+        capture_output=True, text=True, check=True, timeout=timeout, cwd=cwd,
+    )
+    return [line.split("\t") for line in result.stdout.splitlines() if line]
+
+
+def _split(ref: str) -> tuple[str | None, str]:
+    """(remote, branch) of a full ref name; remote is None for local branches."""
+    if ref.startswith(HEADS):
+        return None, ref[len(HEADS):]
+    remote, _, name = ref[len(REMOTES):].partition("/")
+    return remote, name
+
+
+def _default_base(refs: set[str], symrefs: dict[str, str]) -> str | None:
+    for name in PROTECTED:
+        if HEADS + name in refs:
+            return name
+    target = symrefs.get(REMOTES + "origin/HEAD")
+    return target[len(REMOTES):] if target else None
+
+
+def analyze(
+    base: str | None = None,
+    min_age_days: int = DEFAULT_MIN_AGE_DAYS,
+    cwd: str | None = None,
+    timeout: float = 10,
+    now: float | None = None,
+) -> list[StaleBranch]:
+    """
+    Ranked cleanup candidates: merged before gone before old, oldest first.
+
+    Raises subprocess.SubprocessError / OSError when git fails, ValueError
+    when no base branch is given or found.
+    """
+    rows = _for_each_ref([f"--format={_FORMAT}"], cwd, timeout)
+    refs = {row[0] for row in rows}
+    symrefs = {row[0]: row[4] for row in rows if len(row) > 4 and row[4]}
+    base = base or _default_base(refs, symrefs)
+    if not base:
+        raise ValueError("no base branch found; pass one explicitly")
+    merged = {row[0] for row in _for_each_ref([f"--merged={base}", "--format=%(refname)"], cwd, timeout)}
+
+    protected = {*PROTECTED, base, base.split("/", 1)[-1]}
+    now = now or time.time()
+    plan = []
+    for ref, track, date, worktree, symref in (row + [""] * (5 - len(row)) for row in rows):
+        remote, name = _split(ref)
+        if symref or name in protected or name == "HEAD" or (remote is None and worktree):
+            continue  # Symrefs, the base branch, and branches checked out somewhere
+        age_days = int((now - int(date or now)) // 86400)
+        if ref in merged:
+            reason = "merged"
+        elif remote is None and track == "[gone]":
+            reason = "gone"
+        elif age_days >= min_age_days:
+            reason = "old"
+        else:
+            continue
+        plan.append(StaleBranch(name, remote, reason, age_days))
+    plan.sort(key=lambda b: (_RANK[b.reason], -b.age_days, b.label))
+    return plan
+
+
+def delete_commands(plan: list[StaleBranch], include_gone: bool = False) -> list[list[str]]:
+    """
+    Batch commands deleting the plan's merged (and with include_gone, gone)
+    branches: one per kind of local delete, one push per remote.
+    """
+    merged_local = [b.name for b in plan if b.reason == "merged" and b.remote is None]
+    gone_local = [b.name for b in plan if b.reason == "gone"]
+    remotes: dict[str, list[str]] = {}
+    for b in plan:
+        if b.reason == "merged" and b.remote:
+            remotes.setdefault(b.remote, []).append(b.name)
+    commands = []
+    if merged_local:
+        commands.append(["git", "branch", "-d", *merged_local])
+    if include_gone and gone_local:
+        commands.append(["git", "branch", "-D", *gone_local])
+    for remote, names in sorted(remotes.items()):
+        commands.append(["git", "push", remote, "--delete", *names])
+    return commands
+
+
+def format_plan(plan: list[StaleBranch], top: int = 10) -> str:
+    """Human-readable summary of the plan, listing the top candidates."""
+    counts = {reason: sum(1 for b in plan if b.reason == reason) for reason in _RANK}
+    lines = [
+        f"  Stale branches: {counts['merged']} merged, {counts['gone']} gone on remote, "
+        f"{counts['old']} old"
+    ]
+    for b in plan[:top]:
+        lines.append(f"    {b.reason:<6}  {b.age_days:>4}d  {b.label}")
+    if len(plan) > top:
+        lines.append(f"    ... and {len(plan) - top} more")
+    return "\n".join(lines)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Tests for branch_cache.py.
+
+Verifies that the cached branch set matches a direct ref-store read, that
+only changed ref directories (or packed-refs) are reread, that linked
+worktrees share one entry, and that racy entries are not trusted.
+
+Run with: python3 content-guards/scripts/test_branch_cache.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["CONTENT_GUARDS_CACHE_DIR"] = tempfile.mkdtemp()
+sys.path.insert(0, str(Path(__file__).parent))
+
+import branch_cache  # noqa: E402
+from guard_state import load_json  # noqa: E402
+from ref_store import read_branch_refs  # noqa: E402
+from repo_files import find_git_common_dir  # noqa: E402
+
+
+def check(label: str, ok: bool, detail: object = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'} [{label}]")
+    if not ok:
+        print(f"  Got: {detail}")
+    return ok
+
+
+def git(*args: str, cwd: Path) -> None:
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def reread(common: Path) -> int:
+    """Refresh like cached_branch_refs does, returning how many parts were reread."""
+    entry = load_json(branch_cache._cache_path(common), {})
+    _, count = branch_cache._refresh(common, entry)
+    return count
+
+
+def tick() -> None:
+    time.sleep(0.05)  # Let the next change land in a later mtime tick
+
+
+all_pass = True
+branch_cache.RACY_SECONDS = 0.0
+
+repo = Path(tempfile.mkdtemp()) / "repo"
+repo.mkdir()
+git("init", "-q", "-b", "main", cwd=repo)
+git("-c", "user.email=t@example.com", "-c", "user.name=T", "commit", "-q", "--allow-empty", "-m", "init", cwd=repo)
+common = repo / ".git"
+sha = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo, capture_output=True, text=True).stdout.strip()
+for i in range(200):
+    git("update-ref", f"refs/remotes/origin/branch-{i}", sha, cwd=repo)
+git("pack-refs", "--all", cwd=repo)
+for i in range(3):
+    git("update-ref", f"refs/heads/feat/loose-{i}", sha, cwd=repo)
+
+tick()
+refs = branch_cache.cached_branch_refs(common)
+all_pass &= check("cold read matches the ref store", refs == read_branch_refs(common), refs)
+all_pass &= check("unchanged store rereads nothing", reread(common) == 0)
+
+tick()
+git("branch", "feat/new", cwd=repo)
+tick()
+all_pass &= check("create rereads only its directory", reread(common) == 1)
+refs = branch_cache.cached_branch_refs(common)
+all_pass &= check("created branch is counted", refs is not None and "feat/new" in refs[0], refs)
+
+tick()
+git("branch", "-D", "feat/loose-0", cwd=repo)
+tick()
+refs = branch_cache.cached_branch_refs(common)
+all_pass &= check("deleted branch is dropped", refs is not None and "feat/loose-0" not in refs[0], refs)
+
+tick()
+git("update-ref", "-d", "refs/remotes/origin/branch-7", cwd=repo)
+tick()
+refs = branch_cache.cached_branch_refs(common)
+all_pass &= check(
+    "deleting a packed ref rereads packed-refs",
+    refs is not None and "origin/branch-7" not in refs[1] and "origin/branch-8" in refs[1],
+    refs,
+)
+
+# Linked worktrees resolve to the same common dir, so share the entry
+worktree = repo.parent / "wt"
+git("worktree", "add", "-q", "-b", "wt-branch", str(worktree), cwd=repo)
+wt_common = find_git_common_dir(worktree)
+all_pass &= check("worktree shares the common dir", wt_common == common.resolve(), wt_common)
+refs = branch_cache.cached_branch_refs(wt_common)
+all_pass &= check("worktree sees its new branch", refs is not None and "wt-branch" in refs[0], refs)
+
+# Racy: a directory modified right before it was read is read again
+branch_cache.RACY_SECONDS = 60.0
+branch_cache.cached_branch_refs(common)
+all_pass &= check("racy entry is not trusted", reread(common) > 0)
+branch_cache.RACY_SECONDS = 0.0
+
+# Reftable repos are left to git
+(common / "reftable").mkdir()
+all_pass &= check("reftable repo returns None", branch_cache.cached_branch_refs(common) is None)
+
+print()
+print("ALL TESTS PASSED" if all_pass else "SOME TESTS FAILED")
+sys.exit(0 if all_pass else 1)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Tests for config_discovery.py.
+
+Verifies nearest-config lookup, level limits, markdownlint stop rules,
+that new configs are seen at once, and that nothing is persisted.
+
+Run with: python3 content-guards/scripts/test_config_discovery.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+WORK = tempfile.mkdtemp()
+os.environ["CONTENT_GUARDS_CACHE_DIR"] = os.path.join(WORK, "cache")
+sys.path.insert(0, str(Path(__file__).parent))
+
+import config_discovery as cd  # noqa: E402
+
+
+def check(label: str, ok: bool, detail: object = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'} [{label}]")
+    if not ok:
+        print(f"  Got: {detail}")
+    return ok
+
+
+all_pass = True
+
+root = Path(WORK, "proj")
+deep = root / "a" / "b" / "c"
+deep.mkdir(parents=True)
+(root / ".token-limits.yaml").write_text("defaults:\n  max_tokens: 10\n")
+(root / "a" / ".readme-validator.yaml").write_text("required_sections:\n")
+
+found = cd.find_config(".token-limits.yaml", str(deep))
+all_pass &= check("nearest .token-limits.yaml", found == str(root / ".token-limits.yaml"), found)
+
+found = cd.find_config(".readme-validator.yaml", str(deep))
+all_pass &= check("nearest .readme-validator.yaml", found == str(root / "a" / ".readme-validator.yaml"), found)
+
+found = cd.find_config(".token-limits.yaml", str(deep), max_levels=2)
+all_pass &= check("max_levels stops the walk", found is None, found)
+
+# markdownlint: config below .git is found, the walk stops at .git
+(root / ".git").mkdir()
+(root / ".markdownlint.json").write_text("{}")
+found = cd.find_markdownlint_dir(str(deep), home="/nonexistent-home")
+all_pass &= check("markdownlint config at project root", found == str(root), found)
+
+(root / ".markdownlint.json").unlink()
+(Path(WORK) / ".markdownlint.json").write_text("{}")
+found = cd.find_markdownlint_dir(str(deep), home="/nonexistent-home")
+all_pass &= check("markdownlint walk stops at .git", found is None, found)
+
+(root / ".git").rmdir()
+found = cd.find_markdownlint_dir(str(deep), home=WORK)
+all_pass &= check("markdownlint walk stops before HOME", found is None, found)
+
+# A config added between lookups is found by the next one
+(deep / ".token-limits.yaml").write_text("defaults:\n  max_tokens: 5\n")
+found = cd.find_config(".token-limits.yaml", str(deep))
+all_pass &= check("new config is discovered", found == str(deep / ".token-limits.yaml"), found)
+
+cache = Path(os.environ["CONTENT_GUARDS_CACHE_DIR"])
+all_pass &= check("no state written", not cache.exists() or not any(cache.iterdir()), list(cache.glob("*")))
+
+print()
+print("ALL TESTS PASSED" if all_pass else "SOME TESTS FAILED")
+sys.exit(0 if all_pass else 1)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Tests for creation_ledger.py.
+
+Verifies sliding-window counts via binary search, tolerance of a torn
+record, monotonic appends, and reconciliation against server times.
+
+Run with: python3 content-guards/scripts/test_creation_ledger.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ["CONTENT_GUARDS_CACHE_DIR"] = tempfile.mkdtemp()
+sys.path.insert(0, str(Path(__file__).parent))
+
+from creation_ledger import SKEW_SECONDS, CreationLedger  # noqa: E402
+
+
+def check(label: str, ok: bool, detail: object = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'} [{label}]")
+    if not ok:
+        print(f"  Got: {detail}")
+    return ok
+
+
+all_pass = True
+NOW = 1_800_000_000
+DAY = 86400
+
+ledger = CreationLedger("/repo/a/.git", "issue")
+all_pass &= check("cold ledger needs reconcile", ledger.needs_reconcile(NOW))
+all_pass &= check("cold ledger counts zero", ledger.count_since(NOW - DAY) == 0)
+
+# 5000 records one minute apart: 24h window holds the last 1441 of them
+ledger.path.parent.mkdir(parents=True, exist_ok=True)
+ledger.path.write_bytes(b"".join(b"%010d\n" % (NOW - 60 * i) for i in reversed(range(5000))))
+count = ledger.count_since(NOW - DAY)
+all_pass &= check("window count by binary search", count == 1441, count)
+all_pass &= check("window start is inclusive", ledger.count_since(NOW) == 1)
+all_pass &= check("future window is empty", ledger.count_since(NOW + 1) == 0)
+
+with open(ledger.path, "ab") as f:
+    f.write(b"18000")  # Torn write from an interrupted append
+count = ledger.count_since(NOW - DAY)
+all_pass &= check("torn tail is ignored", count == 1441, count)
+
+ledger.append(NOW - 10)  # Older than the last record: clamped to keep order
+count = ledger.count_since(NOW)
+all_pass &= check("append repairs tail and stays sorted", count == 2, count)
+
+# Reconcile: server knows three items; one local record matches the newest,
+# one is newer than the server has indexed
+other = CreationLedger("/repo/b/.git", "pr")
+other.append(NOW - 5)
+other.append(NOW + SKEW_SECONDS + 30)
+other.reconcile([NOW - 7200, NOW - 3600, NOW - 10], 3, NOW - DAY)
+count = other.count_since(NOW - DAY)
+all_pass &= check("reconcile keeps only unindexed local records", count == 4, count)
+all_pass &= check("reconciled ledger is warm", not other.needs_reconcile())
+
+# Server total above the returned times: missing entries are filled in
+padded = CreationLedger("/repo/c/.git", "issue")
+padded.reconcile([NOW - 100], 30, NOW - DAY)
+count = padded.count_since(NOW - DAY)
+all_pass &= check("truncated server list is padded to its total", count == 30, count)
+
+# Expired server times and local records are dropped
+padded.reconcile([NOW - 2 * DAY], 1, NOW + DAY)
+count = padded.count_since(0)
+all_pass &= check("expired records are dropped", count == 0, count)
+
+print()
+print("ALL TESTS PASSED" if all_pass else "SOME TESTS FAILED")
+sys.exit(0 if all_pass else 1)
@@ -8,11 +8,15 @@ Run with: python3 content-guards/scripts/test_enforce_issue_limits.py
 """
 
 import json
+import os
 import subprocess
 import sys
+import tempfile
 from pathlib import Path
 
 SCRIPT = Path(__file__).parent / "enforce-issue-limits.py"
+# Keep the per-repo snapshot cache out of the user's cache directory
+ENV = {**os.environ, "CONTENT_GUARDS_CACHE_DIR": tempfile.mkdtemp()}
 
 
 def run(inp: str) -> subprocess.CompletedProcess:
@@ -21,6 +25,7 @@ def run(inp: str) -> subprocess.CompletedProcess:
         input=inp,
         capture_output=True,
         text=True,
+        env=ENV,
     )
 
 
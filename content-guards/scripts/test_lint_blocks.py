@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Tests for lint_blocks.py.
+
+Verifies block splitting at headings outside fences, lint units with
+boundary context, style markers, and when the block cache demands a full
+lint.
+
+Run with: python3 content-guards/scripts/test_lint_blocks.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ["CONTENT_GUARDS_CACHE_DIR"] = tempfile.mkdtemp()
+sys.path.insert(0, str(Path(__file__).parent))
+
+from lint_blocks import FULL_EVERY, BlockCache, lint_units, split_blocks, styles  # noqa: E402
+
+
+def check(label: str, ok: bool, detail: object = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'} [{label}]")
+    if not ok:
+        print(f"  Got: {detail}")
+    return ok
+
+
+all_pass = True
+
+doc = "Intro\n\n# One\n\n```\n# not a heading\n```\n## Two\n\ntext\n\n## Three\n\nend\n"
+blocks = split_blocks(doc)
+firsts = [b[0] for b in blocks]
+all_pass &= check("split at headings outside fences", firsts == ["Intro", "# One", "## Two", "## Three"], firsts)
+all_pass &= check("blocks cover every line", sum(len(b) for b in blocks) == len(doc.split("\n")))
+
+units = lint_units(blocks, [2])
+all_pass &= check("closing fence before a block becomes plain text", units == ["text\n## Two\n\ntext\n\n## Three\n"], units)
+units = lint_units(blocks, [1, 2])
+all_pass &= check("adjacent changed blocks form one unit", len(units) == 1 and units[0].startswith("\n# One"), units)
+units = lint_units(blocks, [3])
+all_pass &= check("last block keeps the document ending", units == ["\n## Three\n\nend\n"], units)
+all_pass &= check("first block has no previous line", lint_units(blocks, [0])[0].startswith("Intro\n"))
+
+cache = BlockCache("/tmp/doc.md", "settings-a")
+all_pass &= check("no entry: full lint", cache.changed_blocks(blocks) is None)
+cache.record_clean(blocks, incremental=False)
+all_pass &= check("unchanged: nothing to lint", cache.changed_blocks(blocks) == [])
+
+edited = split_blocks(doc.replace("text", "more text"))
+all_pass &= check("edited block is the only one linted", cache.changed_blocks(edited) == [2], cache.changed_blocks(edited))
+renamed = split_blocks(doc.replace("## Two", "## Deux"))
+all_pass &= check("heading change: full lint", cache.changed_blocks(renamed) is None)
+fragment = split_blocks(doc.replace("text", "see [one](#one)"))
+all_pass &= check("new fragment link: full lint", cache.changed_blocks(fragment) is None)
+all_pass &= check("other settings: full lint", BlockCache("/tmp/doc.md", "settings-b").changed_blocks(blocks) is None)
+
+with_ref = doc.replace("end", "[x]: https://example.com")
+cache.record_clean(split_blocks(with_ref), incremental=False)
+dropped = split_blocks(with_ref.replace("[x]: https://example.com", "end"))
+all_pass &= check("removed reference definition: full lint", cache.changed_blocks(dropped) is None)
+
+found = styles(["# H *a* and snake_case `x_y_`", "", "- **b**", "", "    code", "", "~~~", "_c_", "~~~", "", "---"])
+expected = {
+    "MD004": ["-"], "MD035": ["---"], "MD046": ["fenced", "indented"],
+    "MD048": ["~"], "MD049": ["*"], "MD050": ["**"],
+}
+all_pass &= check("style markers outside code", found == expected, found)
+found = styles(["- item", "    - nested item", "    continued"])
+all_pass &= check("indented list lines are not code blocks", found == {"MD004": ["-"]}, found)
+
+styled = doc.replace("text", "- a *b*\n\n```\ncode\n```")
+cache.record_clean(split_blocks(styled), incremental=False)
+same = split_blocks(styled.replace("- a *b*", "- c *d*\n- e"))
+all_pass &= check("same styles: block lint", cache.changed_blocks(same) == [2], cache.changed_blocks(same))
+for label, old, new in (
+    ("other list marker", "- a", "* a"),
+    ("other emphasis", "*b*", "_b_"),
+    ("new strong style", "*b*", "__b__"),
+    ("other fence", "```\ncode\n```", "~~~\ncode\n~~~"),
+    ("indented code", "```\ncode\n```", "\n    code"),
+    ("first hr", "- a", "***\n\n- a"),
+):
+    edited = split_blocks(styled.replace(old, new))
+    all_pass &= check(f"{label}: full lint", cache.changed_blocks(edited) is None, cache.changed_blocks(edited))
+
+cache.record_clean(blocks, incremental=False)
+for _ in range(FULL_EVERY):
+    cache.record_clean(blocks, incremental=True)
+all_pass &= check("full lint every FULL_EVERY passes", cache.changed_blocks(blocks) is None)
+
+print()
+print("ALL TESTS PASSED" if all_pass else "SOME TESTS FAILED")
+sys.exit(0 if all_pass else 1)
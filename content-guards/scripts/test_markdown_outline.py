@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Tests for markdown_outline.py.
+
+Verifies ATX heading parsing, fence tracking (backtick and tilde fences,
+longer closing fences, unclosed fences), and section spans.
+
+Run with: python3 content-guards/scripts/test_markdown_outline.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from markdown_outline import parse_outline  # noqa: E402
+
+
+def check(label: str, ok: bool, detail: object = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'} [{label}]")
+    if not ok:
+        print(f"  Got: {detail}")
+    return ok
+
+
+all_pass = True
+
+doc = """# Title
+
+## Installation ##
+
+```bash
+# not a heading
+````
+
+### From source
+
+~~~~
+## still code
+~~~
+~~~~
+
+## Usage
+#hashtag is text
+####### seven is text
+"""
+outline = parse_outline(doc)
+titles = outline.titles()
+all_pass &= check("headings outside fences only", titles == ["Title", "Installation", "From source", "Usage"], titles)
+all_pass &= check("closing hashes stripped", outline.find("installation") is not None)
+all_pass &= check("max_level filters", outline.titles(max_level=2) == ["Title", "Installation", "Usage"])
+spans = [(b.start, b.end, b.info) for b in outline.code_blocks]
+all_pass &= check("fences: longer closer, shorter ignored", spans == [(4, 6, "bash"), (10, 13, "")], spans)
+
+install = outline.find("Installation")
+usage = outline.find("Usage")
+all_pass &= check("section ends at next same-level heading", install.end == usage.line, install)
+all_pass &= check("subsection code belongs to parent", len(outline.code_in(install)) == 2)
+all_pass &= check("top heading spans the document", outline.find("Title").end == outline.lines)
+
+unclosed = parse_outline("## Installation\n```\n## Usage\n")
+all_pass &= check("unclosed fence runs to the end", unclosed.titles() == ["Installation"], unclosed.titles())
+inline = parse_outline("```not a fence```\n## Usage\n")
+all_pass &= check("inline backticks are not a fence", inline.titles() == ["Usage"], inline.titles())
+all_pass &= check("empty document", parse_outline("").headings == [])
+
+print()
+print("ALL TESTS PASSED" if all_pass else "SOME TESTS FAILED")
+sys.exit(0 if all_pass else 1)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Tests for readme_index.py.
+
+Verifies that unchanged READMEs are served from the index without being
+validated again, that content and governing-config changes (an edited or a
+new nearer .readme-validator.yaml) invalidate entries, that touched but
+identical files are not re-validated, pruning of deleted READMEs, merging
+of concurrent writers, and the non-compliant listing.
+
+Run with: python3 content-guards/scripts/test_readme_index.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["CONTENT_GUARDS_CACHE_DIR"] = tempfile.mkdtemp()
+sys.path.insert(0, str(Path(__file__).parent))
+
+from readme_index import ReadmeIndex  # noqa: E402
+from readme_rules import validate  # noqa: E402
+
+GOOD = "# Tool\n\n## Installation\n\n```bash\nmake\n```\n\n## Usage\n\nRun it.\n"
+BAD = "# Tool\n\n## Usage\n\nRun it.\n"
+OLD = time.time() - 60  # Outside the racy window
+
+
+def check(label: str, ok: bool, detail: object = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'} [{label}]")
+    if not ok:
+        print(f"  Got: {detail}")
+    return ok
+
+
+calls: list[str] = []
+
+
+def counting(content: str, config: dict) -> tuple[list[str], list[str]]:
+    calls.append(content)
+    return validate(content, config)
+
+
+def write(path: Path, text: str, mtime: float = OLD) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    os.utime(path, (mtime, mtime))
+
+
+def settle(index: ReadmeIndex) -> None:
+    """Backdate indexing so stat matches are trusted."""
+    for entry in index.entries.values():
+        entry["indexed"] = entry["mtime"] + 60 * 1_000_000_000
+
+
+all_pass = True
+root = Path(tempfile.mkdtemp())
+(root / ".git").mkdir()
+good, bad = root / "plugins/a/README.md", root / "plugins/b/README.md"
+write(good, GOOD)
+write(bad, BAD)
+
+index = ReadmeIndex.for_path(good)
+all_pass &= check("index is keyed by the repository root", index.root == root.resolve(), index.root)
+errors, _ = index.check(good, counting)
+all_pass &= check("compliant README has no errors", errors == [], errors)
+errors, _ = index.check(bad, counting)
+all_pass &= check("non-compliant README has errors", len(errors) == 1, errors)
+settle(index)
+index.save()
+
+calls.clear()
+index = ReadmeIndex(root)
+index.check(good, counting)
+index.check(bad, counting)
+all_pass &= check("unchanged READMEs are not validated again", calls == [], len(calls))
+all_pass &= check("failing lists the non-compliant README", list(index.failing()) == ["plugins/b/README.md"],
+                  index.failing())
+
+# Touched but identical content: re-read and hashed, not re-validated
+write(good, GOOD, OLD + 5)
+index.check(good, counting)
+all_pass &= check("touched identical README is not re-validated", calls == [], len(calls))
+
+# Recently modified files are not trusted by stat alone: a same-size
+# rewrite within the same mtime tick is still caught
+index = ReadmeIndex(root)
+now = time.time()
+write(bad, BAD, now)
+index.check(bad, counting)
+write(bad, BAD.replace("## Usage", "## Usagf"), now)
+calls.clear()
+errors, _ = index.check(bad, counting)
+all_pass &= check("same-tick rewrite is caught", "Usage" in errors[0] and len(calls) == 1, (errors, len(calls)))
+
+# Config changes: editing the governing config, or adding a nearer one
+write(bad, BAD)
+index.check(bad)
+settle(index)
+config = root / ".readme-validator.yaml"
+config.write_text("required_sections:\n  - Usage\n")
+calls.clear()
+errors, _ = index.check(bad, counting)
+all_pass &= check("new config re-validates", errors == [] and len(calls) == 1, (errors, len(calls)))
+settle(index)
+config.write_text("required_sections:\n  - Usage\n  - Installation\n")
+errors, _ = index.check(bad, counting)
+all_pass &= check("edited config re-validates", len(errors) == 1, errors)
+settle(index)
+time.sleep(0.01)
+(root / "plugins/b/.readme-validator.yaml").write_text("required_sections:\n  - Usage\n")
+errors, _ = index.check(bad, counting)
+all_pass &= check("nearer config takes over", errors == [], errors)
+index.save()
+
+# Concurrent writers merge; pruning drops deleted READMEs
+other = ReadmeIndex(root)
+extra = root / "plugins/c/README.md"
+write(extra, BAD)
+other.check(extra)
+index.check(good)
+index.prune(root, {good, bad})
+index.save()
+other.save()
+merged = ReadmeIndex(root)
+all_pass &= check("concurrent updates merge", "plugins/c/README.md" in merged.entries, list(merged.entries))
+extra.unlink()
+merged.prune(root / "plugins", {good, bad})
+merged.save()
+all_pass &= check("deleted README is pruned", sorted(ReadmeIndex(root).entries) ==
+                  ["plugins/a/README.md", "plugins/b/README.md"], list(ReadmeIndex(root).entries))
+
+# Scale: a warm check of 500 READMEs costs stats, not validation
+many = [root / f"pkg/p{n}/README.md" for n in range(500)]
+for n, path in enumerate(many):
+    write(path, GOOD if n % 2 else BAD)
+warm = ReadmeIndex(root)
+for path in many:
+    warm.check(path)
+settle(warm)
+warm.save()
+calls.clear()
+start = time.perf_counter()
+warm = ReadmeIndex(root)
+for path in many:
+    warm.check(path, counting)
+elapsed_ms = (time.perf_counter() - start) * 1000
+all_pass &= check("warm 500-README check validates nothing", calls == [], len(calls))
+all_pass &= check("warm 500-README check under 500 ms", elapsed_ms < 500, f"{elapsed_ms:.1f} ms")
+
+print()
+print("ALL TESTS PASSED" if all_pass else "SOME TESTS FAILED")
+sys.exit(0 if all_pass else 1)
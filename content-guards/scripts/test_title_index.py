@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Tests for title_index.py.
+
+Verifies similarity matching (and distinct items with near-identical
+titles not matching), incremental updates by updatedAt (including
+closed items dropping out), rebuilds that page through all open items and
+resume after a deadline or the per-run page cap, empty repositories, and
+lookup latency with thousands of items.
+
+Run with: python3 content-guards/scripts/test_title_index.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["CONTENT_GUARDS_CACHE_DIR"] = tempfile.mkdtemp()
+sys.path.insert(0, str(Path(__file__).parent))
+
+from title_index import DEFAULT_THRESHOLD, EMPTY_WATERMARK, REBUILD_PAGES, TitleIndex  # noqa: E402
+
+
+def check(label: str, ok: bool, detail: object = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'} [{label}]")
+    if not ok:
+        print(f"  Got: {detail}")
+    return ok
+
+
+def item(number: int, title: str, updated: str, state: str = "OPEN") -> dict:
+    return {"number": number, "title": title, "state": state, "updatedAt": updated}
+
+
+def no_pages(cursor):
+    raise AssertionError("no page fetch expected")
+
+
+all_pass = True
+FAR = time.monotonic() + 60
+
+index = TitleIndex("/repo/a/.git", "issue")
+updates = [
+    item(2, "feat: add caching to title lookups", "2026-01-02T00:00:00Z"),
+    item(1, "docs: fix stale references in the README", "2026-01-01T00:00:00Z"),
+]
+index.sync(updates, True, no_pages, FAR)
+
+found = [m[0] for m in index.similar("docs: fix stale reference in README", 0.7)]
+all_pass &= check("near-duplicate title matches", found == [1], found)
+found = index.similar("fix stale references in CHANGELOG", 0.7)
+all_pass &= check("related but distinct title does not match", found == [], found)
+all_pass &= check("index is trusted after sync", index.trusted())
+
+# Near-identical titles of distinct work are not duplicates
+distinct = TitleIndex("/repo/f/.git", "pr")
+distinct.sync([
+    item(1, "Bump foo from 1.2 to 1.3", "2026-01-01T00:00:00Z"),
+    item(2, "fix(content-guards): handle an empty config file", "2026-01-01T00:00:00Z"),
+    item(3, "fix: handle an empty config file in content-guards", "2026-01-01T00:00:00Z"),
+    item(4, "chore(deps): bump actions/checkout from 4.1.1 to 4.1.2", "2026-01-01T00:00:00Z"),
+], True, no_pages, FAR)
+for title in (
+    "Bump foo from 1.3 to 1.4",
+    "fix(script-guards): handle an empty config file",
+    "fix: handle an empty config file in script-guards",
+    "chore(deps): bump actions/checkout from 4.1.2 to 4.1.3",
+):
+    found = distinct.similar(title, DEFAULT_THRESHOLD)
+    all_pass &= check(f"distinct: {title}", found == [], found)
+found = [m[0] for m in distinct.similar("fix: handle an empty config files in content-guards", DEFAULT_THRESHOLD)]
+all_pass &= check("reworded duplicate matches at the default threshold", found == [3], found)
+
+# Incremental: overlapping updates are applied; closed items drop out
+index.sync([
+    item(3, "ci: pin action versions", "2026-01-03T00:00:00Z"),
+    item(1, "docs: fix stale references in the README", "2026-01-02T12:00:00Z", "CLOSED"),
+    item(2, "feat: add caching to title lookups", "2026-01-02T00:00:00Z"),
+], False, no_pages, FAR)
+found = index.similar("docs: fix stale references in the README", 0.7)
+all_pass &= check("closed item is removed", found == [], found)
+found = [m[0] for m in index.similar("ci: pin action versions", 0.7)]
+all_pass &= check("new item is added incrementally", found == [3], found)
+
+# Gap: updates newer than the watermark trigger a paged rebuild
+pages = {
+    None: ([item(n, f"task number {n} for module {n * 7}", "2025-06-01T00:00:00Z") for n in range(100, 200)], "c1"),
+    "c1": ([item(5000, "refactor: split the giant settings module", "2025-01-01T00:00:00Z")], None),
+}
+calls: list = []
+
+
+def fetch(cursor):
+    calls.append(cursor)
+    return pages[cursor]
+
+
+index.sync([item(7, "chore: bump deps", "2026-02-01T00:00:00Z")], False, fetch, FAR)
+found = [m[0] for m in index.similar("refactor: split giant settings module", 0.7)]
+all_pass &= check("rebuild reaches items past the first page", found == [5000], found)
+found = index.similar("ci: pin action versions", 0.7)
+all_pass &= check("rebuild drops items no longer listed", found == [], found)
+
+# A rebuild cut short by the deadline resumes where it stopped
+resumed = TitleIndex("/repo/b/.git", "issue")
+calls.clear()
+resumed.sync([item(7, "chore: bump deps", "2026-02-01T00:00:00Z")], False,
+             lambda c: (calls.append(c), time.sleep(0.2), pages[c])[2], time.monotonic() + 0.1)
+resumed.sync([item(7, "chore: bump deps", "2026-02-01T00:00:00Z")], False, fetch, FAR)
+all_pass &= check("interrupted rebuild resumes from its cursor", calls == [None, "c1"], calls)
+
+# A rebuild fetches at most REBUILD_PAGES pages per run, then resumes
+capped = TitleIndex("/repo/d/.git", "issue")
+chain = {None if n == 0 else f"p{n}": ([item(900 + n, f"paged item {n}", "2025-01-01T00:00:00Z")],
+                                      f"p{n + 1}" if n < REBUILD_PAGES + 1 else None)
+         for n in range(REBUILD_PAGES + 2)}
+calls.clear()
+capped.sync([], False, lambda c: (calls.append(c), chain[c])[1], FAR)
+all_pass &= check("rebuild run stops at the page cap", len(calls) == REBUILD_PAGES, calls)
+capped.sync([], False, lambda c: (calls.append(c), chain[c])[1], FAR)
+all_pass &= check("capped rebuild resumes and completes", len(calls) == REBUILD_PAGES + 2, calls)
+capped.sync([], False, no_pages, FAR)
+all_pass &= check("completed rebuild is not restarted", len(calls) == REBUILD_PAGES + 2, calls)
+
+# An empty repository is a complete index, not a rebuild on every run
+empty = TitleIndex("/repo/e/.git", "issue")
+empty.sync([], True, no_pages, FAR)
+empty.db.execute("INSERT OR REPLACE INTO meta VALUES ('synced_at', '0')")
+empty.sync([], True, no_pages, FAR)
+all_pass &= check("empty index keeps its watermark", empty._meta("watermark") == EMPTY_WATERMARK, empty._meta("watermark"))
+all_pass &= check("empty index is synced without a rebuild", empty.trusted())
+empty.sync([item(1, "first issue in the repo", "2026-03-01T00:00:00Z")], True, no_pages, FAR)
+found = [m[0] for m in empty.similar("first issue in the repo", 0.7)]
+all_pass &= check("first item after empty is indexed", found == [1], found)
+
+# Scale: lookups stay fast with thousands of open items
+big = TitleIndex("/repo/c/.git", "issue")
+words = ["cache", "index", "parser", "hook", "token", "limit", "branch", "readme", "lint", "guard"]
+many = [
+    item(n, f"{words[n % 10]} {words[n // 10 % 10]} {words[n // 100 % 10]} issue {n}", "2026-01-01T00:00:00Z")
+    for n in range(5000)
+]
+big.sync(many[:100], False, lambda c: (many[100:], None), FAR)
+start = time.perf_counter()
+for _ in range(20):
+    found = big.similar("cache index parser issue 210", 0.7)
+elapsed_ms = (time.perf_counter() - start) / 20 * 1000
+all_pass &= check("5000-item index finds the duplicate", [m[0] for m in found][:1] == [210], found[:3])
+all_pass &= check("5000-item lookup under 50 ms", elapsed_ms < 50, f"{elapsed_ms:.1f} ms")
+
+print()
+print("ALL TESTS PASSED" if all_pass else "SOME TESTS FAILED")
+sys.exit(0 if all_pass else 1)
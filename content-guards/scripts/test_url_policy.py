@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Tests for url_policy.py.
+
+Verifies URL normalization, domain/exact/path-prefix matching, rule
+precedence, site: extraction, the mtime-keyed compiled database, and that
+lookup cost, in process and in a fresh hook process, does not grow with the
+rule count.
+
+Run with: python3 content-guards/scripts/test_url_policy.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["CONTENT_GUARDS_CACHE_DIR"] = tempfile.mkdtemp()
+sys.path.insert(0, str(Path(__file__).parent))
+
+from url_policy import compile_rules, load_policy, normalize_url, site_domains  # noqa: E402
+
+
+def check(label: str, ok: bool, detail: object = "") -> bool:
+    print(f"{'PASS' if ok else 'FAIL'} [{label}]")
+    if not ok:
+        print(f"  Got: {detail}")
+    return ok
+
+
+def action(policy, url: str) -> str | None:
+    rule = policy.lookup(url) if policy else None
+    return rule[0] if rule else None
+
+
+all_pass = True
+
+norm = normalize_url("HTTPS://Docs.Example.COM.:8443/a//b/./c/../d%20e?q=1#x")
+all_pass &= check("normalize host, port, dot segments, escapes", norm == (["docs", "example", "com"], ["a", "b", "d e"]), norm)
+all_pass &= check("bare host accepted", normalize_url("example.com") == (["example", "com"], []))
+all_pass &= check("IDN host encoded", normalize_url("https://bücher.example/")[0][0] == "xn--bcher-kva")
+all_pass &= check("host escapes decoded", normalize_url("https://%63ontent%2Efarm.example/x") == (["content", "farm", "example"], ["x"]))
+all_pass &= check("double-escaped host rejected", normalize_url("https://%2563ontent.example/") is None)
+all_pass &= check("no host rejected", normalize_url("file:///etc/passwd") is None)
+
+trie = compile_rules({
+    "deny": ["farm.example", "example.com/blog", "=exact.example"],
+    "allow": ["example.com/blog/official", "ok.farm.example"],
+    "warn": {"old.example": "Use new.example instead"},
+})
+all_pass &= check("domain rule covers subdomains", action(trie, "https://a.b.farm.example/x") == "deny")
+all_pass &= check("more labels win", action(trie, "https://ok.farm.example/") == "allow")
+all_pass &= check("label boundary respected", action(trie, "https://notfarm.example/") is None)
+all_pass &= check("path prefix by segment", action(trie, "https://example.com/blog/post") == "deny")
+all_pass &= check("path segment boundary", action(trie, "https://example.com/blogroll") is None)
+all_pass &= check("longer path prefix wins", action(trie, "https://example.com/blog/official/1") == "allow")
+all_pass &= check("escaped host still matched", action(trie, "https://%66arm.example/x") == "deny")
+all_pass &= check("path rule applies to subdomains", action(trie, "https://www.example.com/blog") == "deny")
+all_pass &= check("exact host matches", action(trie, "http://exact.example") == "deny")
+all_pass &= check("exact host excludes subdomains", action(trie, "http://sub.exact.example") is None)
+warn = trie.lookup("https://old.example/page")
+all_pass &= check("warn carries its message", warn == ["warn", "Use new.example instead", "old.example"], warn)
+
+tie = compile_rules({"allow": ["same.example"], "deny": ["same.example"]})
+all_pass &= check("deny wins at equal specificity", action(tie, "https://same.example") == "deny")
+
+sites = site_domains('rust async site:docs.rs OR site:"farm.example"')
+all_pass &= check("site: operators extracted", sites == ["docs.rs", "farm.example"], sites)
+sites = site_domains("python tips -site:farm.example (site:docs.rs) mysite:x.example")
+all_pass &= check("-site: exclusions and embedded site: skipped", sites == ["docs.rs"], sites)
+
+# Compile cache: reused while the file is unchanged, rebuilt after a change
+rules = Path(tempfile.mkdtemp()) / ".url-policy.yaml"
+rules.write_text("deny:\n  - farm.example\n")
+first = load_policy(str(rules))
+all_pass &= check("compiled trie loaded", action(first, "farm.example") == "deny")
+# Same size and mtime: served from the cache without parsing the YAML
+stat = os.stat(rules)
+rules.write_text("[" * (stat.st_size - 1) + "\n")
+os.utime(rules, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+cached = load_policy(str(rules))
+all_pass &= check("unchanged file served from the cache", action(cached, "farm.example") == "deny")
+rules.write_text("deny:\n  - other.example\n")
+os.utime(rules, (time.time() + 5, time.time() + 5))
+second = load_policy(str(rules))
+all_pass &= check("recompiled after change", action(second, "other.example") == "deny" and action(second, "farm.example") is None)
+rules.write_text("[unclosed")
+os.utime(rules, (time.time() + 10, time.time() + 10))
+all_pass &= check("invalid rules fail open", load_policy(str(rules)) is None)
+
+# Lookup cost stays flat as the rule set grows
+small = compile_rules({"deny": [f"site{i}.example" for i in range(10)]})
+large = compile_rules({"deny": [f"site{i}.example/p{i}" for i in range(20000)] + [f"d{i}.test" for i in range(20000)]})
+
+
+def timed(trie: dict) -> float:
+    start = time.perf_counter()
+    for _ in range(2000):
+        trie.lookup("https://a.b.site5.example/p5/x/y")
+    return time.perf_counter() - start
+
+
+small_t, large_t = min(timed(small) for _ in range(3)), min(timed(large) for _ in range(3))
+all_pass &= check("lookup independent of rule count", large_t < small_t * 3, (small_t, large_t))
+all_pass &= check("large rule set still matches", action(large, "https://site19999.example/p19999/z") == "deny")
+
+
+
+def cold_ms(rules_file: Path) -> float:
+    """Load plus one lookup in a fresh process, against a compiled cache."""
+    code = (
+        "import sys, time; sys.path.insert(0, sys.argv[1])\n"
+        "from url_policy import load_policy\n"
+        "start = time.perf_counter()\n"
+        "load_policy(sys.argv[2]).lookup('https://a.site5.example/p5/x')\n"
+        "print((time.perf_counter() - start) * 1000)"
+    )
+    args = [sys.executable, "-c", code, str(Path(__file__).parent), str(rules_file)]
+    return min(float(subprocess.run(args, capture_output=True, text=True, check=True).stdout) for _ in range(3))
+
+
+# Per-call cost in a new hook process stays flat as the rules file grows
+small_file = Path(tempfile.mkdtemp()) / ".url-policy.yaml"
+small_file.write_text("deny:\n" + "".join(f"  - site{i}.example\n" for i in range(10)))
+large_file = Path(tempfile.mkdtemp()) / ".url-policy.yaml"
+large_file.write_text("deny:\n" + "".join(f"  - site{i}.example/p{i}\n  - d{i}.test\n" for i in range(10000)))
+load_policy(str(small_file)), load_policy(str(large_file))  # Compile once
+small_ms, large_ms = cold_ms(small_file), cold_ms(large_file)
+all_pass &= check("cold-process lookup independent of rule count", large_ms < max(small_ms * 3, 10), (small_ms, large_ms))
+
+print()
+print("ALL TESTS PASSED" if all_pass else "SOME TESTS FAILED")
+sys.exit(0 if all_pass else 1)
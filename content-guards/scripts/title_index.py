@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Persisted per-repo title similarity index for duplicate issue/PR detection.
+
+Every open item's normalized title is split into character 3-gram shingles
+and stored in an inverted index (SQLite, one database per repository and
+resource type under the content-guards cache). A proposed title is compared
+by Jaccard similarity against only the items that share its shingles, so a
+lookup stays in the low milliseconds with thousands of open items.
+
+The index is kept current incrementally by updatedAt: every snapshot
+fetched by enforce-issue-limits.py carries the most recently updated items
+(any state), which are applied when they overlap the index watermark. A
+gap (cold start, long idle) triggers a rebuild that pages through all open
+items, at most REBUILD_PAGES per run so concurrent hooks are not held on
+the index lock; a rebuild cut short (page cap or hook deadline) resumes on
+the next run.
+
+Titles that differ in their conventional-commit scope or in any number
+(versions, issue references) are distinct items however similar the rest
+reads: "Bump foo from 1.2 to 1.3" is not a duplicate of "Bump foo from 1.3
+to 1.4", nor "fix(a): X" of "fix(b): X".
+
+Similarity threshold: ISSUE_LIMITS_DUPLICATE_THRESHOLD (0-1, default 0.9).
+"""
+
+import math
+import os
+import re
+import sqlite3
+import time
+from collections.abc import Callable
+
+from guard_state import content_hash, locked, state_path
+
+DEFAULT_THRESHOLD = 0.9
+SHINGLE = 3
+# How long after its last sync the index is trusted without a fresh one
+TRUST_SECONDS = 600
+# Pages fetched per rebuild run while holding the index lock
+REBUILD_PAGES = 10
+# Watermark of a complete index of a repository with no items; sorts before
+# every updatedAt, unlike "" which reads as "no watermark"
+EMPTY_WATERMARK = "0"
+
+PageFetcher = Callable[[str | None], tuple[list[dict], str | None] | None]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS items (number INTEGER PRIMARY KEY, title TEXT, size INTEGER);
+CREATE TABLE IF NOT EXISTS shingles (
+  shingle TEXT, number INTEGER, PRIMARY KEY (shingle, number)
+) WITHOUT ROWID;
+"""
+
+
+def duplicate_threshold() -> float:
+    try:
+        value = float(os.environ.get("ISSUE_LIMITS_DUPLICATE_THRESHOLD", DEFAULT_THRESHOLD))
+    except ValueError:
+        return DEFAULT_THRESHOLD
+    return min(max(value, 0.0), 1.0)
+
+
+def shingles(title: str) -> set[str]:
+    """Character 3-grams of a title without its conventional-commit prefix."""
+    text = re.sub(r"^[a-z]+(\([^)]*\))?!?:\s*", "", title.strip().lower())
+    text = " " + " ".join(re.findall(r"[a-z0-9]+", text)) + " "
+    return {text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1)}
+
+
+def _identity(title: str) -> tuple[str, list[str]]:
+    """Conventional-commit scope and numbers of a title, which set distinct items apart."""
+    scope = re.match(r"^[a-z]+\(([^)]*)\)", title.strip().lower())
+    return scope.group(1).strip() if scope else "", re.findall(r"\d+(?:\.\d+)*", title)
+
+
+class TitleIndex:
+    """Open-item titles of one resource type in one repository."""
+
+    def __init__(self, key: str, resource: str) -> None:
+        self.path = state_path("title-index", f"{content_hash(key)[:24]}-{resource}.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        self.db.executescript(_SCHEMA)
+
+    def _meta(self, key: str) -> str | None:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str | None) -> None:
+        if value is None:
+            self.db.execute("DELETE FROM meta WHERE key = ?", (key,))
+        else:
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def _remove(self, number: int) -> None:
+        row = self.db.execute("SELECT title FROM items WHERE number = ?", (number,)).fetchone()
+        if row:
+            self.db.executemany(
+                "DELETE FROM shingles WHERE shingle = ? AND number = ?",
+                [(s, number) for s in shingles(row[0])],
+            )
+            self.db.execute("DELETE FROM items WHERE number = ?", (number,))
+
+    def _put(self, item: dict) -> None:
+        self._remove(item["number"])
+        if item.get("state", "OPEN") != "OPEN":
+            return
+        grams = shingles(item["title"])
+        self.db.execute("INSERT INTO items VALUES (?, ?, ?)", (item["number"], item["title"], len(grams)))
+        self.db.executemany("INSERT INTO shingles VALUES (?, ?)", [(s, item["number"]) for s in grams])
+
+    def apply(self, items: list[dict], advance: bool = True) -> None:
+        """
+        Insert, update or (when no longer open) drop items in one transaction,
+        moving the watermark up to the newest updatedAt unless rebuilding.
+        """
+        with self.db:
+            self.db.execute("BEGIN")
+            for item in items:
+                self._put(item)
+            newest = max((i["updatedAt"] for i in items), default="")
+            if advance and newest > (self._meta("watermark") or ""):
+                self._set_meta("watermark", newest)
+            self._set_meta("synced_at", str(time.time()))
+
+    def add(self, number: int, title: str) -> None:
+        """Record a just-created item (PostToolUse), without touching the watermark."""
+        with self.db:
+            self.db.execute("BEGIN")
+            self._put({"number": number, "title": title})
+
+    def trusted(self) -> bool:
+        synced = float(self._meta("synced_at") or 0)
+        return time.time() - synced < TRUST_SECONDS
+
+    def similar(self, title: str, threshold: float) -> list[tuple[int, str, float]]:
+        """Open items whose title similarity to title is at least threshold, best first."""
+        grams = sorted(shingles(title))
+        if not grams:
+            return []
+        need = max(math.ceil(threshold * len(grams)), 1)
+        marks = ",".join("?" * len(grams))
+        rows = self.db.execute(
+            f"SELECT i.number, i.title, i.size, COUNT(*) FROM shingles s "
+            f"JOIN items i ON i.number = s.number WHERE s.shingle IN ({marks}) "
+            f"GROUP BY s.number HAVING COUNT(*) >= ?",
+            (*grams, need),
+        ).fetchall()
+        identity = _identity(title)
+        matches = [
+            (number, existing, shared / (size + len(grams) - shared))
+            for number, existing, size, shared in rows
+            if _identity(existing) == identity
+        ]
+        return sorted((m for m in matches if m[2] >= threshold), key=lambda m: -m[2])
+
+    def sync(
+        self, updates: list[dict], complete: bool, fetch_page: PageFetcher, deadline: float
+    ) -> None:
+        """
+        Bring the index up to date from a snapshot's recently updated items,
+        rebuilding from all open items when they do not reach the watermark.
+        complete means updates lists every item in the repository, so a
+        rebuild needs no paging.
+        """
+        with locked(self.path):
+            watermark = self._meta("watermark")
+            cursor = self._meta("rebuild_cursor")
+            oldest = min((u["updatedAt"] for u in updates), default=None)
+            if watermark and cursor is None and (oldest is None or oldest <= watermark):
+                if not updates or updates[0]["updatedAt"] >= watermark:
+                    self.apply(updates)
+                return
+            if cursor is None:  # Start a rebuild
+                with self.db:
+                    self.db.execute("BEGIN")
+                    self.db.execute("DELETE FROM items")
+                    self.db.execute("DELETE FROM shingles")
+                    self._set_meta("watermark", None)
+                    self._set_meta("rebuild_watermark", updates[0]["updatedAt"] if updates else "")
+                    self._set_meta("rebuild_cursor", "")
+                cursor = ""
+            self.apply(updates, advance=False)  # Keep what is known while paging
+            for _ in range(0 if complete else REBUILD_PAGES):
+                if time.monotonic() >= deadline:
+                    break
+                page = fetch_page(cursor or None)
+                if page is None:
+                    return
+                items, cursor = page
+                self.apply(items, advance=False)
+                with self.db:
+                    self._set_meta("rebuild_cursor", cursor or "")
+                if cursor is None:
+                    break
+            if complete or cursor is None:  # Rebuild complete
+                with self.db:
+                    self._set_meta("rebuild_cursor", None)
+                    self._set_meta("watermark", self._meta("rebuild_watermark") or EMPTY_WATERMARK)
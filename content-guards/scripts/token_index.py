@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Per-directory token index backing directory budgets in .token-limits.yaml:
+
+  directory_limits:
+    "*/skills": 20000        # fnmatch against absolute directory paths
+    "*/agentsmd": 15000
+
+Each budgeted directory has one index file under the content-guards cache
+holding the token count of every file below it and their running total.
+A Write updates only the written file's entry, so checking a budget is a
+subtraction and an addition; no other file is re-tokenized.
+
+Indexes are seeded by scan-token-limits.py (complete) or, on a cold start
+inside the hook, from the content-hash token cache (possibly incomplete;
+unknown files count as zero, so the total is a lower bound and never causes
+a false block). The hook's seed reads at most SEED_MAX_FILES files within
+SEED_SECONDS; a larger directory is left partly unseeded rather than
+holding up the tool call. Before reporting a violation the index is re-verified
+against the filesystem, dropping deleted files and recounting files that
+changed outside the hook. Entries the hook recorded are re-verified too:
+they are written before the file is, so another hook may have denied the
+write, or the file may have changed since.
+"""
+
+import fnmatch
+import os
+import time
+from pathlib import Path
+
+from guard_state import content_hash, load_json, locked, save_json, state_path
+from token_limits import cached_count_tokens, is_binary_path, lookup_cached_tokens
+
+_UNKNOWN = None  # mtime/size for entries recorded before the file was written
+SEED_MAX_FILES = 500
+SEED_SECONDS = 1.0
+
+
+def directory_budget(directory: str, dir_limits: dict[str, int]) -> int | None:
+    """Budget for an absolute directory path (last matching pattern wins)."""
+    for pattern, limit in reversed(list(dir_limits.items())):
+        if fnmatch.fnmatch(directory, pattern):
+            return limit
+    return None
+
+
+def budget_dirs(file_path: str, dir_limits: dict[str, int]) -> list[tuple[str, int]]:
+    """Budgeted ancestor directories of file_path with their budgets."""
+    budgets = []
+    current = os.path.dirname(os.path.abspath(file_path))
+    while True:
+        limit = directory_budget(current, dir_limits)
+        if limit is not None:
+            budgets.append((current, limit))
+        parent = os.path.dirname(current)
+        if parent == current:
+            return budgets
+        current = parent
+
+
+def _index_path(directory: str) -> Path:
+    return state_path("token-index", content_hash(directory)[:24] + ".json")
+
+
+def _stat(path: str) -> list[int] | None:
+    try:
+        st = os.stat(path)
+        return [st.st_mtime_ns, st.st_size]
+    except OSError:
+        return None
+
+
+def _count_path(path: str) -> int | None:
+    try:
+        return cached_count_tokens(Path(path).read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _seed(directory: str) -> dict:
+    """
+    Cold-start index from cached counts only; never runs the counter. Stops
+    (incomplete) after SEED_MAX_FILES files or SEED_SECONDS.
+    """
+    files: dict[str, list] = {}
+    complete = True
+    deadline = time.monotonic() + SEED_SECONDS
+    read = 0
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if is_binary_path(path):
+                continue
+            if read >= SEED_MAX_FILES or time.monotonic() >= deadline:
+                return _document(directory, files, False)
+            read += 1
+            try:
+                cached = lookup_cached_tokens(Path(path).read_bytes())
+            except OSError:
+                continue
+            if cached is not None:
+                files[os.path.relpath(path, directory)] = [cached, *(_stat(path) or [0, 0])]
+            else:
+                complete = False
+    return _document(directory, files, complete)
+
+
+def _document(directory: str, files: dict[str, list], complete: bool) -> dict:
+    return {
+        "directory": directory,
+        "files": files,
+        "total": sum(entry[0] for entry in files.values()),
+        "complete": complete,
+    }
+
+
+def _verify(index: dict) -> dict:
+    """Re-check every entry against the filesystem (violation path only)."""
+    directory = index["directory"]
+    files = {}
+    for rel, entry in index["files"].items():
+        path = os.path.join(directory, rel)
+        current = _stat(path)
+        if current is None:
+            continue  # Deleted since it was indexed, or the write never happened
+        if entry[1] is _UNKNOWN or entry[1:] != current:
+            tokens = _count_path(path)
+            if tokens is None:
+                continue
+            entry = [tokens, *current]
+        files[rel] = entry
+    return _document(directory, files, index.get("complete", False))
+
+
+def check_budgets(
+    file_path: str, tokens: int, budgets: list[tuple[str, int]]
+) -> dict[str, int | str | bool] | None:
+    """
+    Apply a pending write of tokens to every budgeted directory's index.
+
+    Returns a violation for the first directory whose total would exceed its
+    budget (recording nothing), otherwise records the write in every index.
+    """
+    abs_path = os.path.abspath(file_path)
+    updates = []
+    for directory, budget in budgets:
+        index_file = _index_path(directory)
+        with locked(index_file):
+            index = load_json(index_file) or _seed(directory)
+            rel = os.path.relpath(abs_path, directory)
+            old = index["files"].get(rel, [0])[0]
+            total = index["total"] - old + tokens
+            if total > budget:
+                index = _verify(index)
+                save_json(index_file, index)
+                old = index["files"].get(rel, [0])[0]
+                total = index["total"] - old + tokens
+            if total > budget:
+                return {
+                    "directory": directory,
+                    "file": file_path,
+                    "file_tokens": tokens,
+                    "tokens": total,
+                    "limit": budget,
+                    "excess": total - budget,
+                    "complete": index.get("complete", False),
+                }
+            updates.append((index_file, index, rel))
+
+    for index_file, index, rel in updates:
+        with locked(index_file):
+            index = load_json(index_file) or index  # Pick up concurrent writers
+            index["total"] -= index["files"].get(rel, [0])[0]
+            index["files"][rel] = [tokens, _UNKNOWN, _UNKNOWN]
+            index["total"] += tokens
+            save_json(index_file, index)
+    return None
+
+
+def record_directory(directory: str, counts: dict[str, int], complete: bool) -> None:
+    """Replace a directory's index with counts for absolute paths (scanner)."""
+    files = {
+        os.path.relpath(path, directory): [tokens, *(_stat(path) or [0, 0])]
+        for path, tokens in counts.items()
+    }
+    index_file = _index_path(directory)
+    with locked(index_file):
+        if not complete:
+            previous = load_json(index_file)
+            if previous:
+                files = {**previous["files"], **files}
+                complete = previous.get("complete", False)
+        save_json(index_file, _document(directory, files, complete))
+
+
+def directory_total(directory: str) -> int:
+    """Indexed token total for a directory (0 when not indexed)."""
+    index = load_json(_index_path(directory))
+    return index["total"] if index else 0
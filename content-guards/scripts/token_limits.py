@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Token limit configuration and counting shared by validate-token-limits.py
+and scan-token-limits.py.
+
+Token counts are cached by content hash under the content-guards cache
+directory (one small file per digest, sharded like git objects), so the
+hook and the repo-wide scanner never count identical content twice.
+
+The hook only needs to know whether content exceeds its limit, so
+exceeds_limit() avoids exact counting where it can: content with no more
+UTF-8 bytes than the limit cannot exceed it (every token spans at least one
+byte), content up to about twice the limit is counted in one atc call, and
+larger content is counted in chunks of that size that stop as soon as the
+running total is provably over the limit.
+"""
+import fnmatch
+import functools
+import re
+import subprocess
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Optional
+
+from config_discovery import find_config
+from guard_state import content_hash, load_json, save_json, state_path
+
+DEFAULT_LIMIT = 2000
+BINARY_EXTENSIONS = ('.png', '.jpg', '.pdf', '.bin', '.zip')
+ATC_MODEL = 'sonnet'
+
+# Streaming chunk size, in characters per token of the applicable limit:
+# about twice the limit at a typical 4 characters per token, so one atc call
+# usually settles a file. Only sizes the chunks; verdicts always come from
+# counted tokens.
+STREAM_CHARS_PER_TOKEN = 8
+# Splitting content can turn one token into two at each chunk boundary, so a
+# streamed total may overcount by up to this many tokens per boundary.
+BOUNDARY_SLACK = 2
+# Content counted alone and doubled to measure atc's fixed per-call tokens
+OVERHEAD_PROBE = 'x'
+
+
+def find_config_file(start: Optional[Path] = None) -> Optional[Path]:
+    """
+    Search upward from start (default: current working directory) for
+    .token-limits.yaml
+
+    This allows the hook to work from any subdirectory, similar to how
+    git finds .git/ by traversing parent directories. The walk is shared
+    with the other validators through config_discovery.
+    """
+    found = find_config('.token-limits.yaml', str(start or Path.cwd()), max_levels=10)
+    return Path(found) if found else None
+
+
+@functools.lru_cache(maxsize=8)
+def _read_config(config_path: Optional[Path]) -> dict:
+    if not config_path:
+        return {}
+    try:
+        import yaml
+        with open(config_path) as f:
+            return yaml.safe_load(f) or {}
+    except Exception:
+        return {}
+
+
+def load_config(config_path: Optional[Path] = None) -> tuple[dict[str, int], int]:
+    """Load token limits from .token-limits.yaml"""
+    # No config found (or unreadable): use sensible defaults
+    config = _read_config(config_path or find_config_file())
+    try:
+        limits = config.get('limits', {})
+        default = config.get('defaults', {}).get('max_tokens', DEFAULT_LIMIT)
+        return limits, default
+    except AttributeError:
+        return {}, DEFAULT_LIMIT
+
+
+def load_directory_limits(config_path: Optional[Path] = None) -> dict[str, int]:
+    """Load optional per-directory aggregate budgets from .token-limits.yaml"""
+    limits = _read_config(config_path or find_config_file()).get('directory_limits')
+    return limits if isinstance(limits, dict) else {}
+
+
+def get_file_limit(file_path: str, limits: dict[str, int], default_limit: int) -> int:
+    """Find applicable token limit for file"""
+    for pattern, limit in reversed(list(limits.items())):
+        if fnmatch.fnmatch(file_path, pattern):
+            return limit
+    return default_limit
+
+
+def is_binary_path(file_path: str) -> bool:
+    """Return True for file types that are never token-counted"""
+    return file_path.endswith(BINARY_EXTENSIONS)
+
+
+def count_tokens(content: str) -> Optional[int]:
+    """Count tokens in content using atc"""
+    try:
+        result = subprocess.run(
+            ['atc', '-m', ATC_MODEL],
+            input=content,
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        output = result.stdout + result.stderr
+
+        # Extract token count
+        for line in output.split('\n'):
+            if 'token' in line.lower():
+                match = re.search(r'(\d+)\s+token', line)
+                if match:
+                    return int(match.group(1))
+
+        # Try parsing first number
+        try:
+            return int(output.strip().split()[0])
+        except (ValueError, IndexError):
+            return None
+    except (subprocess.TimeoutExpired, subprocess.SubprocessError, OSError):
+        return None
+
+
+def _cache_entry(digest: str) -> Path:
+    return state_path(f'tokens-{ATC_MODEL}', digest[:2], digest[2:])
+
+
+def lookup_cached_tokens(content: str | bytes) -> Optional[int]:
+    """Cached token count for content, without ever running the counter"""
+    cached = load_json(_cache_entry(content_hash(content)))
+    return cached if isinstance(cached, int) else None
+
+
+def cached_count_tokens(content: str) -> Optional[int]:
+    """count_tokens() memoized by content hash; failures are not cached"""
+    cached = lookup_cached_tokens(content)
+    if cached is not None:
+        return cached
+    tokens = count_tokens(content)
+    if tokens is not None:
+        save_json(_cache_entry(content_hash(content)), tokens)
+    return tokens
+
+
+def iter_chunks(content: str, chunk_chars: int) -> Iterator[str]:
+    """Yield consecutive slices of roughly chunk_chars, split after a newline where possible"""
+    start = 0
+    while start < len(content):
+        end = min(start + chunk_chars, len(content))
+        if end < len(content):
+            newline = content.rfind('\n', start, end)
+            if newline > start:
+                end = newline + 1
+        yield content[start:end]
+        start = end
+
+
+def call_overhead() -> Optional[int]:
+    """
+    Tokens atc adds to every count regardless of content, measured as
+    2 * count(p) - count(pp). Merges inside pp can only raise the estimate,
+    so subtracting it per extra chunk keeps a streamed total a lower bound.
+    """
+    single = cached_count_tokens(OVERHEAD_PROBE)
+    double = cached_count_tokens(OVERHEAD_PROBE * 2)
+    if single is None or double is None:
+        return None
+    return max(2 * single - double, 0)
+
+
+def exceeds_limit(content: str, limit: int) -> Optional[tuple[int, bool]]:
+    """
+    Decide whether content exceeds limit without counting more than needed.
+
+    Returns None when content is within the limit or cannot be counted
+    (fail open). Otherwise returns (tokens, exact): exact is False when
+    counting stopped early, in which case tokens is a lower bound on the
+    exact count, already over the limit. Work is proportional to the limit,
+    not the payload.
+    """
+    # Upper bound: at most one token per byte (chars <= bytes, so only
+    # short content needs encoding to check)
+    if len(content) <= limit and len(content.encode('utf-8')) <= limit:
+        return None
+
+    chunk_chars = max(limit, 1) * STREAM_CHARS_PER_TOKEN
+    if len(content) <= chunk_chars:
+        tokens = cached_count_tokens(content)
+        return (tokens, True) if tokens is not None and tokens > limit else None
+
+    total = 0
+    overhead = None  # Measured only once a streamed verdict depends on it
+    for boundaries, chunk in enumerate(iter_chunks(content, chunk_chars)):
+        tokens = cached_count_tokens(chunk)
+        if tokens is None:
+            return None
+        total += tokens
+        if total - boundaries * BOUNDARY_SLACK <= limit:
+            continue
+        if boundaries and overhead is None:  # Each extra chunk repeats atc's overhead
+            overhead = call_overhead()
+            if overhead is None:
+                return None
+        lower = total - boundaries * ((overhead or 0) + BOUNDARY_SLACK)
+        if lower > limit:
+            return lower, False
+
+    # Chunking only overcounts, so a streamed total within the limit is final
+    if total <= limit:
+        return None
+    # Streamed total is within slack and per-call overhead of the limit: settle it exactly
+    tokens = cached_count_tokens(content)
+    return (tokens, True) if tokens is not None and tokens > limit else None
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Domain and URL-prefix policy for webfetch-guard.py.
+
+Rules come from a .url-policy.yaml found upward from the session's working
+directory (or the file named by $CONTENT_GUARDS_URL_POLICY):
+
+  deny:                                  # list of patterns...
+    - contentfarm.example
+    - example.com/blog/
+  allow:
+    - mirror.example.com
+  warn:                                  # ...or pattern: message
+    docs.old.example: Use docs.new.example instead
+
+Pattern forms:
+  example.com          the domain and all its subdomains, any path
+  =example.com         that exact host only
+  example.com/docs     a path prefix, by whole segments (/docs, /docs/x,
+                       not /docsx), on the domain and its subdomains
+  *.example.com        read as example.com
+
+The most specific matching rule wins: more host labels first, then more
+path segments; at equal specificity deny beats warn beats allow.
+
+Rules compile into a SQLite table keyed by (reversed host, path): a rule
+for example.com/docs is stored under "com.example" and "docs". A lookup
+queries only the keys the URL can match, its host suffixes crossed with
+its path prefixes, so one hook call reads a handful of rows however many
+rules there are. The compiled database is rebuilt only when the rules
+file's mtime or size changes, so YAML is only parsed after an edit.
+"""
+
+import os
+import posixpath
+import re
+import sqlite3
+import tempfile
+from urllib.parse import unquote, urlsplit
+
+from config_discovery import find_config
+from guard_state import content_hash, state_path
+
+CONFIG_NAME = ".url-policy.yaml"
+ACTIONS = ("allow", "warn", "deny")  # Ascending precedence at equal specificity
+COMPILED_VERSION = 2
+
+# site: as its own term; -site: excludes a domain and is not a target
+_SITE_RE = re.compile(r"(?:^|[\s(])site:(\S+)", re.IGNORECASE)
+
+
+def _host(raw: str) -> str | None:
+    # Escapes are decoded so %63ontentfarm.example cannot dodge a rule; a
+    # host that still has one after decoding (%2563...) is rejected
+    host = unquote(raw).strip().rstrip(".").lower()
+    if not host or any(c in host for c in "/ @%"):
+        return None
+    try:
+        return host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+
+
+def _segments(path: str) -> list[str]:
+    path = posixpath.normpath("/" + unquote(path or "/"))
+    return [s for s in path.split("/") if s]
+
+
+def normalize_url(url: str) -> tuple[list[str], list[str]] | None:
+    """(host labels, path segments) of url; bare hosts are accepted."""
+    url = url.strip()
+    if "://" not in url:
+        url = "//" + url
+    try:
+        parts = urlsplit(url)
+        host = _host(parts.hostname or "")
+    except ValueError:
+        return None
+    if host is None:
+        return None
+    return host.split("."), _segments(parts.path)
+
+
+def _parse_pattern(pattern: str) -> tuple[bool, list[str], list[str]] | None:
+    exact = pattern.startswith("=")
+    host, _, path = pattern.lstrip("=").partition("/")
+    host = _host(host.removeprefix("*."))
+    if host is None:
+        return None
+    return exact, host.split("."), _segments(path)
+
+
+def _rows(config: dict) -> dict[tuple[str, str, int], tuple[str, str, str]]:
+    """(reversed host, path, exact) -> (action, message, pattern) for every rule."""
+    rows: dict[tuple[str, str, int], tuple[str, str, str]] = {}
+    for action in ACTIONS:
+        entries = config.get(action) or []
+        if isinstance(entries, dict):
+            entries = entries.items()
+        else:
+            entries = [(e, "") for e in entries if isinstance(e, str)]
+        for pattern, message in entries:
+            parsed = _parse_pattern(str(pattern))
+            if parsed is None:
+                continue
+            exact, labels, segments = parsed
+            key = (".".join(reversed(labels)), "/".join(segments), int(exact))
+            current = rows.get(key)
+            if current is None or ACTIONS.index(action) > ACTIONS.index(current[0]):
+                rows[key] = (action, str(message or ""), str(pattern))
+    return rows
+
+
+class UrlPolicy:
+    """Compiled rules in a SQLite database (a file, or in memory)."""
+
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def lookup(self, url: str) -> list | None:
+        """[action, message, pattern] of the most specific rule for url, or None."""
+        normalized = normalize_url(url)
+        if normalized is None:
+            return None
+        labels, segments = normalized
+        hosts = [".".join(reversed(labels[-depth:])) for depth in range(1, len(labels) + 1)]
+        paths = ["/".join(segments[:depth]) for depth in range(len(segments) + 1)]
+        rows = self.db.execute(
+            f"SELECT host, path, exact, action, message, pattern FROM rules "
+            f"WHERE host IN ({','.join('?' * len(hosts))}) "
+            f"AND path IN ({','.join('?' * len(paths))})",
+            (*hosts, *paths),
+        ).fetchall()
+        best, rule = None, None
+        for host, path, exact, action, message, pattern in rows:
+            depth = host.count(".") + 1
+            if exact and depth != len(labels):
+                continue
+            key = (depth, len(path.split("/")) if path else 0, ACTIONS.index(action))
+            if best is None or key > best:
+                best, rule = key, [action, message, pattern]
+        return rule
+
+
+def _create(db: sqlite3.Connection, rows: dict, stamp: str) -> None:
+    db.executescript(
+        "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);"
+        "CREATE TABLE rules (host TEXT, path TEXT, exact INTEGER, action TEXT,"
+        " message TEXT, pattern TEXT, PRIMARY KEY (host, path, exact)) WITHOUT ROWID;"
+    )
+    with db:
+        db.executemany(
+            "INSERT INTO rules VALUES (?, ?, ?, ?, ?, ?)",
+            [(*key, *rule) for key, rule in rows.items()],
+        )
+        db.execute("INSERT INTO meta VALUES ('stamp', ?)", (stamp,))
+
+
+def compile_rules(config: dict) -> UrlPolicy:
+    """Compile deny/allow/warn sections into an in-memory policy."""
+    db = sqlite3.connect(":memory:")
+    _create(db, _rows(config), "")
+    return UrlPolicy(db)
+
+
+def site_domains(query: str) -> list[str]:
+    """Domains named by site: operators in a search query."""
+    return [m.group(1).strip("\"'()") for m in _SITE_RE.finditer(query)]
+
+
+def policy_file(start: str) -> str | None:
+    override = os.environ.get("CONTENT_GUARDS_URL_POLICY")
+    if override:
+        return override if os.path.isfile(override) else None
+    return find_config(CONFIG_NAME, start, max_levels=10)
+
+
+def _open(db_file: str, stamp: str) -> UrlPolicy | None:
+    """The compiled policy in db_file if it was compiled from stamp."""
+    try:
+        db = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+        row = db.execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None or row[0] != stamp:
+        db.close()
+        return None
+    return UrlPolicy(db)
+
+
+def load_policy(path: str) -> UrlPolicy | None:
+    """Compiled policy for the rules file, recompiled only when it changes."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = f"{COMPILED_VERSION}:{st.st_mtime_ns}:{st.st_size}"
+    db_file = str(state_path("url-policy", content_hash(os.path.abspath(path))[:24] + ".sqlite3"))
+    policy = _open(db_file, stamp)
+    if policy is not None:
+        return policy
+    try:
+        import yaml
+        with open(path, encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+    except Exception:
+        return None  # Missing PyYAML or a bad rules file: fail open
+    if not isinstance(config, dict):
+        return None
+    rows = _rows(config)
+    try:  # Build beside the target and swap it in, so readers never see half a table
+        os.makedirs(os.path.dirname(db_file), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(db_file), suffix=".tmp")
+        os.close(fd)
+        db = sqlite3.connect(tmp)
+        _create(db, rows, stamp)
+        db.close()
+        os.replace(tmp, db_file)
+    except (OSError, sqlite3.Error):
+        db = sqlite3.connect(":memory:")  # Cache not writable: compile for this call only
+        _create(db, rows, stamp)
+        return UrlPolicy(db)
+    return _open(db_file, stamp)
@@ -2,7 +2,9 @@
 # PostToolUse hook: Validate markdown files after Write/Edit operations
 #
 # This hook runs automatically after Write or Edit tool calls.
-# It validates .md files with markdownlint-cli2.
+# It validates .md files with markdownlint-cli2, through the persistent
+# lint worker (lint_worker.py) when available. With CONTENT_GUARDS_DEFERRED=1
+# it only queues the file for flush-validation-queue.py at the end of the turn.
 #
 # Exit codes:
 #   0 - Success (validation passed or not a markdown file)
@@ -16,7 +18,8 @@ if ! command -v jq &>/dev/null; then
 fi
 
 # Extract the file path from stdin, which contains the hook input JSON
-file_path=$(jq -r '.tool_input.file_path // empty')
+hook_input=$(cat)
+file_path=$(jq -r '.tool_input.file_path // empty' <<<"$hook_input")
 
 # Exit silently if no file path
 if [[ -z "$file_path" ]]; then
@@ -46,6 +49,22 @@ if [[ ! -f "$file_path" ]]; then
   exit 0
 fi
 
+# Work with an absolute path so discovered config directories are comparable
+if [[ "$file_path" != /* ]]; then
+  file_path="$PWD/$file_path"
+fi
+
+script_dir="$(dirname -- "${BASH_SOURCE[0]}")"
+
+# Deferred mode: queue the file for flush-validation-queue.py (Stop hook),
+# which validates it once however many times it is edited this turn
+if [[ "${CONTENT_GUARDS_DEFERRED:-}" == "1" ]] && command -v python3 &>/dev/null; then
+  session_id=$(jq -r '.session_id // empty' <<<"$hook_input")
+  if python3 "$script_dir/validation_queue.py" add "$session_id" markdown "$file_path" 2>/dev/null; then
+    exit 0
+  fi
+fi
+
 # Collect validation errors
 errors=()
 
@@ -128,14 +147,26 @@ EOF
     lint_file="${file_path#${lint_dir}/}"
   fi
 
-  if ! markdownlint_output=$( {
-    cd "$lint_dir" || exit 1
-    if (( ${#config_flag[@]} > 0 )); then
-      markdownlint-cli2 "${config_flag[@]}" "$lint_file"
-    else
-      markdownlint-cli2 "$lint_file"
-    fi
-  } 2>&1 ); then
+  # Prefer the persistent lint worker (no Node cold start per edit); exit 3
+  # means it is unavailable and the CLI runs instead.
+  lint_status=3
+  if command -v python3 &>/dev/null && command -v node &>/dev/null; then
+    lint_status=0
+    markdownlint_output=$(python3 "$script_dir/lint_worker.py" lint "$lint_dir" \
+      ${config_flag[@]+"${config_flag[@]}"} "$lint_file" 2>/dev/null) || lint_status=$?
+  fi
+  if (( lint_status == 3 )); then
+    lint_status=0
+    markdownlint_output=$( {
+      cd "$lint_dir" || exit 1
+      if (( ${#config_flag[@]} > 0 )); then
+        markdownlint-cli2 "${config_flag[@]}" "$lint_file"
+      else
+        markdownlint-cli2 "$lint_file"
+      fi
+    } 2>&1 ) || lint_status=$?
+  fi
+  if (( lint_status != 0 )); then
     errors+=("markdownlint-cli2 failed:")
     errors+=("$markdownlint_output")
   fi
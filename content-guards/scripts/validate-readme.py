@@ -6,6 +6,13 @@ and installation code blocks.
 
 Configuration: .readme-validator.yaml (searches upward from file's directory)
 
+The rules live in readme_rules.py, shared with scan-markdown.py. Results
+are recorded in the repository's README index (readme_index.py), which
+scan-markdown.py shares; re-saving an unchanged README is served from it
+after one stat or one hash. With CONTENT_GUARDS_DEFERRED=1
+the file is only queued, and flush-validation-queue.py validates it at the
+end of the turn.
+
 Exit codes:
   0 = allow (pass or non-critical warnings only)
   2 = block (missing required sections)
@@ -14,111 +21,16 @@ Input: JSON from stdin with tool_input.file_path containing the edited file
 """
 
 import json
+import os
 import re
 import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def find_config_file(start_path: Path) -> Path | None:
-    """
-    Search upward from file's directory for .readme-validator.yaml.
-
-    Walks up to 10 directory levels, similar to how git finds .git/.
-    """
-    current = start_path if start_path.is_dir() else start_path.parent
-    for _ in range(10):
-        config = current / ".readme-validator.yaml"
-        if config.exists():
-            return config
-        if current.parent == current:  # Reached filesystem root
-            break
-        current = current.parent
-    return None
-
-
-def parse_simple_yaml(text: str) -> dict:
-    """Parse the subset of YAML used by .readme-validator.yaml (scalars and lists)."""
-    result: dict = {}
-    current_key = None
-    current_list: list[str] | None = None
-
-    for line in text.splitlines():
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-        if stripped.startswith("- ") and current_key is not None:
-            if current_list is None:
-                current_list = []
-            current_list.append(stripped[2:].strip())
-            continue
-        if current_key is not None:
-            if current_list is not None:
-                result[current_key] = current_list
-            current_list = None
-            current_key = None
-        if ":" in stripped:
-            key, _, value = stripped.partition(":")
-            key = key.strip()
-            value = value.strip()
-            if value:
-                result[key] = value
-            else:
-                current_key = key
-    if current_key is not None and current_list is not None:
-        result[current_key] = current_list
-    return result
-
-
-def load_config(file_path: Path) -> dict:
-    """Load README validation config from .readme-validator.yaml."""
-    defaults = {
-        "required_sections": ["Installation", "Usage"],
-        "optional_sections": ["Contributing", "License", "API"],
-    }
-    config_path = find_config_file(file_path)
-    if not config_path:
-        return defaults
-    try:
-        text = config_path.read_text(encoding="utf-8")
-        config = parse_simple_yaml(text)
-        return {
-            "required_sections": config.get(
-                "required_sections", defaults["required_sections"]
-            ),
-            "optional_sections": config.get(
-                "optional_sections", defaults["optional_sections"]
-            ),
-        }
-    except (OSError, ValueError):
-        return defaults
-
-
-def parse_headings(content: str) -> list[str]:
-    """Extract all h1, h2, and h3 headings from markdown content."""
-    headings = []
-    for line in content.splitlines():
-        match = re.match(r"^#{1,3}\s+(.+)$", line)
-        if match:
-            headings.append(match.group(1).strip())
-    return headings
-
-
-def check_required_sections(content: str, required: list[str]) -> list[str]:
-    """Check that all required sections exist. Returns list of missing section names."""
-    headings_lower = [h.lower() for h in parse_headings(content)]
-    return [s for s in required if s.lower() not in headings_lower]
-
-
-def check_install_code_blocks(content: str) -> bool:
-    """Check that the Installation section contains at least one code block."""
-    pattern = re.compile(r"^#{1,3}\s+Installation\s*$", re.IGNORECASE | re.MULTILINE)
-    match = pattern.search(content)
-    if not match:
-        return True  # No Installation section; required-sections check handles this
-    start = match.end()
-    next_heading = re.search(r"^#{1,3}\s+", content[start:], re.MULTILINE)
-    section = content[start : start + next_heading.start()] if next_heading else content[start:]
-    return "```" in section
+from readme_index import ReadmeIndex  # noqa: E402
+from readme_rules import README_RE  # noqa: E402
+from validation_queue import deferred_enabled, enqueue  # noqa: E402
 
 
 def main() -> None:
@@ -136,7 +48,7 @@ def main() -> None:
 
     # Only act on README files
     file_name = Path(file_path).name
-    if not re.match(r"README.*\.md$", file_name, re.IGNORECASE):
+    if not re.match(README_RE, file_name, re.IGNORECASE):
         sys.exit(0)
 
     # Skip if file doesn't exist
@@ -144,33 +56,16 @@ def main() -> None:
     if not path.exists():
         sys.exit(0)
 
-    config = load_config(path)
+    if deferred_enabled():  # Validated once at turn end by flush-validation-queue.py
+        enqueue(str(hook_input.get("session_id", "")), "readme", str(path))
+        sys.exit(0)
 
-    try:
-        content = path.read_text(encoding="utf-8")
-    except OSError:
+    index = ReadmeIndex.for_path(path)
+    result = index.check(path)
+    if result is None:
         sys.exit(0)  # Can't read file, fail open
-
-    errors = []
-    warnings = []
-
-    missing = check_required_sections(content, config["required_sections"])
-    if missing:
-        errors.append(f"Missing required sections: {', '.join(missing)}")
-
-    if not check_install_code_blocks(content):
-        warnings.append(
-            "Installation section has no code blocks "
-            "(expected at least one ``` code block with install steps)"
-        )
-
-    # Check optional sections (warnings only)
-    headings_lower = [h.lower() for h in parse_headings(content)]
-    missing_optional = [
-        s for s in config["optional_sections"] if s.lower() not in headings_lower
-    ]
-    if missing_optional:
-        warnings.append(f"Missing optional sections: {', '.join(missing_optional)}")
+    index.save()
+    errors, warnings = result
 
     if warnings:
         print(f"README validation warnings for: {file_path}", file=sys.stderr)
@@ -4,112 +4,110 @@ Claude Code PreToolUse hook for token limit enforcement.
 Blocks file modifications (Write/Edit tools) that would exceed token limits.
 
 Configuration: .token-limits.yaml (searches upward from cwd)
+  limits / defaults.max_tokens  per-file limits
+  directory_limits              optional per-directory aggregate budgets,
+                                checked against an incremental index
+                                (see token_index.py)
+
+Edits are checked against directory budgets only, judged by the file as
+it will be after the edit. Edits that do not lengthen the file are never
+blocked, so an oversized file or directory can always be cut down.
 """
-import fnmatch
 import json
-import re
-import subprocess
+import os
 import sys
 from pathlib import Path
 from typing import Optional
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def find_config_file() -> Optional[Path]:
-    """
-    Search upward from current working directory for .token-limits.yaml
-
-    This allows the hook to work from any subdirectory, similar to how
-    git finds .git/ by traversing parent directories.
-    """
-    current = Path.cwd()
-    for _ in range(10):  # Search up to 10 directory levels
-        config = current / '.token-limits.yaml'
-        if config.exists():
-            return config
-        if current.parent == current:  # Reached filesystem root
-            break
-        current = current.parent
-    return None
-
-
-def load_config() -> tuple[dict[str, int], int]:
-    """Load token limits from .token-limits.yaml"""
-    config_path = find_config_file()
-    if not config_path:
-        # No config found, use sensible defaults
-        return {}, 2000
-
-    try:
-        import yaml
-        with open(config_path) as f:
-            config = yaml.safe_load(f) or {}
-        limits = config.get('limits', {})
-        default = config.get('defaults', {}).get('max_tokens', 2000)
-        return limits, default
-    except Exception:
-        return {}, 2000
-
-
-def get_file_limit(file_path: str, limits: dict[str, int], default_limit: int) -> int:
-    """Find applicable token limit for file"""
-    for pattern, limit in reversed(list(limits.items())):
-        if fnmatch.fnmatch(file_path, pattern):
-            return limit
-    return default_limit
-
-
-def count_tokens(content: str) -> Optional[int]:
-    """Count tokens in content using atc"""
-    try:
-        result = subprocess.run(
-            ['atc', '-m', 'sonnet'],
-            input=content,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        output = result.stdout + result.stderr
-
-        # Extract token count
-        for line in output.split('\n'):
-            if 'token' in line.lower():
-                match = re.search(r'(\d+)\s+token', line)
-                if match:
-                    return int(match.group(1))
-
-        # Try parsing first number
-        try:
-            return int(output.strip().split()[0])
-        except (ValueError, IndexError):
-            return None
-    except (subprocess.TimeoutExpired, subprocess.SubprocessError, OSError):
-        return None
+from token_index import budget_dirs, check_budgets  # noqa: E402
+from token_limits import (  # noqa: E402
+    cached_count_tokens,
+    exceeds_limit,
+    get_file_limit,
+    is_binary_path,
+    load_config,
+    load_directory_limits,
+)
 
 
-def validate_file(file_path: str, content: str) -> Optional[dict[str, int | str]]:
-    """Check if file would violate token limits"""
+def validate_file(
+    file_path: str, content: str, file_limits: bool = True
+) -> Optional[dict[str, int | str | bool]]:
+    """Check if file would violate token limits (only directory budgets unless file_limits)"""
     limits, default_limit = load_config()
     file_limit = get_file_limit(file_path, limits, default_limit)
 
     # Skip binary files
-    if file_path.endswith(('.png', '.jpg', '.pdf', '.bin', '.zip')):
-        return None
-
-    # Count tokens
-    tokens = count_tokens(content)
-    if tokens is None:
-        # Can't count, allow (will catch in CI)
+    if is_binary_path(file_path):
         return None
 
-    if tokens > file_limit:
+    # Count tokens, stopping as soon as the limit is provably exceeded.
+    # None means within the limit or can't count (allow; will catch in CI).
+    over = exceeds_limit(content, file_limit) if file_limits else None
+    if over is not None:
+        tokens, exact = over
         return {
             'file': file_path,
-            'tokens': tokens,
+            'tokens': tokens if exact else f'{tokens}+',
             'limit': file_limit,
             'excess': tokens - file_limit
         }
 
-    return None
+    # Directory budgets need this file's exact count; other files come
+    # from the index and are never re-tokenized
+    budgets = budget_dirs(file_path, load_directory_limits())
+    if not budgets:
+        return None
+    tokens = cached_count_tokens(content)
+    if tokens is None:
+        return None
+    return check_budgets(file_path, tokens, budgets)
+
+
+def post_edit_content(tool_input: dict) -> Optional[str]:
+    """
+    File content after an Edit, or None when the edit cannot grow the file
+    or the file cannot be reconstructed (the Edit itself will then fail).
+    """
+    file_path = tool_input.get('file_path', '')
+    old = tool_input.get('old_string') or ''
+    new = tool_input.get('new_string') or ''
+    if not old or len(new) <= len(old):
+        return None
+    try:
+        text = Path(file_path).read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return None
+    if old not in text:
+        return None
+    return text.replace(old, new, -1 if tool_input.get('replace_all') else 1)
+
+
+def directory_budget_error(violation: dict) -> str:
+    """Block message for a directory whose aggregate budget would be exceeded"""
+    partial = '' if violation['complete'] else (
+        "   (index seeded from cached counts only; run scan-token-limits.py\n"
+        "    to include files never counted — the real total is higher)\n"
+    )
+    return (
+        f"❌ Directory token budget exceeded: {violation['directory']}\n"
+        f"   Tokens: {violation['tokens']} (budget: {violation['limit']}, "
+        f"excess: +{violation['excess']})\n"
+        f"   Writing {violation['file']} ({violation['file_tokens']} tokens) "
+        f"would push the directory over its budget.\n"
+        f"{partial}"
+        f"\n"
+        f"Everything in this directory is loaded into agent context together.\n"
+        f"\n"
+        f"HOW TO RESOLVE:\n"
+        f"1. Move reference material the agent rarely needs out of the directory\n"
+        f"2. Merge or remove files that duplicate each other\n"
+        f"3. Split the directory so agents load only the part they need\n"
+        f"\n"
+        f"Do not raise directory_limits in .token-limits.yaml to paper over the issue."
+    )
 
 
 def main() -> None:
@@ -126,13 +124,19 @@ def main() -> None:
         sys.exit(0)
 
     file_path = tool_input.get('file_path', '')
-    content = tool_input.get('content', '')
+    if tool_name == 'Edit':
+        content = post_edit_content(tool_input) if file_path else None
+    else:
+        content = tool_input.get('content', '')
 
     if not file_path or not content:
         sys.exit(0)
 
     # Validate
-    violation = validate_file(file_path, content)
+    violation = validate_file(file_path, content, file_limits=tool_name == 'Write')
+    if violation and 'directory' in violation:
+        print(directory_budget_error(violation), file=sys.stderr)
+        sys.exit(2)  # Block the operation
     if violation:
         error = (
             f"❌ Token limit violation: {violation['file']}\n"
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Per-session queue of files awaiting deferred validation.
+
+With CONTENT_GUARDS_DEFERRED=1, the PostToolUse validators
+(validate-markdown.sh, validate-readme.py) only record the edited path
+here; flush-validation-queue.py validates each queued file once when the
+turn ends. Ten edits to one README then cost one validation, not ten.
+
+The queue maps each absolute path to the validators that queued it:
+
+  {"/repo/README.md": ["markdown", "readme"]}
+
+CLI (used by validate-markdown.sh):
+  validation_queue.py add <session_id> <validator> <path>
+"""
+
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from guard_state import load_json, locked, save_json, state_path  # noqa: E402
+
+MAX_AGE_SECONDS = 86400  # Queues of sessions that never reached a Stop
+
+
+def deferred_enabled() -> bool:
+    return os.environ.get("CONTENT_GUARDS_DEFERRED", "") == "1"
+
+
+def queue_path(session_id: str) -> Path:
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id or "default").lstrip(".")
+    return state_path("deferred", f"{safe or 'default'}.json")
+
+
+def enqueue(session_id: str, validator: str, path: str) -> None:
+    """Queue path for validator; a path already queued is not added twice."""
+    queue_file = queue_path(session_id)
+    with locked(queue_file):
+        queue = load_json(queue_file, {})
+        if not isinstance(queue, dict):
+            queue = {}
+        validators = set(queue.get(os.path.abspath(path), []))
+        if validator in validators:
+            return
+        validators.add(validator)
+        queue[os.path.abspath(path)] = sorted(validators)
+        save_json(queue_file, queue)
+
+
+def drain(session_id: str) -> dict[str, list[str]]:
+    """Remove and return the session's queue (empty when nothing is queued)."""
+    queue_file = queue_path(session_id)
+    with locked(queue_file):
+        queue = load_json(queue_file, {})
+        try:
+            queue_file.unlink()
+        except OSError:
+            pass
+    _prune(queue_file.parent)
+    return queue if isinstance(queue, dict) else {}
+
+
+def _prune(directory: Path) -> None:
+    cutoff = time.time() - MAX_AGE_SECONDS
+    try:
+        for entry in os.scandir(directory):
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+    except OSError:
+        pass
+
+
+def main() -> None:
+    if len(sys.argv) == 5 and sys.argv[1] == "add":
+        enqueue(sys.argv[2], sys.argv[3], sys.argv[4])
+        sys.exit(0)
+    print("usage: validation_queue.py add <session_id> <validator> <path>", file=sys.stderr)
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,34 +2,56 @@
 """
 WebFetch Guard Hook
 
-Blocks outdated year references in WebFetch/WebSearch tool calls.
-Grace period (Jan-Mar): allows previous year, blocks 2+ years ago.
-After grace period (Apr-Dec): blocks previous year and older.
-Warns (but allows) current year searches.
+Runs WebFetch/WebSearch tool calls through two stages:
+
+1. URL policy: the fetched URL (or a search's site: domains) is matched
+   against the deny/allow/warn rules of .url-policy.yaml (url_policy.py).
+2. Year check: blocks outdated year references.
+   Grace period (Jan-Mar): allows previous year, blocks 2+ years ago.
+   After grace period (Apr-Dec): blocks previous year and older.
+   Warns (but allows) current year searches.
+
+The first stage to deny decides; warnings from all stages are combined.
 """
 
 import json
+import os
 import re
 import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-def main():
-    try:
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        sys.exit(1)
+from url_policy import load_policy, policy_file, site_domains  # noqa: E402
 
-    tool_name = input_data.get("tool_name", "")
-    if tool_name not in ("WebFetch", "WebSearch"):
-        sys.exit(0)
 
-    tool_input = input_data.get("tool_input", {})
-    text = (
-        f"{tool_input.get('url', '')} {tool_input.get('prompt', '')}"
-        if tool_name == "WebFetch"
-        else tool_input.get("query", "")
-    )
+def policy_stage(tool_name: str, tool_input: dict, cwd: str) -> tuple[str, str] | None:
+    """(decision, reason) from the URL policy, or None when no rule applies."""
+    path = policy_file(cwd)
+    policy = load_policy(path) if path else None
+    if policy is None:
+        return None
+    if tool_name == "WebFetch":
+        targets = [str(tool_input.get("url", ""))]
+    else:
+        targets = site_domains(str(tool_input.get("query", "")))
+    warnings = []
+    for target in targets:
+        rule = policy.lookup(target)
+        if rule is None or rule[0] == "allow":
+            continue
+        action, message, pattern = rule
+        detail = f"\n\n{message}" if message else ""
+        if action == "deny":
+            return "deny", (
+                f"BLOCKED: {target} matches URL policy rule '{pattern}' in {path}.{detail}"
+            )
+        warnings.append(f"WARNING: {target} matches URL policy rule '{pattern}'.{detail}")
+    return ("allow", "\n\n".join(warnings)) if warnings else None
+
+
+def year_stage(text: str) -> tuple[str, str] | None:
+    """(decision, reason) for year references in text, or None."""
     text_lower = text.lower()
 
     # Strip well-known identifier patterns that legitimately contain years but
@@ -57,40 +79,59 @@ def main():
 
     if blocked_year:
         date_str = now.strftime("%B %d, %Y")
-        reason = (
+        return "deny", (
             f"BLOCKED: Your search contains '{blocked_year}' (outdated).\n\n"
             f"Current date: {date_str}\n"
             f"Current year: {current_year}\n\n"
             f"Please search using the current year or remove the year reference."
         )
-        print(
-            json.dumps({
-                "hookSpecificOutput": {
-                    "hookEventName": "PreToolUse",
-                    "permissionDecision": "deny",
-                    "permissionDecisionReason": reason,
-                }
-            })
-        )
-        return
 
     # Warn if current year is referenced (using word boundaries, after CVE strip)
     if re.search(rf"\b{current_year}\b", sanitized):
         date_str = now.strftime("%B %d, %Y")
-        reason = (
+        return "allow", (
             f"WARNING: You're searching with the current year ({current_year}).\n\n"
             f"Current date: {date_str}\n\n"
             f"Always verify the current date before running date-specific searches."
         )
-        print(
-            json.dumps({
-                "hookSpecificOutput": {
-                    "hookEventName": "PreToolUse",
-                    "permissionDecision": "allow",
-                    "permissionDecisionReason": reason,
-                }
-            })
-        )
+    return None
+
+
+def main():
+    try:
+        input_data = json.load(sys.stdin)
+    except json.JSONDecodeError:
+        sys.exit(1)
+
+    tool_name = input_data.get("tool_name", "")
+    if tool_name not in ("WebFetch", "WebSearch"):
+        sys.exit(0)
+
+    tool_input = input_data.get("tool_input", {})
+    text = (
+        f"{tool_input.get('url', '')} {tool_input.get('prompt', '')}"
+        if tool_name == "WebFetch"
+        else tool_input.get("query", "")
+    )
+
+    results = [
+        policy_stage(tool_name, tool_input, input_data.get("cwd") or os.getcwd()),
+        year_stage(text),
+    ]
+    results = [r for r in results if r]
+    if not results:
+        return
+    denied = [reason for decision, reason in results if decision == "deny"]
+    print(
+        json.dumps({
+            "hookSpecificOutput": {
+                "hookEventName": "PreToolUse",
+                "permissionDecision": "deny" if denied else "allow",
+                "permissionDecisionReason": denied[0] if denied
+                else "\n\n".join(reason for _, reason in results),
+            }
+        })
+    )
 
 
 if __name__ == "__main__":
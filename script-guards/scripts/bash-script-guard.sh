@@ -8,9 +8,14 @@
 
 set -euo pipefail
 
-# Read JSON input from stdin (fail-open if jq fails)
-input=$(cat)
-command=$(echo "$input" | jq -r '.tool_input.command // empty' 2>/dev/null) || exit 0
+# Parameter expansion rather than dirname: no child process
+script_dir="${BASH_SOURCE[0]%/*}"
+[[ "$script_dir" != "${BASH_SOURCE[0]}" ]] || script_dir=.
+# shellcheck source=hook-input.sh
+source "$script_dir/hook-input.sh"
+
+# Read JSON input from stdin with one jq process (fail-open if jq fails)
+hook_input_read command=.tool_input.command || exit 0
 
 # If no command, allow
 if [[ -z "$command" ]]; then
@@ -29,25 +34,36 @@ deny() {
     exit 2
 }
 
-# All regexes use [[:space:]] and [^[:space:]] for BSD grep/sed compatibility on macOS
-# (\s and \S are GNU extensions not supported by BSD tools)
+# All checks are bash regex matches (no child processes). They use POSIX
+# classes instead of \b, \s and \S, which BSD regex on macOS lacks; a word
+# boundary is spelled (^|[^[:alnum:]_]) ... ([^[:alnum:]_]|$).
+script_ext='\.(sh|py|rb|pl|js|bash)'
+nl=$'\n'
+
+# File-writing patterns to script files (e.g., echo > file.sh, cat >> script.py)
+redirect_re="(^|[^[:alnum:]_])(cat|tee|echo|printf)([^[:alnum:]_|;&${nl}][^|;&${nl}]*)?>>?[[:space:]]+[^[:space:]]+${script_ext}([^[:alnum:]_]|$)"
+# Heredoc patterns writing to script files (e.g., cat > file.sh <<EOF)
+heredoc_re="(cat[[:space:]]+>>?[[:space:]]+[^[:space:]]+${script_ext}[[:space:]]*<<|tee[[:space:]]+[^[:space:]]+${script_ext}[[:space:]]*<<)"
+# chmod +x on a file (likely creating a new script outside allowed dirs)
+chmod_re='chmod[[:space:]]+\+x[[:space:]]+([^[:space:]]+)'
+
+# One combined match decides whether any check can apply
+any_re="(${redirect_re})|(${heredoc_re})|(${chmod_re})"
+if ! [[ "$command" =~ $any_re ]]; then
+    exit 0
+fi
 
-# Check for file-writing patterns to script files (e.g., echo > file.sh, cat >> script.py)
-if echo "$command" | grep -qE '\b(cat|tee|echo|printf)\b[^|;&]*>>?[[:space:]]+[^[:space:]]+\.(sh|py|rb|pl|js|bash)\b'; then
+if [[ "$command" =~ $redirect_re ]]; then
     deny "BLOCKED: Use the Write tool for file creation, not Bash redirects.\n\nThe Write tool provides proper file creation with atomic writes. Bash redirects to script files are not allowed."
 fi
 
-# Check for heredoc patterns writing to script files (e.g., cat > file.sh <<EOF)
-if echo "$command" | grep -qE '(cat[[:space:]]+>>?[[:space:]]+[^[:space:]]+\.(sh|py|rb|pl|js|bash)[[:space:]]*<<|tee[[:space:]]+[^[:space:]]+\.(sh|py|rb|pl|js|bash)[[:space:]]*<<)'; then
+if [[ "$command" =~ $heredoc_re ]]; then
     deny "BLOCKED: Use the Write tool for file creation, not heredocs.\n\nThe Write tool provides proper file creation with atomic writes. Heredoc-based file creation via Bash is not allowed."
 fi
 
-# Check for chmod +x on non-existent files (likely creating a new script outside allowed dirs)
-if echo "$command" | grep -qE 'chmod[[:space:]]+\+x[[:space:]]+'; then
-    target_file=$(echo "$command" \
-        | grep -oE 'chmod[[:space:]]+\+x[[:space:]]+[^[:space:]]+' \
-        | head -1 \
-        | sed 's/chmod[[:space:]]*+x[[:space:]]*//')
+# Check for chmod +x on non-existent files (first chmod +x target only)
+if [[ "$command" =~ $chmod_re ]]; then
+    target_file="${BASH_REMATCH[1]}"
     if [[ -n "$target_file" ]] && [[ ! -f "$target_file" ]]; then
         deny "BLOCKED: Scripts must be placed in scripts/ directory.\n\nUse the Write tool to create scripts in the appropriate directory (scripts/, hooks/, .github/, or tests/)."
     fi
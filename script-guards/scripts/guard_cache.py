@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Shared on-disk cache location for script-guards helpers.
+
+  $SCRIPT_GUARDS_CACHE_DIR           (explicit override, used by tests)
+  $XDG_CACHE_HOME/script-guards      (default)
+  ~/.cache/script-guards             (fallback)
+
+Helpers fail open: a cache that cannot be read behaves like an empty cache,
+and one that cannot be written is skipped.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+
+def cache_dir() -> Path:
+    """Return the script-guards cache directory (not created here)."""
+    override = os.environ.get("SCRIPT_GUARDS_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "script-guards"
+
+
+def load_json(path: Path, default: Any = None) -> Any:
+    """Read a JSON document, returning default when missing or corrupt."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path: Path, data: Any) -> None:
+    """Atomically replace path with data serialized as JSON."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass
@@ -0,0 +1,39 @@
+#!/bin/bash
+# hook-input.sh - Shared hook-input extraction for the script-guards shell hooks
+#
+# Sourced, not executed. Reads the hook's JSON from stdin and extracts every
+# field a guard needs with a single jq process, so a call the guard does not
+# care about costs one child process. Each field is printed NUL-terminated
+# and read back with the read builtin, so values may span lines.
+#
+# Usage:
+#   source "$script_dir/hook-input.sh"
+#   hook_input_read file_path=.tool_input.file_path content=.tool_input.content || exit 0
+#
+# Sets each named variable (missing, null or false fields become empty) and
+# HOOK_INPUT to the raw JSON. Returns non-zero when the input is not valid
+# JSON, so guards can fail open.
+#
+# Bash 3.2 compatible (macOS): no mapfile -d, no declare -g.
+
+hook_input_read() {
+    # read -d '' consumes all of stdin without spawning cat; it returns 1 at EOF
+    IFS= read -r -d '' HOOK_INPUT || true
+
+    local names=() program="" spec sep=""
+    for spec in "$@"; do
+        names+=("${spec%%=*}")
+        program+="${sep}(${spec#*=})"
+        sep=", "
+    done
+    # NUL inside a value would shift the fields, so it is dropped
+    program="[${program}] | map(. // \"\" | tostring | gsub(\"\\u0000\"; \"\")) | join(\"\\u0000\") + \"\\u0000\""
+
+    local i=0 value
+    while IFS= read -r -d '' value; do
+        printf -v "${names[i]}" '%s' "$value"
+        i=$((i + 1))
+    done < <(jq -j "$program" <<< "$HOOK_INPUT" 2>/dev/null)
+
+    [[ "$i" -eq "${#names[@]}" ]]
+}
@@ -2,74 +2,61 @@
 # inline-script-guard.sh - PreToolUse hook to prevent inline scripts in .nix and .yml files
 #
 # Detects complex inline shell logic in Nix files and GitHub Actions workflows,
-# enforcing extraction to separate script files.
+# enforcing extraction to separate script files. The file is judged as it
+# will be after the edit: inline_blocks.py finds Nix strings and workflow
+# run: blocks structurally and measures each block the edit touches.
 #
 # Exit codes: 0=allow, 2=deny
 
 set -euo pipefail
 
-# Read JSON input from stdin (fail-open if jq fails)
-input=$(cat)
-file_path=$(echo "$input" | jq -r '.tool_input.file_path // empty' 2>/dev/null) || exit 0
-new_string=$(echo "$input" | jq -r '.tool_input.new_string // empty' 2>/dev/null) || exit 0
+# Parameter expansion rather than dirname: no child process
+script_dir="${BASH_SOURCE[0]%/*}"
+[[ "$script_dir" != "${BASH_SOURCE[0]}" ]] || script_dir=.
+# shellcheck source=hook-input.sh
+source "$script_dir/hook-input.sh"
+
+# Read JSON input from stdin with one jq process (fail-open if jq fails)
+hook_input_read file_path=.tool_input.file_path new_string=.tool_input.new_string || exit 0
 
 # If no file path or no new content, allow
 if [[ -z "$file_path" ]] || [[ -z "$new_string" ]]; then
     exit 0
 fi
 
-# Extract file extension (lowercase, tr for macOS bash 3.x compatibility)
-extension=$(echo "${file_path##*.}" | tr '[:upper:]' '[:lower:]')
-
-# --- Check .nix files for inline shell scripts ---
-if [[ "$extension" == "nix" ]]; then
-    # Count lines containing shell control-flow keywords or pipeline operators
-    # Uses grep -c on the whole string instead of a per-line loop
-    shell_keyword_count=$(echo "$new_string" \
-        | grep -cE '\b(if|then|else|fi|for|while|do|done|case|esac)\b|&&|\|\|' 2>/dev/null) || true
-
-    if [[ "$shell_keyword_count" -gt 3 ]]; then
-        jq -n --arg fp "$file_path" '{
-            hookSpecificOutput: {
-                hookEventName: "PreToolUse",
-                permissionDecision: "deny",
-                permissionDecisionReason: ("BLOCKED: Inline script detected in Nix file \(.fp).\n\nExtract to scripts/ directory and reference via builtins.readFile or writeShellApplication.\n\nShell scripts must NEVER be inline in .nix files. Use separate files in scripts/ with proper extensions.")
-            }
-        }' >&2
-        exit 2
-    fi
+# Only .nix and workflow YAML files are checked
+case "$file_path" in
+    *.[nN][iI][xX]) ;;
+    *.[yY][mM][lL]|*.[yY][aA][mM][lL]) ;;
+    *) exit 0 ;;
+esac
+
+# One parse of the post-edit file; prints "<nix|run> <line> <lines> <keyword lines>"
+# for the first offending block the edit touches (fail-open if python3 fails)
+violation=$(python3 "$script_dir/inline_blocks.py" <<< "$HOOK_INPUT" 2>/dev/null) || exit 0
+if [[ -z "$violation" ]]; then
+    exit 0
 fi
-
-# --- Check .yml/.yaml files for complex inline bash ---
-if [[ "$extension" == "yml" ]] || [[ "$extension" == "yaml" ]]; then
-    # Check for multiline run blocks (run: | or run: >)
-    # Uses [[:space:]] for BSD compatibility on macOS
-    if echo "$new_string" | grep -qE 'run:[[:space:]]*[|>]'; then
-        # Count run-block lines using indentation-aware awk (handles indented YAML steps)
-        run_block_lines=$(printf '%s\n' "$new_string" | awk '
-            /run:[[:space:]]*[|>]/ {
-                match($0, /^[[:space:]]*/); base = RLENGTH; counting = 1; n = 0; next
-            }
-            counting {
-                match($0, /^[[:space:]]*/);
-                if (RLENGTH <= base && $0 !~ /^[[:space:]]*$/) { counting = 0 }
-                else n++
-            }
-            END { print n+0 }
-        ')
-
-        if [[ "$run_block_lines" -gt 5 ]]; then
-            jq -n --arg fp "$file_path" '{
-                hookSpecificOutput: {
-                    hookEventName: "PreToolUse",
-                    permissionDecision: "deny",
-                    permissionDecisionReason: ("BLOCKED: Complex inline bash in workflow YAML \(.fp).\n\nExtract to .github/scripts/ or scripts/ and call from the workflow step.\n\nNever embed complex bash logic inline in GitHub Actions workflow YAML.")
-                }
-            }' >&2
-            exit 2
-        fi
-    fi
+read -r kind line block_lines keyword_lines <<< "$violation"
+
+# --- Nix indented strings with shell control flow ---
+if [[ "$kind" == "nix" ]]; then
+    jq -n --arg fp "$file_path" --arg at "line $line: $keyword_lines lines of shell control flow" '{
+        hookSpecificOutput: {
+            hookEventName: "PreToolUse",
+            permissionDecision: "deny",
+            permissionDecisionReason: ("BLOCKED: Inline script detected in Nix file \($fp) (\($at)).\n\nExtract to scripts/ directory and reference via builtins.readFile or writeShellApplication.\n\nShell scripts must NEVER be inline in .nix files. Use separate files in scripts/ with proper extensions.")
+        }
+    }' >&2
+    exit 2
 fi
 
-# All checks passed, allow operation
-exit 0
+# --- Multiline run: blocks in workflow YAML ---
+jq -n --arg fp "$file_path" --arg at "line $line: $block_lines-line run block" '{
+    hookSpecificOutput: {
+        hookEventName: "PreToolUse",
+        permissionDecision: "deny",
+        permissionDecisionReason: ("BLOCKED: Complex inline bash in workflow YAML \($fp) (\($at)).\n\nExtract to .github/scripts/ or scripts/ and call from the workflow step.\n\nNever embed complex bash logic inline in GitHub Actions workflow YAML.")
+    }
+}' >&2
+exit 2
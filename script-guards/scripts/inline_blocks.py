@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Structural inline-script detection for inline-script-guard.sh.
+
+The guard used to count shell keywords in an Edit's new_string alone, so
+it flagged Nix's own if/then/else and missed run blocks that only grow
+past the limit because of the edit. Instead, the file is reconstructed as
+it will be after the edit, and the shell blocks in it are found in one
+pass:
+
+  .nix          indented strings (''...'') and "..." strings (a \\n
+                escape counts as a line break), with Nix comments,
+                escapes (''' ''$ ''\\ \\") and ${...} antiquotes handled,
+                so only real string bodies count
+  .yml/.yaml    GitHub Actions block scalars: run: |, run: >- etc. (also
+                as "- run: |"), ending at the first line indented no
+                deeper than the run: line
+
+Every block gets its line count and the number of lines with shell
+control flow (if/then/fi, loops, case, && and ||). Only blocks the edit
+touches are judged, so an unrelated edit is never blocked by an existing
+block:
+
+  Nix string   more than NIX_MAX_KEYWORD_LINES keyword lines
+  run: block   more than RUN_MAX_LINES lines
+
+When the file cannot be reconstructed (unreadable, or old_string not
+found), new_string is judged on its own; a Nix fragment with no string
+delimiters is then taken to be the body of one string.
+
+Input: the Edit hook's JSON on stdin. Output: nothing when the edit is
+fine, else one line "<nix|run> <start line> <lines> <keyword lines>" for
+the first offending block. Every error prints nothing (fail open).
+"""
+
+import json
+import re
+import sys
+
+NIX_MAX_KEYWORD_LINES = 3
+RUN_MAX_LINES = 5
+
+_KEYWORD_RE = re.compile(r"\b(if|then|else|fi|for|while|do|done|case|esac)\b|&&|\|\|")
+_RUN_RE = re.compile(r"^([ \t]*)(?:-[ \t]+)?run:[ \t]*[|>][-+0-9]*[ \t]*(?:#.*)?$")
+_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+_IDENT_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_'-")
+
+
+def _measure(kind: str, start: int, end: int, body: str, text: str) -> list:
+    """[kind, start, end, first line, lines, keyword lines] of one block."""
+    lines = body.strip("\n").split("\n") if body.strip() else []
+    keywords = sum(1 for line in lines if _KEYWORD_RE.search(line))
+    return [kind, start, end, text.count("\n", 0, start) + 1, len(lines), keywords]
+
+
+def _skip_antiquote(text: str, i: int) -> int:
+    """Index just past the } closing the ${ at text[i - 2:i]."""
+    depth = 1
+    while i < len(text) and depth:
+        if text[i] == "{":
+            depth += 1
+        elif text[i] == "}":
+            depth -= 1
+        i += 1
+    return i
+
+
+def _unescape(body: str) -> str:
+    """Body of a "..." string with its escapes resolved (\\n as a line break)."""
+    return _ESCAPE_RE.sub(lambda m: "\n" if m.group(1) == "n" else m.group(1), body)
+
+
+def nix_blocks(text: str) -> list[list]:
+    """Indented and double-quoted strings of a Nix file."""
+    blocks = []
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c == "#":
+            i = text.find("\n", i)
+            i = n if i < 0 else i
+        elif text.startswith("/*", i):
+            i = text.find("*/", i + 2)
+            i = n if i < 0 else i + 2
+        elif c == '"':
+            start = i
+            i += 1
+            while i < n and text[i] != '"':
+                if text[i] == "\\":
+                    i += 1
+                elif text.startswith("${", i):
+                    i = _skip_antiquote(text, i + 2) - 1
+                i += 1
+            body = _unescape(text[start + 1:i])
+            blocks.append(_measure("nix", start, min(i + 1, n), body, text))
+            i += 1
+        elif text.startswith("''", i) and (i == 0 or text[i - 1] not in _IDENT_CHARS):
+            start = i
+            i += 2
+            body_start = i
+            while i < n:
+                if text.startswith("'''", i) or text.startswith("''$", i):
+                    i += 3
+                elif text.startswith("''\\", i):
+                    i += 4
+                elif text.startswith("''", i):
+                    break
+                elif text.startswith("${", i):
+                    i = _skip_antiquote(text, i + 2)
+                else:
+                    i += 1
+            blocks.append(_measure("nix", start, min(i + 2, n), text[body_start:i], text))
+            i += 2
+        else:
+            i += 1
+    return blocks
+
+
+def run_blocks(text: str) -> list[list]:
+    """Multi-line run: blocks of a workflow file."""
+    blocks = []
+    lines = text.split("\n")
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+    row = 0
+    while row < len(lines):
+        match = _RUN_RE.match(lines[row])
+        if not match:
+            row += 1
+            continue
+        base = len(match.group(1).expandtabs())
+        end = row + 1
+        last = row  # Last non-blank line of the block
+        while end < len(lines):
+            line = lines[end]
+            if line.strip():
+                if len(line) - len(line.lstrip()) <= base:
+                    break
+                last = end
+            end += 1
+        body = "\n".join(lines[row + 1:last + 1])
+        blocks.append(_measure("run", offsets[row], offsets[last + 1] - 1, body, text))
+        row = last + 1
+    return blocks
+
+
+PARSERS = {"nix": nix_blocks, "yml": run_blocks, "yaml": run_blocks}
+
+
+def apply_edit(text: str, old: str, new: str, replace_all: bool) -> tuple[str, list] | None:
+    """(post-edit text, [start, end) spans of new) or None when old is absent."""
+    if not old or old not in text:
+        return None
+    pieces = text.split(old) if replace_all else text.split(old, 1)
+    out, spans, pos = [pieces[0]], [], len(pieces[0])
+    for piece in pieces[1:]:
+        spans.append((pos, pos + len(new)))
+        out += [new, piece]
+        pos += len(new) + len(piece)
+    return "".join(out), spans
+
+
+def offending(kind: str, text: str, spans: list) -> list | None:
+    """The first block touched by spans that is over its limit."""
+    for block in PARSERS[kind](text):
+        name, start, end, _, lines, keywords = block
+        if not any(a <= end and start <= b for a, b in spans):
+            continue
+        if name == "nix" and keywords > NIX_MAX_KEYWORD_LINES:
+            return block
+        if name == "run" and lines > RUN_MAX_LINES:
+            return block
+    return None
+
+
+def check(hook_input: dict) -> list | None:
+    tool_input = hook_input.get("tool_input") or {}
+    file_path = str(tool_input.get("file_path") or "")
+    new = str(tool_input.get("new_string") or "")
+    kind = file_path.rsplit(".", 1)[-1].lower()
+    if kind not in PARSERS or not new:
+        return None
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            edited = apply_edit(
+                f.read(),
+                str(tool_input.get("old_string") or ""),
+                new,
+                bool(tool_input.get("replace_all")),
+            )
+    except (OSError, UnicodeDecodeError):
+        edited = None
+    if edited is not None:
+        return offending(kind, *edited)
+
+    # Fragment only: judge new_string by itself
+    block = offending(kind, new, [(0, len(new))])
+    if block is None and kind == "nix" and "''" not in new:
+        block = _measure("nix", 0, len(new), new, new)
+        if block[5] <= NIX_MAX_KEYWORD_LINES:
+            block = None
+    return block
+
+
+def main() -> None:
+    try:
+        block = check(json.load(sys.stdin))
+    except Exception:
+        return  # Fail open
+    if block is not None:
+        _, _, _, line, lines, keywords = block
+        print(f"{block[0]} {line} {lines} {keywords}")
+
+
+if __name__ == "__main__":
+    main()
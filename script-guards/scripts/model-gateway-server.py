@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Resident gateway between the script guards and the local model server.
+
+Usage: model-gateway-server.py SOCKET MODEL_URL IDLE_SECONDS
+
+Started on demand by model_gateway.py (the client) and serves chat
+requests on the Unix socket SOCKET, so a guard pays for a socket round
+trip instead of a new HTTP connection and its own request building. Exits
+after IDLE_SECONDS without a request.
+
+Protocol: one JSON line per connection.
+  request:  {"op": "chat", "body": {...chat-completion body...}, "budget": 5}
+            {"op": "stats"} | {"op": "stop"}
+  response: {"content": "..."} | {"error": "..."} | {"stats": {...}}
+
+Requests are collected for BATCH_WINDOW seconds and dispatched as a batch:
+identical bodies in a batch share one model call, and distinct ones run in
+parallel over POOL_SIZE HTTP connections that are kept alive between
+batches. Each request carries a latency budget in seconds; a request
+whose budget runs out is answered with an error (the guards then fail
+open) and, if it has not been sent yet, is dropped from its batch.
+"""
+
+import http.client
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+BATCH_WINDOW = 0.01
+BATCH_MAX = 32
+POOL_SIZE = 4
+
+
+class Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128  # Bursts of concurrent guards
+
+
+class Pending:
+    def __init__(self, body: dict, budget: float):
+        self.key = json.dumps(body, sort_keys=True)
+        self.body = body
+        self.deadline = time.monotonic() + budget
+        self.done = threading.Event()
+        self.result: dict = {"error": "budget exceeded"}
+
+
+class Gateway:
+    def __init__(self, model_url: str):
+        parts = urlsplit(model_url)
+        self.host, self.port = parts.hostname or "localhost", parts.port or 80
+        self.path = parts.path or "/"
+        self.inbox: queue.Queue[Pending] = queue.Queue()
+        self.pool = ThreadPoolExecutor(max_workers=POOL_SIZE)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "batches": 0, "model_calls": 0, "connections": 0}
+        threading.Thread(target=self._dispatch, daemon=True).start()
+
+    def _count(self, name: str) -> None:
+        with self.lock:
+            self.stats[name] += 1
+
+    def submit(self, body: dict, budget: float) -> dict:
+        self._count("requests")
+        pending = Pending(body, budget)
+        self.inbox.put(pending)
+        pending.done.wait(max(0.0, pending.deadline - time.monotonic()))
+        return pending.result
+
+    def _dispatch(self) -> None:
+        while True:
+            batch = [self.inbox.get()]
+            closes = time.monotonic() + BATCH_WINDOW
+            while len(batch) < BATCH_MAX:
+                try:
+                    batch.append(self.inbox.get(timeout=max(0.0, closes - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._count("batches")
+            groups: dict[str, list[Pending]] = {}
+            for pending in batch:
+                groups.setdefault(pending.key, []).append(pending)
+            for waiters in groups.values():
+                self.pool.submit(self._call, waiters)
+
+    def _connection(self, timeout: float) -> http.client.HTTPConnection:
+        """This pool thread's kept-alive connection."""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+            self.local.conn = conn
+            self._count("connections")
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn
+
+    def _call(self, waiters: list[Pending]) -> None:
+        deadline = max(p.deadline for p in waiters)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        self._count("model_calls")
+        result = self._post(waiters[0].body, remaining)
+        for pending in waiters:
+            pending.result = result
+            pending.done.set()
+
+    def _post(self, body: dict, timeout: float) -> dict:
+        data = json.dumps(body).encode()
+        headers = {"Content-Type": "application/json"}
+        for attempt in range(2):  # A kept-alive connection may have been closed
+            conn = self._connection(timeout)
+            try:
+                conn.request("POST", self.path, body=data, headers=headers)
+                response = conn.getresponse()
+                payload = json.loads(response.read())
+                if response.status != 200:
+                    return {"error": f"model server returned {response.status}"}
+                return {"content": payload["choices"][0]["message"]["content"] or ""}
+            except (http.client.HTTPException, ConnectionError) as e:
+                conn.close()
+                self.local.conn = None
+                if attempt:
+                    return {"error": str(e)}
+            except (OSError, ValueError, LookupError, TypeError) as e:
+                conn.close()
+                self.local.conn = None
+                return {"error": str(e) or type(e).__name__}
+        return {"error": "unreachable"}
+
+
+def main() -> None:
+    socket_path, model_url, idle = sys.argv[1], sys.argv[2], float(sys.argv[3])
+    gateway = Gateway(model_url)
+    last_request = [time.monotonic()]
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            last_request[0] = time.monotonic()
+            try:
+                request = json.loads(self.rfile.readline())
+                op = request.get("op")
+                if op == "chat":
+                    response = gateway.submit(request["body"], float(request.get("budget", 5)))
+                elif op == "stats":
+                    with gateway.lock:
+                        response = {"stats": dict(gateway.stats)}
+                elif op == "stop":
+                    response = {"stopped": True}
+                    threading.Thread(target=server.shutdown, daemon=True).start()
+                else:
+                    response = {"error": f"unknown op: {op}"}
+            except (ValueError, LookupError, TypeError, AttributeError) as e:
+                response = {"error": f"bad request: {e}"}
+            last_request[0] = time.monotonic()
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        return  # Another gateway is serving this socket
+    except OSError:
+        pass
+    finally:
+        probe.close()
+    try:
+        os.unlink(socket_path)  # Left behind by a gateway that died
+    except OSError:
+        pass
+    server = Server(socket_path, Handler)
+    os.chmod(socket_path, 0o600)
+
+    def reap_idle() -> None:
+        while time.monotonic() - last_request[0] < idle:
+            time.sleep(min(1.0, idle))
+        server.shutdown()
+
+    threading.Thread(target=reap_idle, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    main()
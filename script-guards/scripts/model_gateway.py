@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Client for the resident model gateway (model-gateway-server.py).
+
+Each model-backed guard call used to open its own HTTP connection to the
+local model server. The gateway keeps connections alive, batches
+concurrent requests and enforces each request's latency budget; it is
+started on demand by the first request and exits after IDLE_SECONDS
+without one.
+
+One gateway runs per user, cache directory, model URL and gateway
+version, so updating the plugin starts a new one instead of reusing stale
+code. Its socket lives in a per-user temp directory; if that directory is
+not private to the user, guards talk to the model server directly, as
+they do with SCRIPT_GUARDS_MODEL_GATEWAY=0.
+
+CLI:
+  model_gateway.py stats    print the running gateway's counters as JSON
+  model_gateway.py stop     stop the gateway, if one is running
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+IDLE_SECONDS = 600
+START_TIMEOUT = 2.0
+GATEWAY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model-gateway-server.py")
+
+
+def enabled() -> bool:
+    return os.environ.get("SCRIPT_GUARDS_MODEL_GATEWAY", "1") != "0"
+
+
+def _private_dir(directory: str) -> bool:
+    """
+    Create directory if needed and check that only this user can use it: a
+    directory someone else created (or a symlink) could hold their socket.
+    """
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.lstat(directory)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and stat.S_IMODE(st.st_mode) == 0o700
+    )
+
+
+def socket_path(cache: Path, model_url: str) -> str | None:
+    """
+    Gateway socket for this user, cache directory, model URL and gateway
+    version. Kept under the temp dir: socket paths are limited to ~100 bytes.
+    None when the socket directory is not private (call the model directly).
+    """
+    try:
+        gateway_mtime = os.stat(GATEWAY).st_mtime_ns
+    except OSError:
+        gateway_mtime = 0
+    key = hashlib.sha256(f"{cache}\0{model_url}\0{gateway_mtime}".encode()).hexdigest()[:16]
+    directory = os.path.join(tempfile.gettempdir(), f"script-guards-{os.getuid()}")
+    if not _private_dir(directory):
+        return None
+    return os.path.join(directory, f"gw-{key}.sock")
+
+
+def _request(path: str, payload: dict, timeout: float) -> dict | None:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        response = json.loads(data)
+        return response if isinstance(response, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def _alive(path: str) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(0.5)
+            sock.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def _start(path: str, cache: Path, model_url: str) -> bool:
+    """Start a gateway (once, across concurrent guards) and wait for its socket."""
+    try:
+        cache.mkdir(parents=True, exist_ok=True)
+        lock = open(cache / "model-gateway.lock", "w")
+    except OSError:
+        return False
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if _alive(path):
+            return True
+        try:
+            subprocess.Popen(
+                [sys.executable, GATEWAY, path, model_url, str(IDLE_SECONDS)],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,  # Outlive this guard
+            )
+        except OSError:
+            return False
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            if _alive(path):
+                return True
+            time.sleep(0.02)
+        return False
+
+
+def chat(cache: Path, model_url: str, body: dict, budget: float) -> dict | None:
+    """
+    {"content": ...} or {"error": ...} from the gateway, starting it if
+    needed; None when no gateway could be reached.
+    """
+    path = socket_path(cache, model_url)
+    if path is None:
+        return None
+    payload = {"op": "chat", "body": body, "budget": budget}
+    timeout = budget + 1  # The gateway answers by the budget itself
+    response = _request(path, payload, timeout) if _alive(path) else None
+    if response is None and _start(path, cache, model_url):
+        response = _request(path, payload, timeout)
+    return response
+
+
+def main() -> None:
+    from guard_cache import cache_dir
+    from model_verdict import model_url
+
+    path = socket_path(cache_dir(), model_url())
+    if len(sys.argv) == 2 and sys.argv[1] in ("stats", "stop"):
+        response = _request(path, {"op": sys.argv[1]}, 5) if path else None
+        if response is None:
+            sys.exit(1)
+        if sys.argv[1] == "stats":
+            print(json.dumps(response.get("stats", {})))
+        sys.exit(0)
+    print("usage: model_gateway.py stats | model_gateway.py stop", file=sys.stderr)
+    sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Cached local-model verdicts for write-script-guard.sh.
+
+The guard asks the local MLX model whether a new script outside the known
+script directories is a legitimate artifact. A model call takes up to
+MODEL_TIMEOUT seconds, and the answer rarely depends on more than where
+the script goes and what kind of script it is, so verdicts are cached by
+path pattern: the script's directory plus its extension class (shell,
+python, ...). Creating a second scratch script next to the first reuses
+the first verdict.
+
+Verdicts are kept in the script-guards cache directory (guard_cache.py).
+Entries expire after $SCRIPT_GUARDS_VERDICT_TTL seconds (default one day;
+0 disables the cache) and the least recently used are evicted beyond
+MAX_ENTRIES.
+
+Identical requests are coalesced: the first process to miss a pattern
+holds that pattern's lock while it asks the model, and concurrent
+sessions asking about the same pattern wait for it and read its verdict
+instead of sending their own request. An unreachable model is remembered
+for FAILURE_TTL seconds so waiters do not each pay the timeout.
+
+Model requests go through the resident gateway (model_gateway.py), which
+keeps connections to the model server alive and batches concurrent
+requests, else directly to $SCRIPT_GUARDS_MODEL_URL (default: the local
+MLX server).
+
+Usage:
+  model_verdict.py FILE_PATH
+
+Prints "allow" or "deny <reason>". Every failure prints "allow" (fail
+open).
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import model_gateway
+from guard_cache import cache_dir, load_json, save_json
+
+MODEL_URL = "http://localhost:11434/v1/chat/completions"
+MODEL = "mlx-community/Qwen3.5-27B-4bit"
+MODEL_TIMEOUT = 5
+DEFAULT_TTL = 86400
+FAILURE_TTL = 30
+MAX_ENTRIES = 256
+WAIT_SECONDS = 8  # Longest wait for a coalesced request, within the hook timeout
+
+EXTENSION_CLASSES = {
+    "sh": "shell", "bash": "shell", "zsh": "shell", "fish": "shell",
+    "py": "python", "rb": "ruby", "pl": "perl", "js": "javascript",
+}
+
+PROMPT = (
+    "You are a script-prevention guardrail. A file is being created at: {path}\n\n"
+    "Is this a legitimate committed artifact (CI workflow, plugin hook, test fixture, "
+    "build tool) or an unnecessary custom script?\n\n"
+    "Respond with ONLY 'allow' or 'deny' followed by a brief reason."
+)
+
+
+def ttl() -> int:
+    try:
+        return int(os.environ.get("SCRIPT_GUARDS_VERDICT_TTL", DEFAULT_TTL))
+    except ValueError:
+        return DEFAULT_TTL
+
+
+def model_url() -> str:
+    return os.environ.get("SCRIPT_GUARDS_MODEL_URL", MODEL_URL)
+
+
+def pattern_key(file_path: str) -> str:
+    """Directory plus extension class: the granularity verdicts are cached at."""
+    path = os.path.normpath(os.path.abspath(os.path.expanduser(file_path)))
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    return f"{os.path.dirname(path)}/*.{EXTENSION_CLASSES.get(extension, 'other')}"
+
+
+def _ask_directly(body: dict) -> str | None:
+    request = urllib.request.Request(
+        model_url(),
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=MODEL_TIMEOUT) as response:
+            return json.load(response)["choices"][0]["message"]["content"] or ""
+    except (OSError, ValueError, LookupError, TypeError):
+        return None
+
+
+def ask_model(file_path: str) -> list | None:
+    """[decision, reason] from the model, or None when it cannot be reached."""
+    body = {
+        "model": MODEL,
+        "messages": [{"role": "user", "content": PROMPT.format(path=file_path)}],
+        "max_tokens": 100,
+        "temperature": 0,
+    }
+    response = None
+    if model_gateway.enabled():
+        response = model_gateway.chat(cache_dir(), model_url(), body, MODEL_TIMEOUT)
+    if response is None:  # No gateway: one direct request
+        text = _ask_directly(body)
+    else:
+        text = response.get("content")
+    if text is None:
+        return None
+    first, _, rest = text.strip().partition("\n")
+    if first[:4].lower() == "deny":
+        reason = (first[4:].strip() + ("\n" + rest if rest else "")).strip()
+        return ["deny", reason]
+    return ["allow", ""]
+
+
+class VerdictCache:
+    """Pattern -> verdict entries in one JSON file, updated under a lock."""
+
+    def __init__(self, directory: Path):
+        self.path = directory / "verdicts.json"
+
+    def _load(self) -> dict:
+        data = load_json(self.path, {})
+        return data if isinstance(data, dict) else {}
+
+    def get(self, key: str, now: float) -> dict | None:
+        """The live entry for key: {verdict, expires, used}."""
+        entry = self._load().get(key)
+        if not isinstance(entry, dict) or entry.get("expires", 0) <= now:
+            return None
+        return entry
+
+    def put(self, key: str, verdict: list, expires: float, now: float) -> None:
+        """Store verdict ([decision, reason], or [] for a failed call)."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path.with_name("verdicts.lock"), "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                entries = {
+                    k: e for k, e in self._load().items()
+                    if isinstance(e, dict) and e.get("expires", 0) > now
+                }
+                entries[key] = {"verdict": verdict, "expires": expires, "used": now}
+                if len(entries) > MAX_ENTRIES:  # Evict the least recently used
+                    ordered = sorted(entries.items(), key=lambda kv: kv[1].get("used", 0))
+                    entries = dict(ordered[-MAX_ENTRIES:])
+                save_json(self.path, entries)
+        except OSError:
+            pass
+
+
+def _wait_for_lock(lock_file, deadline: float) -> bool:
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+
+def verdict(file_path: str) -> list:
+    """[decision, reason] for creating a script at file_path."""
+    lifetime = ttl()
+    if lifetime <= 0:
+        return ask_model(file_path) or ["allow", ""]
+
+    key = pattern_key(file_path)
+    directory = cache_dir()
+    cache = VerdictCache(directory)
+    now = time.time()
+    entry = cache.get(key, now)
+    if entry is not None:
+        cache.put(key, entry["verdict"], entry["expires"], now)  # LRU position only
+        return entry["verdict"] or ["allow", ""]
+
+    # Miss: one process per pattern asks the model; the rest wait and reuse it
+    lock_path = directory / "inflight" / (hashlib.sha256(key.encode()).hexdigest()[:24] + ".lock")
+    try:
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(lock_path, "w")
+    except OSError:
+        return ask_model(file_path) or ["allow", ""]
+    with lock_file:
+        if not _wait_for_lock(lock_file, time.monotonic() + WAIT_SECONDS):
+            return ["allow", ""]  # The leader is stuck; fail open
+        entry = cache.get(key, time.time())
+        if entry is not None:  # Answered while we waited
+            return entry["verdict"] or ["allow", ""]
+        answer = ask_model(file_path)
+        now = time.time()
+        cache.put(key, answer or [], now + (FAILURE_TTL if answer is None else lifetime), now)
+        return answer or ["allow", ""]
+
+
+def main() -> None:
+    if len(sys.argv) != 2:
+        print("usage: model_verdict.py FILE_PATH", file=sys.stderr)
+        sys.exit(2)
+    try:
+        decision, reason = verdict(sys.argv[1])
+    except Exception:
+        decision, reason = "allow", ""  # Fail open
+    print(f"{decision} {reason}".rstrip())
+
+
+if __name__ == "__main__":
+    main()
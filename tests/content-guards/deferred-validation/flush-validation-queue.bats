@@ -0,0 +1,162 @@
+#!/usr/bin/env bats
+# Test suite for deferred validation (CONTENT_GUARDS_DEFERRED=1):
+# validate-markdown.sh / validate-readme.py queue edited files, and
+# content-guards/scripts/flush-validation-queue.py validates them at Stop.
+#
+# Markdown linting uses the offline markdownlint-cli2 stand-in, which logs
+# one line per lint to $FAKE_MDL_LOG.
+#
+# Run with: bats tests/content-guards/deferred-validation/flush-validation-queue.bats
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  SCRIPTS="$REPO_ROOT/content-guards/scripts"
+  FLUSH="$SCRIPTS/flush-validation-queue.py"
+
+  WORK_DIR="$(mktemp -d)"
+  export CONTENT_GUARDS_CACHE_DIR="$WORK_DIR/cache"
+  export CONTENT_GUARDS_DEFERRED=1
+  export CONTENT_GUARDS_LINT_WORKER=0
+  export FAKE_MDL_LOG="$WORK_DIR/lint.log"
+  export PATH="$REPO_ROOT/tests/helpers/fake-markdownlint-cli2/bin:$PATH"
+  touch "$FAKE_MDL_LOG"
+  mkdir -p "$WORK_DIR/repo/docs"
+  git -C "$WORK_DIR/repo" init -q
+  printf '# Guide\n\nBAD_LINT\n' > "$WORK_DIR/repo/docs/guide.md"
+  printf '# Notes\n' > "$WORK_DIR/repo/docs/notes.md"
+  printf '# Project\n\n## Usage\n\nRun it.\n' > "$WORK_DIR/repo/README.md"
+}
+
+teardown() {
+  rm -rf "$WORK_DIR"
+}
+
+# edit SESSION FILE: run both PostToolUse validators as hooks.json does
+edit() {
+  local input="{\"session_id\":\"$1\",\"tool_name\":\"Edit\",\"tool_input\":{\"file_path\":\"$2\"}}"
+  /bin/bash "$SCRIPTS/validate-markdown.sh" <<<"$input"
+  python3 "$SCRIPTS/validate-readme.py" <<<"$input" 2>/dev/null
+}
+
+flush() {
+  run python3 "$FLUSH" <<<"{\"session_id\":\"$1\",\"stop_hook_active\":false}"
+}
+
+lint_count() {
+  wc -l < "$FAKE_MDL_LOG" | tr -d ' '
+}
+
+@test "TC1: deferred edits exit 0 without validating" {
+  run edit s1 "$WORK_DIR/repo/docs/guide.md"
+  [ "$status" -eq 0 ]
+  [ "$(lint_count)" -eq 0 ]
+  [ -f "$CONTENT_GUARDS_CACHE_DIR/deferred/s1.json" ]
+}
+
+@test "TC2: repeated edits of one file are validated once at Stop" {
+  for _ in 1 2 3 4 5 6 7 8 9 10; do
+    edit s1 "$WORK_DIR/repo/docs/guide.md"
+  done
+  flush s1
+  [ "$status" -eq 2 ]
+  [ "$(lint_count)" -eq 1 ]
+  [[ "$output" =~ "Deferred validation failed" ]]
+  [[ "$output" =~ "guide.md" ]]
+  [[ "$output" =~ "BAD_LINT marker found" ]]
+}
+
+@test "TC3: each failing file is reported; passing files are not" {
+  edit s1 "$WORK_DIR/repo/docs/guide.md"
+  edit s1 "$WORK_DIR/repo/docs/notes.md"
+  edit s1 "$WORK_DIR/repo/README.md"
+  flush s1
+  [ "$status" -eq 2 ]
+  [ "$(lint_count)" -eq 3 ]
+  [[ "$output" =~ "Markdown validation failed for: $WORK_DIR/repo/docs/guide.md" ]]
+  [[ "$output" =~ "README validation FAILED for: $WORK_DIR/repo/README.md" ]]
+  [[ "$output" =~ "Installation" ]]
+  [[ ! "$output" =~ "notes.md" ]]
+}
+
+@test "TC4: all files passing allows the stop" {
+  edit s1 "$WORK_DIR/repo/docs/notes.md"
+  flush s1
+  [ "$status" -eq 0 ]
+  [ "$(lint_count)" -eq 1 ]
+}
+
+@test "TC5: the queue is drained by a flush" {
+  edit s1 "$WORK_DIR/repo/docs/guide.md"
+  flush s1
+  [ "$status" -eq 2 ]
+  flush s1
+  [ "$status" -eq 0 ]
+  [ "$(lint_count)" -eq 1 ]
+}
+
+@test "TC6: sessions have separate queues" {
+  edit s1 "$WORK_DIR/repo/docs/guide.md"
+  edit s2 "$WORK_DIR/repo/docs/notes.md"
+  flush s2
+  [ "$status" -eq 0 ]
+  flush s1
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "guide.md" ]]
+}
+
+@test "TC7: files the validators skip are not queued" {
+  printf 'x = 1\n' > "$WORK_DIR/repo/tool.py"
+  edit s1 "$WORK_DIR/repo/tool.py"
+  edit s1 "$WORK_DIR/repo/missing.md"
+  [ ! -f "$CONTENT_GUARDS_CACHE_DIR/deferred/s1.json" ]
+  flush s1
+  [ "$status" -eq 0 ]
+}
+
+@test "TC8: without CONTENT_GUARDS_DEFERRED edits validate immediately" {
+  unset CONTENT_GUARDS_DEFERRED
+  run /bin/bash "$SCRIPTS/validate-markdown.sh" \
+    <<<"{\"session_id\":\"s1\",\"tool_input\":{\"file_path\":\"$WORK_DIR/repo/docs/guide.md\"}}"
+  [ "$status" -eq 2 ]
+  [ "$(lint_count)" -eq 1 ]
+  flush s1
+  [ "$status" -eq 0 ]
+}
+
+@test "TC9: invalid Stop input fails open" {
+  run python3 "$FLUSH" <<<"not json"
+  [ "$status" -eq 0 ]
+}
+
+@test "TC10: without CONTENT_GUARDS_DEFERRED the Stop hook leaves the queue alone" {
+  edit s1 "$WORK_DIR/repo/docs/guide.md"
+  touch -d '2 days ago' "$CONTENT_GUARDS_CACHE_DIR/deferred/old.json"
+  unset CONTENT_GUARDS_DEFERRED
+  flush s1
+  [ "$status" -eq 0 ]
+  [ "$(lint_count)" -eq 0 ]
+  [ -f "$CONTENT_GUARDS_CACHE_DIR/deferred/s1.json" ]
+  [ -f "$CONTENT_GUARDS_CACHE_DIR/deferred/old.json" ]
+}
+
+@test "TC11: the flush stops at its wall-time cap and re-queues the rest" {
+  printf '#!/bin/sh\nsleep 5\n' > "$WORK_DIR/slow.sh"
+  chmod +x "$WORK_DIR/slow.sh"
+  run python3 - "$FLUSH" "$WORK_DIR" <<'PYEOF'
+import importlib.util, json, sys, time
+spec = importlib.util.spec_from_file_location("flush", sys.argv[1])
+flush = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(flush)
+flush.TOTAL_SECONDS = 1
+flush.VALIDATORS["markdown"] = f"{sys.argv[2]}/slow.sh"
+queue = {f"/docs/{i}.md": ["markdown"] for i in range(20)}
+start = time.monotonic()
+failures = flush.flush(queue, "s1")
+print(f"elapsed {time.monotonic() - start:.1f}")
+with open(f"{sys.argv[2]}/cache/deferred/s1.json") as f:
+    print(f"requeued {len(json.load(f))}")
+PYEOF
+  [ "$status" -eq 0 ]
+  [[ "$output" =~ elapsed\ [12]\. ]]
+  [[ "$output" =~ "requeued 20" ]]
+}
@@ -2,25 +2,37 @@
 # Test suite for content-guards/scripts/enforce-branch-limits.py
 #
 # Tests command matching, branch counting, and limit blocking.
-# Mocks `git` via a fake executable placed earlier in PATH.
+# Branches are written straight into a temp repo's ref store; `git` is
+# mocked via a fake executable placed earlier in PATH, which serves the
+# `git branch` fallback used for reftable repos and logs every call.
 #
 # Run with: bats tests/content-guards/enforce-branch-limits/enforce-branch-limits.bats
 
+load '../../helpers/git'
+
 setup() {
   REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
   SCRIPT="$REPO_ROOT/content-guards/scripts/enforce-branch-limits.py"
   FAKE_GIT_DIR="$(mktemp -d)"
+  TEST_REPO="$FAKE_GIT_DIR/repo"
 
   if [[ ! -f "$SCRIPT" ]]; then
     echo "ERROR: Script not found at $SCRIPT" >&2
     return 1
   fi
 
+  make_repo "$TEST_REPO" >/dev/null
+  SHA="$(git -C "$TEST_REPO" rev-parse HEAD)"
+  REAL_GIT="$(command -v git)"
+
   # Write a configurable fake `git` script. Tests set GIT_LOCAL_BRANCHES
-  # and GIT_REMOTE_BRANCHES before calling the script under test.
+  # and GIT_REMOTE_BRANCHES for the fallback path.
   cat > "$FAKE_GIT_DIR/git" <<'FAKEOF'
 #!/usr/bin/env bash
 # Configurable fake git for branch limit tests
+echo "$*" >> "$FAKE_GIT_DIR/calls"
+# The block message's stale-branch plan needs the real ref queries
+[[ "$1" == "for-each-ref" ]] && exec "$REAL_GIT" "$@"
 if [[ "$1" == "branch" && "$*" == *"--format"* ]]; then
   if [[ "$*" == *"-r"* ]]; then
     echo "${GIT_REMOTE_BRANCHES:-}"
@@ -35,7 +47,9 @@ FAKEOF
   chmod +x "$FAKE_GIT_DIR/git"
 
   export PATH="$FAKE_GIT_DIR:$PATH"
-  export FAKE_GIT_DIR
+  export FAKE_GIT_DIR REAL_GIT
+  export CONTENT_GUARDS_CACHE_DIR="$FAKE_GIT_DIR/cache"
+  cd "$TEST_REPO"
 }
 
 teardown() {
@@ -50,6 +64,25 @@ gen_branches() {
   done
 }
 
+# Helper: write loose refs, e.g. add_refs refs/heads/ local- 50
+add_refs() {
+  local base="$1" prefix="$2" count="$3" name
+  for name in $(gen_branches "$prefix" "$count"); do
+    mkdir -p "$(dirname ".git/$base$name")"
+    echo "$SHA" > ".git/$base$name"
+  done
+}
+
+# Helper: move every loose ref into packed-refs
+pack_refs() {
+  "$REAL_GIT" pack-refs --all
+}
+
+# Helper: number of times the hook ran `git branch` to count branches
+git_calls() {
+  if [[ -f "$FAKE_GIT_DIR/calls" ]]; then grep -c '^branch' "$FAKE_GIT_DIR/calls" || true; else echo 0; fi
+}
+
 # Helper: run the hook with the given JSON input
 run_hook() {
   run python3 "$SCRIPT" <<< "$1"
@@ -103,29 +136,25 @@ run_hook() {
 # ---------------------------------------------------------------------------
 
 @test "TC3: git branch create allowed when under limit" {
-  export GIT_LOCAL_BRANCHES="main"
-  export GIT_REMOTE_BRANCHES="origin/main"
+  add_refs refs/remotes/origin/ "" 5
   run_hook '{"tool_input":{"command":"git branch new-feature"}}'
   [ "$status" -eq 0 ]
 }
 
 @test "TC3b: git checkout -b allowed when under limit" {
-  export GIT_LOCAL_BRANCHES="main"
-  export GIT_REMOTE_BRANCHES="origin/main"
+  add_refs refs/remotes/origin/ "" 5
   run_hook '{"tool_input":{"command":"git checkout -b feat/new"}}'
   [ "$status" -eq 0 ]
 }
 
 @test "TC3c: git switch -c allowed when under limit" {
-  export GIT_LOCAL_BRANCHES="main"
-  export GIT_REMOTE_BRANCHES="origin/main"
+  add_refs refs/remotes/origin/ "" 5
   run_hook '{"tool_input":{"command":"git switch -c fix/bug"}}'
   [ "$status" -eq 0 ]
 }
 
 @test "TC3d: git worktree add allowed when under limit" {
-  export GIT_LOCAL_BRANCHES="main"
-  export GIT_REMOTE_BRANCHES="origin/main"
+  add_refs refs/remotes/origin/ "" 5
   run_hook '{"tool_input":{"command":"git worktree add -b feat/new /tmp/wt main"}}'
   [ "$status" -eq 0 ]
 }
@@ -135,8 +164,7 @@ run_hook() {
 # ---------------------------------------------------------------------------
 
 @test "TC4: git branch create blocked when at 100 branches" {
-  export GIT_LOCAL_BRANCHES="$(gen_branches '' 100)"
-  export GIT_REMOTE_BRANCHES=""
+  add_refs refs/heads/ "" 99
   run_hook '{"tool_input":{"command":"git branch new-feature"}}'
   [ "$status" -eq 2 ]
   [[ "$output" =~ "BLOCKED: Branch limit exceeded" ]]
@@ -144,24 +172,21 @@ run_hook() {
 }
 
 @test "TC4b: git checkout -b blocked when at 100 branches" {
-  export GIT_LOCAL_BRANCHES="$(gen_branches '' 100)"
-  export GIT_REMOTE_BRANCHES=""
+  add_refs refs/heads/ "" 99
   run_hook '{"tool_input":{"command":"git checkout -b feat/new"}}'
   [ "$status" -eq 2 ]
   [[ "$output" =~ "BLOCKED: Branch limit exceeded" ]]
 }
 
 @test "TC4c: git switch -c blocked when at 100 branches" {
-  export GIT_LOCAL_BRANCHES="$(gen_branches '' 100)"
-  export GIT_REMOTE_BRANCHES=""
+  add_refs refs/heads/ "" 99
   run_hook '{"tool_input":{"command":"git switch -c fix/bug"}}'
   [ "$status" -eq 2 ]
   [[ "$output" =~ "BLOCKED: Branch limit exceeded" ]]
 }
 
 @test "TC4d: git worktree add blocked when at 100 branches" {
-  export GIT_LOCAL_BRANCHES="$(gen_branches '' 100)"
-  export GIT_REMOTE_BRANCHES=""
+  add_refs refs/heads/ "" 99
   run_hook '{"tool_input":{"command":"git worktree add -b feat/new /tmp/wt main"}}'
   [ "$status" -eq 2 ]
   [[ "$output" =~ "BLOCKED: Branch limit exceeded" ]]
@@ -173,8 +198,8 @@ run_hook() {
 
 @test "TC5: local+remote deduplication keeps count correct" {
   # 50 local + 50 remote with same names = 50 unique (under limit)
-  export GIT_LOCAL_BRANCHES="$(gen_branches '' 50)"
-  export GIT_REMOTE_BRANCHES="$(gen_branches 'origin/' 50)"
+  add_refs refs/heads/ "" 50
+  add_refs refs/remotes/origin/ "" 50
   run_hook '{"tool_input":{"command":"git branch new-feature"}}'
   [ "$status" -eq 0 ]
 }
@@ -184,9 +209,9 @@ run_hook() {
 # ---------------------------------------------------------------------------
 
 @test "TC6: blocked when local+remote unique branches >= 100" {
-  # 50 local-only (local-*) + 50 remote-only (origin/remote-*) = 100 unique branches (at limit)
-  export GIT_LOCAL_BRANCHES="$(gen_branches 'local-' 50)"
-  export GIT_REMOTE_BRANCHES="$(gen_branches 'origin/remote-' 50)"
+  # main + 49 local-only (local-*) + 50 remote-only (origin/remote-*) = 100 unique branches (at limit)
+  add_refs refs/heads/ local- 49
+  add_refs refs/remotes/origin/ remote- 50
   run_hook '{"tool_input":{"command":"git branch new-feature"}}'
   [ "$status" -eq 2 ]
   [[ "$output" =~ "BLOCKED: Branch limit exceeded" ]]
@@ -197,6 +222,8 @@ run_hook() {
 # ---------------------------------------------------------------------------
 
 @test "TC7: git failure causes fail-open (exit 0)" {
+  mkdir .git/reftable
+  export GIT_LOCAL_BRANCHES="$(gen_branches '' 100)"
   export GIT_EXIT_CODE=1
   run_hook '{"tool_input":{"command":"git branch new-feature"}}'
   [ "$status" -eq 0 ]
@@ -207,10 +234,152 @@ run_hook() {
 # ---------------------------------------------------------------------------
 
 @test "TC8: block message suggests pruning" {
-  export GIT_LOCAL_BRANCHES="$(gen_branches '' 100)"
-  export GIT_REMOTE_BRANCHES=""
+  add_refs refs/heads/ "" 99
   run_hook '{"tool_input":{"command":"git branch new-feature"}}'
   [ "$status" -eq 2 ]
   [[ "$output" =~ "Delete merged or stale branches" ]]
   [[ "$output" =~ "git fetch --prune" ]]
 }
+
+# ---------------------------------------------------------------------------
+# TC9: Ref store is read without spawning git
+# ---------------------------------------------------------------------------
+
+@test "TC9: branches are counted without running git" {
+  add_refs refs/heads/ "" 99
+  run_hook '{"tool_input":{"command":"git checkout -b feat/new"}}'
+  [ "$status" -eq 2 ]
+  [ "$(git_calls)" -eq 0 ]
+}
+
+@test "TC9b: packed and loose refs are both counted, once each" {
+  add_refs refs/heads/ packed- 60
+  pack_refs
+  add_refs refs/heads/ packed- 10  # Loose copies of packed refs
+  add_refs refs/heads/ loose- 39
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "100/100" ]]
+}
+
+@test "TC9c: tags and peeled lines in packed-refs are not branches" {
+  add_refs refs/tags/ "" 120
+  "$REAL_GIT" tag -a v1.0 -m release
+  pack_refs
+  grep -q '^\^' .git/packed-refs
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 0 ]
+}
+
+@test "TC9d: remote HEAD symref is skipped" {
+  add_refs refs/heads/ "" 98
+  add_refs refs/remotes/origin/ "" 1
+  echo "ref: refs/remotes/origin/main" > .git/refs/remotes/origin/HEAD
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 0 ]
+}
+
+@test "TC9e: nested names dedupe against remotes with the remote stripped" {
+  add_refs refs/heads/ feat/ 50
+  add_refs refs/remotes/origin/ feat/ 50
+  add_refs refs/remotes/upstream/ feat/ 49
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 0 ]
+  add_refs refs/remotes/upstream/ other/ 49
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "100/100" ]]
+}
+
+@test "TC9f: linked worktree counts the main repository's branches" {
+  "$REAL_GIT" worktree add -q -b wt-branch "$FAKE_GIT_DIR/wt" 2>/dev/null
+  add_refs refs/heads/ "" 98
+  cd "$FAKE_GIT_DIR/wt"
+  run_hook '{"tool_input":{"command":"git switch -c fix/bug"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "100/100" ]]
+  [ "$(git_calls)" -eq 0 ]
+}
+
+# ---------------------------------------------------------------------------
+# TC10: Reftable repos fall back to git branch
+# ---------------------------------------------------------------------------
+
+@test "TC10: reftable repo falls back to git branch listings" {
+  mkdir .git/reftable
+  export GIT_LOCAL_BRANCHES="$(gen_branches '' 50)"
+  export GIT_REMOTE_BRANCHES="$(gen_branches 'origin/' 50; echo origin/HEAD)"
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 0 ]
+  [ "$(git_calls)" -eq 2 ]
+  export GIT_LOCAL_BRANCHES="$(gen_branches 'local-' 50)"
+  export GIT_REMOTE_BRANCHES="$(gen_branches 'origin/remote-' 50)"
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 2 ]
+}
+
+@test "TC10b: refStorage = reftable in config falls back to git" {
+  printf '[extensions]\n\trefStorage = reftable\n' >> .git/config
+  export GIT_LOCAL_BRANCHES="$(gen_branches '' 100)"
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 2 ]
+  [ "$(git_calls)" -eq 2 ]
+}
+
+@test "TC10c: outside a git repository falls back to git (fail-open)" {
+  cd "$FAKE_GIT_DIR"
+  export GIT_EXIT_CODE=1
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 0 ]
+}
+
+# ---------------------------------------------------------------------------
+# TC11: Cached branch set follows ref changes
+# ---------------------------------------------------------------------------
+
+@test "TC11: cached branch set picks up branches added and removed between checks" {
+  add_refs refs/heads/ "" 50
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 0 ]
+  [ -n "$(ls "$CONTENT_GUARDS_CACHE_DIR/branch-refs")" ]
+  add_refs refs/heads/feat/ "" 49
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 2 ]
+  rm .git/refs/heads/feat/branch-1
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 0 ]
+  [ "$(git_calls)" -eq 0 ]
+}
+
+@test "TC11b: worktrees of one repository share a cache entry" {
+  "$REAL_GIT" worktree add -q -b wt-branch "$FAKE_GIT_DIR/wt" 2>/dev/null
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  cd "$FAKE_GIT_DIR/wt"
+  run_hook '{"tool_input":{"command":"git branch other-feature"}}'
+  [ "$status" -eq 0 ]
+  [ "$(ls "$CONTENT_GUARDS_CACHE_DIR/branch-refs" | grep -c '\.json$')" -eq 1 ]
+}
+
+# ---------------------------------------------------------------------------
+# TC12: Block message includes a ranked cleanup plan
+# ---------------------------------------------------------------------------
+
+@test "TC12: block message ranks merged branches from two bulk ref queries" {
+  add_refs refs/heads/ "" 99
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "Stale branches: 99 merged, 0 gone on remote, 0 old" ]]
+  [[ "$output" =~ "... and 89 more" ]]
+  [[ "$output" =~ "Run: "[^[:space:]]*"prune-stale-branches.py"$'\n' ]]
+  [[ ! "$output" =~ "Run: "[^[:space:]]*"prune-stale-branches.py --apply" ]]
+  [ "$(grep -c '^for-each-ref' "$FAKE_GIT_DIR/calls")" -eq 2 ]
+}
+
+@test "TC12b: block message falls back to generic advice when analysis fails" {
+  add_refs refs/heads/ "" 99
+  export REAL_GIT=false
+  run_hook '{"tool_input":{"command":"git branch new-feature"}}'
+  [ "$status" -eq 2 ]
+  [[ ! "$output" =~ "Stale branches" ]]
+  [[ "$output" =~ "Delete merged or stale branches" ]]
+}
@@ -0,0 +1,125 @@
+#!/usr/bin/env bats
+# Test suite for content-guards/scripts/prune-stale-branches.py
+#
+# Tests the ranked stale-branch plan (merged, gone on remote, old) and the
+# batch delete: one `git branch` call for local branches and one
+# `git push --delete` per remote, against a local bare "origin".
+#
+# A git wrapper earlier in PATH logs every git invocation.
+#
+# Run with: bats tests/content-guards/enforce-branch-limits/prune-stale-branches.bats
+
+load '../../helpers/git'
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  SCRIPT="$REPO_ROOT/content-guards/scripts/prune-stale-branches.py"
+  WORK_DIR="$(mktemp -d)"
+  REPO="$WORK_DIR/repo"
+  REAL_GIT="$(command -v git)"
+
+  make_repo "$REPO" >/dev/null
+  git init -q --bare "$WORK_DIR/origin.git"
+  cd "$REPO"
+  git remote add origin "$WORK_DIR/origin.git"
+
+  # merged-1..3: at main; pushed, so origin/merged-* are merged too
+  for i in 1 2 3; do git branch "merged-$i"; done
+  # unmerged: one commit ahead of main, pushed then deleted on the remote
+  git checkout -q -b gone-1
+  echo change > change.txt && git add change.txt && git commit -q -m change
+  git checkout -q main
+  # old: unmerged, last commit 200 days ago, local only
+  git checkout -q -b old-1
+  echo old > old.txt && git add old.txt
+  GIT_COMMITTER_DATE="$(( $(date +%s) - 200 * 86400 )) +0000" git commit -q -m old
+  git checkout -q main
+  git push -q origin main merged-1 merged-2 merged-3 gone-1 2>/dev/null
+  git branch -q --set-upstream-to=origin/gone-1 gone-1
+  git push -q origin --delete gone-1 2>/dev/null
+  git fetch -q --prune origin
+
+  mkdir "$WORK_DIR/bin"
+  cat > "$WORK_DIR/bin/git" <<'FAKEOF'
+#!/usr/bin/env bash
+echo "$*" >> "$WORK_DIR/calls"
+exec "$REAL_GIT" "$@"
+FAKEOF
+  chmod +x "$WORK_DIR/bin/git"
+  export PATH="$WORK_DIR/bin:$PATH" WORK_DIR REAL_GIT
+}
+
+teardown() {
+  rm -rf "$WORK_DIR"
+}
+
+calls() {
+  grep -c "$1" "$WORK_DIR/calls" || true
+}
+
+@test "TC1: plan ranks merged, then gone, then old branches" {
+  run python3 "$SCRIPT" --json
+  [ "$status" -eq 0 ]
+  reasons="$(echo "$output" | jq -r '[.branches[] | .reason] | unique | join(",")')"
+  [ "$reasons" = "gone,merged,old" ]
+  [ "$(echo "$output" | jq -r '.branches[0].reason')" = "merged" ]
+  [ "$(echo "$output" | jq -r '.branches[-1].reason')" = "old" ]
+  [ "$(echo "$output" | jq '[.branches[] | select(.reason == "merged")] | length')" -eq 6 ]
+  [ "$(echo "$output" | jq -r '.branches[] | select(.reason == "gone") | .name')" = "gone-1" ]
+}
+
+@test "TC2: base branch and the checked-out branch are never candidates" {
+  run python3 "$SCRIPT" --json
+  [ "$status" -eq 0 ]
+  [ "$(echo "$output" | jq '[.branches[] | select(.name == "main")] | length')" -eq 0 ]
+}
+
+@test "TC3: dry run prints the batch commands without deleting" {
+  run python3 "$SCRIPT"
+  [ "$status" -eq 0 ]
+  [[ "$output" =~ "Would run: git branch -d merged-1 merged-2 merged-3" ]]
+  [[ "$output" =~ "Would run: git push origin --delete merged-1 merged-2 merged-3" ]]
+  [ "$(calls '^branch -d')" -eq 0 ]
+  "$REAL_GIT" rev-parse -q --verify refs/heads/merged-1
+}
+
+@test "TC4: plan is built from two bulk ref queries" {
+  run python3 "$SCRIPT"
+  [ "$status" -eq 0 ]
+  [ "$(wc -l < "$WORK_DIR/calls")" -eq 2 ]
+  [ "$(calls '^for-each-ref')" -eq 2 ]
+}
+
+@test "TC5: --apply deletes in one local call and one push per remote" {
+  run python3 "$SCRIPT" --apply
+  [ "$status" -eq 0 ]
+  [ "$(calls '^branch -d')" -eq 1 ]
+  [ "$(calls '^push origin --delete')" -eq 1 ]
+  run "$REAL_GIT" rev-parse -q --verify refs/heads/merged-2
+  [ "$status" -ne 0 ]
+  run "$REAL_GIT" --git-dir="$WORK_DIR/origin.git" rev-parse -q --verify refs/heads/merged-2
+  [ "$status" -ne 0 ]
+  # Unmerged gone and old branches are kept without --include-gone
+  "$REAL_GIT" rev-parse -q --verify refs/heads/gone-1
+  "$REAL_GIT" rev-parse -q --verify refs/heads/old-1
+}
+
+@test "TC6: --include-gone force-deletes branches gone on the remote" {
+  run python3 "$SCRIPT" --apply --include-gone
+  [ "$status" -eq 0 ]
+  [ "$(calls '^branch -D gone-1')" -eq 1 ]
+  run "$REAL_GIT" rev-parse -q --verify refs/heads/gone-1
+  [ "$status" -ne 0 ]
+  "$REAL_GIT" rev-parse -q --verify refs/heads/old-1
+}
+
+@test "TC7: --min-age-days controls which unmerged branches are old" {
+  run python3 "$SCRIPT" --json --min-age-days 365
+  [ "$status" -eq 0 ]
+  [ "$(echo "$output" | jq '[.branches[] | select(.reason == "old")] | length')" -eq 0 ]
+}
+
+@test "TC8: unknown base branch is a usage error" {
+  run python3 "$SCRIPT" --base no-such-branch
+  [ "$status" -eq 2 ]
+}
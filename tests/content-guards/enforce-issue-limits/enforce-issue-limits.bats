@@ -9,7 +9,11 @@
 setup() {
   REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
   SCRIPT="$REPO_ROOT/content-guards/scripts/enforce-issue-limits.py"
+  RECORD="$REPO_ROOT/content-guards/scripts/record-gh-create.py"
   FAKE_GH_DIR="$(mktemp -d)"
+  # Isolate the per-repo snapshot cache so results never leak between tests
+  CONTENT_GUARDS_CACHE_DIR="$(mktemp -d)"
+  export CONTENT_GUARDS_CACHE_DIR
 
   if [[ ! -f "$SCRIPT" ]]; then
     echo "ERROR: Script not found at $SCRIPT" >&2
@@ -20,8 +24,29 @@ setup() {
   # GH_EXIT_CODE before calling the script under test.
   # GH_RESPONSE_ALL overrides the response when --state all is present
   # (used to simulate different open vs all-state counts for rate limit tests).
+  # GH_GRAPHQL_RESPONSE answers `gh api graphql` (GH_PAGE_RESPONSE answers
+  # title-index page queries, default empty); without it the GraphQL
+  # call gets GH_RESPONSE, which is not a valid snapshot, so the hook falls
+  # back to the list calls. GH_ORG_RESPONSE answers the org-wide OrgLimits
+  # query. Every invocation is logged to $FAKE_GH_DIR/calls and takes
+  # GH_DELAY seconds.
   cat > "$FAKE_GH_DIR/gh" <<'EOF'
 #!/usr/bin/env bash
+echo "${*//$'\n'/ }" >> "$FAKE_GH_DIR/calls"
+sleep "${GH_DELAY:-0}"
+if [[ "$1" == "api" ]] && [[ "$*" == *OrgLimits* ]]; then
+  echo "${GH_ORG_RESPONSE:-}"
+  exit 0
+fi
+if [[ "$1" == "api" ]] && [[ -n "${GH_GRAPHQL_RESPONSE:-}" ]]; then
+  if [[ "$*" == *pageInfo* ]]; then
+    empty_page='{"data":{"repository":{"page":{"nodes":[],"pageInfo":{"hasNextPage":false,"endCursor":null}}}}}'
+    echo "${GH_PAGE_RESPONSE:-$empty_page}"
+  else
+    echo "$GH_GRAPHQL_RESPONSE"
+  fi
+  exit 0
+fi
 if [[ -n "${GH_RESPONSE_ALL:-}" ]] && [[ "$*" == *"--state all"* ]]; then
   echo "$GH_RESPONSE_ALL"
 else
@@ -36,7 +61,7 @@ EOF
 }
 
 teardown() {
-  rm -rf "$FAKE_GH_DIR"
+  rm -rf "$FAKE_GH_DIR" "$CONTENT_GUARDS_CACHE_DIR"
 }
 
 # Helper: get current UTC time as ISO 8601
@@ -56,6 +81,20 @@ build_json_array() {
   echo "$arr"
 }
 
+# Helper: build a GraphQL snapshot response
+# Usage: graphql_response <open_total> <ai_total> <recent_count> [updated_nodes_json [open_nodes_json]]
+# The newest open items default to the updated ones.
+graphql_response() {
+  printf '{"data":{"repository":{"open":{"totalCount":%s,"nodes":%s},"ai":{"totalCount":%s},"updated":{"nodes":%s}},"recent":{"issueCount":%s,"nodes":[]}}}' \
+    "$1" "${5:-${4:-[]}}" "$2" "${4:-[]}" "$3"
+}
+
+# Helper: one item node for graphql_response
+# Usage: item_node <number> <title> [state]
+item_node() {
+  printf '{"number":%s,"title":"%s","state":"%s","updatedAt":"2026-01-01T00:00:00Z"}' "$1" "$2" "${3:-OPEN}"
+}
+
 # Helper: run the hook with the given JSON input, capturing exit status and stderr
 run_hook() {
   run python3 "$SCRIPT" <<< "$1"
@@ -357,3 +396,382 @@ print('PASS')
   [ "$status" -eq 0 ]
   [[ "$output" =~ "PASS" ]]
 }
+
+# ---------------------------------------------------------------------------
+# TC17: single GraphQL round trip with exact counts
+# ---------------------------------------------------------------------------
+
+@test "TC17: create under all limits makes exactly one gh call" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 0 1)"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title \"fix: broken login\""}}'
+  [ "$status" -eq 0 ]
+  [ "$(wc -l < "$FAKE_GH_DIR/calls")" -eq 1 ]
+  grep -q '^api graphql' "$FAKE_GH_DIR/calls"
+}
+
+@test "TC17b: GraphQL query scopes the recent search to the caller and repo" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 0 0 0)"
+
+  run_hook '{"tool_input":{"command":"gh pr create --title test"}}'
+  [ "$status" -eq 0 ]
+  grep -q 'recent=repo:{owner}/{repo} is:pr author:@me created:>=' "$FAKE_GH_DIR/calls"
+  grep -q 'pullRequests(states: OPEN' "$FAKE_GH_DIR/calls"
+}
+
+@test "TC17c: open totals above 100 are counted exactly" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 250 0 0)"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title test"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "250/100" ]]
+}
+
+@test "TC17d: ai-created totalCount drives the AI hard limit" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 30 25 0)"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title test"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "AI-created Issues: 25/25" ]]
+}
+
+@test "TC17e: recent issueCount drives the 24h rate limit" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 2 0 40)"
+
+  run_hook '{"tool_input":{"command":"gh pr create --title test"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "40 PRs created in the past 24 hours" ]]
+}
+
+@test "TC17f: duplicate titles come from the GraphQL snapshot" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 1 0 0 "[$(item_node 7 'chore: update dependencies')]")"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title \"chore: update dependencies\""}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "BLOCKED: Duplicate Issue detected" ]]
+  [[ "$output" =~ "#7" ]]
+}
+
+@test "TC17g: duplicate titles are open items, not just recently updated ones" {
+  local closed="" i
+  for i in $(seq 1 100); do closed+="$(item_node "$((i + 100))" "chore: closed task number $i" CLOSED),"; done
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 1 0 0 "[${closed%,}]" "[$(item_node 7 'chore: update dependencies')]")"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title \"chore: update dependencies\""}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "#7" ]]
+}
+
+# ---------------------------------------------------------------------------
+# TC18: fallback list lookups run concurrently
+# ---------------------------------------------------------------------------
+
+@test "TC18: fallback lookups overlap instead of running back to back" {
+  export GH_DELAY=1.5
+  export GH_RESPONSE='[{"number":1,"title":"chore: update dependencies","labels":[],"createdAt":"2020-01-01T00:00:00Z"}]'
+
+  local start=$SECONDS
+  run_hook '{"tool_input":{"command":"gh issue create --title \"chore: update dependencies\""}}'
+  # GraphQL attempt + one overlapped round of list calls, not GraphQL + three
+  [ $((SECONDS - start)) -lt 5 ]
+  [ "$(wc -l < "$FAKE_GH_DIR/calls")" -eq 4 ]
+  # Block precedence is unchanged: the duplicate is reported
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "BLOCKED: Duplicate Issue detected" ]]
+}
+
+# ---------------------------------------------------------------------------
+# TC19: per-repo snapshot cache shared across sessions
+# ---------------------------------------------------------------------------
+
+@test "TC19: a second create within the TTL is served from the cache" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 0 0)"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title one"}}'
+  [ "$status" -eq 0 ]
+  run_hook '{"tool_input":{"command":"gh issue create --title two"}}'
+  [ "$status" -eq 0 ]
+  [ "$(wc -l < "$FAKE_GH_DIR/calls")" -eq 1 ]
+}
+
+@test "TC19b: concurrent sessions share one single-flight refresh" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 0 0)"
+  export GH_DELAY=1
+
+  local i
+  for i in 1 2 3 4; do
+    python3 "$SCRIPT" <<< '{"tool_input":{"command":"gh issue create --title test"}}' &
+  done
+  wait
+  [ "$(wc -l < "$FAKE_GH_DIR/calls")" -eq 1 ]
+}
+
+@test "TC19c: issues and PRs are cached separately" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 0 0)"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title test"}}'
+  run_hook '{"tool_input":{"command":"gh pr create --title test"}}'
+  [ "$(wc -l < "$FAKE_GH_DIR/calls")" -eq 2 ]
+}
+
+@test "TC19d: fallback list results are not cached" {
+  export GH_RESPONSE='[]'
+
+  run_hook '{"tool_input":{"command":"gh issue create --title one"}}'
+  local first
+  first="$(wc -l < "$FAKE_GH_DIR/calls")"
+  run_hook '{"tool_input":{"command":"gh issue create --title two"}}'
+  # Refetched (minus the recent-creations lookup, now served by the ledger)
+  [ "$(wc -l < "$FAKE_GH_DIR/calls")" -eq $((first * 2 - 1)) ]
+}
+
+# ---------------------------------------------------------------------------
+# TC20: record-gh-create.py keeps the cache current without refetching
+# ---------------------------------------------------------------------------
+
+# Helper: run the PostToolUse recorder for a command and its stdout
+record_create() {
+  python3 -c 'import json, sys; print(json.dumps({"tool_name": "Bash", "tool_input": {"command": sys.argv[1]}, "tool_response": {"stdout": sys.argv[2], "stderr": ""}}))' "$1" "$2" \
+    | python3 "$RECORD"
+}
+
+@test "TC20: a recorded create counts toward the hard limit" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 99 0 0)"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title first"}}'
+  [ "$status" -eq 0 ]
+  record_create 'gh issue create --title first' 'https://github.com/o/r/issues/500'
+
+  run_hook '{"tool_input":{"command":"gh issue create --title second"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "100/100" ]]
+  [ "$(wc -l < "$FAKE_GH_DIR/calls")" -eq 1 ]
+}
+
+@test "TC20b: a recorded create's title is caught as a duplicate" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 1 0 0)"
+
+  run_hook '{"tool_input":{"command":"gh pr create --title \"feat: add cache layer\""}}'
+  [ "$status" -eq 0 ]
+  record_create 'gh pr create --title "feat: add cache layer" --label ai-created' 'https://github.com/o/r/pull/12'
+
+  run_hook '{"tool_input":{"command":"gh pr create --title \"feat: add cache layer\""}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "#12" ]]
+}
+
+@test "TC20c: a failed create is not recorded" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 99 0 0)"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title first"}}'
+  record_create 'gh issue create --title first' 'could not create issue: HTTP 422'
+
+  run_hook '{"tool_input":{"command":"gh issue create --title second"}}'
+  [ "$status" -eq 0 ]
+}
+
+@test "TC20d: recorder ignores unrelated commands and bad input" {
+  run python3 "$RECORD" <<< 'not json'
+  [ "$status" -eq 0 ]
+  record_create 'echo https://github.com/o/r/issues/1' 'https://github.com/o/r/issues/1'
+}
+
+# ---------------------------------------------------------------------------
+# TC21: local creation ledger answers the 24h rate limit
+# ---------------------------------------------------------------------------
+
+@test "TC21: recent creations are only fetched to reconcile the ledger" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 0 0)"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title one"}}'
+  grep -q 'search(type: ISSUE' "$FAKE_GH_DIR/calls"
+
+  # Snapshot expired, ledger still warm: the query skips the search
+  rm -rf "$CONTENT_GUARDS_CACHE_DIR/issue-snapshots" "$FAKE_GH_DIR/calls"
+  run_hook '{"tool_input":{"command":"gh issue create --title two"}}'
+  [ "$status" -eq 0 ]
+  run grep -q 'search(type: ISSUE' "$FAKE_GH_DIR/calls"
+  [ "$status" -ne 0 ]
+}
+
+@test "TC21b: recorded creates count toward the rate limit without a gh call" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 0 24)"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title first"}}'
+  [ "$status" -eq 0 ]
+  record_create 'gh issue create --title first' 'https://github.com/o/r/issues/77'
+
+  run_hook '{"tool_input":{"command":"gh issue create --title second"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "25 Issues created in the past 24 hours" ]]
+  [ "$(wc -l < "$FAKE_GH_DIR/calls")" -eq 1 ]
+}
+
+@test "TC21c: a stale ledger is reconciled again" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 0 0)"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title one"}}'
+  local meta
+  for meta in "$CONTENT_GUARDS_CACHE_DIR"/ledger/*.json; do
+    echo '{"reconciled_at": 0}' > "$meta"
+  done
+  rm -rf "$CONTENT_GUARDS_CACHE_DIR/issue-snapshots" "$FAKE_GH_DIR/calls"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title two"}}'
+  grep -q 'search(type: ISSUE' "$FAKE_GH_DIR/calls"
+}
+
+# ---------------------------------------------------------------------------
+# TC22: near-duplicate titles via the persisted similarity index (warn only)
+# ---------------------------------------------------------------------------
+
+@test "TC22: near-duplicate title is allowed with a warning" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 1 0 0 "[$(item_node 42 'docs: fix stale references in the README')]")"
+
+  run_hook '{"tool_input":{"command":"gh pr create --title \"docs: fix the stale references in the README\""}}'
+  [ "$status" -eq 0 ]
+  [[ "$output" =~ "systemMessage" ]]
+  [[ "$output" =~ "Possible duplicate PR" ]]
+  [[ "$output" =~ "similar to existing #42" ]]
+}
+
+@test "TC22b: ISSUE_LIMITS_DUPLICATE_THRESHOLD raises the bar" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 1 0 0 "[$(item_node 42 'docs: fix stale references in the README')]")"
+  export ISSUE_LIMITS_DUPLICATE_THRESHOLD=0.95
+
+  run_hook '{"tool_input":{"command":"gh pr create --title \"docs: fix the stale references in the README\""}}'
+  [ "$status" -eq 0 ]
+  [[ ! "$output" =~ "Possible duplicate" ]]
+}
+
+@test "TC22c: closed items are not duplicates" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 0 0 0 "[$(item_node 42 'docs: fix stale references in the README' CLOSED)]" "[]")"
+
+  run_hook '{"tool_input":{"command":"gh pr create --title \"docs: fix the stale references in the README\""}}'
+  [ "$status" -eq 0 ]
+  [[ ! "$output" =~ "Possible duplicate" ]]
+}
+
+@test "TC22d: items beyond the newest 100 are found via an index rebuild" {
+  local nodes="" i
+  for i in $(seq 1 100); do nodes+="$(item_node "$i" "chore: routine task number $i"),"; done
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 99 0 0 "[${nodes%,}]")"
+  export GH_PAGE_RESPONSE='{"data":{"repository":{"page":{"nodes":['"$(item_node 5000 'refactor: split the giant settings module')"'],"pageInfo":{"hasNextPage":false,"endCursor":null}}}}}'
+
+  run_hook '{"tool_input":{"command":"gh issue create --title \"refactor: split the giant settings modules\""}}'
+  [ "$status" -eq 0 ]
+  [[ "$output" =~ "#5000" ]]
+}
+
+@test "TC22e: distinct items with near-identical titles get no warning" {
+  local nodes
+  nodes="$(item_node 42 'Bump foo from 1.2 to 1.3'),$(item_node 43 'chore(deps): bump actions/checkout from 4.1.1 to 4.1.2')"
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 2 0 0 "[$nodes]")"
+
+  run_hook '{"tool_input":{"command":"gh pr create --title \"Bump foo from 1.3 to 1.4\""}}'
+  [ "$status" -eq 0 ]
+  [[ ! "$output" =~ "Possible duplicate" ]]
+  run_hook '{"tool_input":{"command":"gh pr create --title \"chore(deps): bump actions/checkout from 4.1.2 to 4.1.3\""}}'
+  [ "$status" -eq 0 ]
+  [[ ! "$output" =~ "Possible duplicate" ]]
+}
+
+# ---------------------------------------------------------------------------
+# TC23: org-wide AI-created cap (.issue-limits.yaml)
+# ---------------------------------------------------------------------------
+
+# Helper: an org checkout directory with an .issue-limits.yaml
+# Usage: make_org_dir <max_ai_created> [repo...]
+make_org_dir() {
+  ORG_DIR="$FAKE_GH_DIR/org"
+  mkdir -p "$ORG_DIR/repo-a"
+  {
+    printf 'org:\n  name: acme\n  max_ai_created: %s\n' "$1"
+    shift
+    if [[ $# -gt 0 ]]; then
+      echo "  repos:"
+      printf '    - %s\n' "$@"
+    fi
+  } > "$ORG_DIR/.issue-limits.yaml"
+}
+
+# Helper: aliased org response; usage: org_response <ai issues a> <ai prs a> <ai issues b>
+org_response() {
+  printf '{"data":{"r0":{"name":"repo-a","issues":{"totalCount":%s},"pullRequests":{"totalCount":%s}},"r1":{"name":"repo-b","issues":{"totalCount":%s},"pullRequests":{"totalCount":0}},"r2":null}}' "$1" "$2" "$3"
+}
+
+@test "TC23: org cap blocks when AI-created items across repos reach it" {
+  make_org_dir 10 repo-a repo-b repo-gone
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 1 0)"
+  export GH_ORG_RESPONSE="$(org_response 2 3 5)"
+
+  run_hook '{"tool_input":{"command":"cd '"$ORG_DIR/repo-a"' && gh issue create --title new"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "BLOCKED: Org-wide AI-created limit exceeded" ]]
+  [[ "$output" =~ "across acme: 10/10" ]]
+  [[ "$output" =~ "repo-b: 5" ]]
+}
+
+@test "TC23b: org cap allows creates under the aggregate" {
+  make_org_dir 11 repo-a repo-b
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 1 0)"
+  export GH_ORG_RESPONSE="$(org_response 2 3 5)"
+
+  run_hook '{"tool_input":{"command":"cd '"$ORG_DIR/repo-a"' && gh issue create --title new"}}'
+  [ "$status" -eq 0 ]
+}
+
+@test "TC23c: one aliased query for all repos, cached across creates" {
+  make_org_dir 50 repo-a repo-b repo-gone
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 1 0)"
+  export GH_ORG_RESPONSE="$(org_response 2 3 5)"
+
+  run_hook '{"tool_input":{"command":"cd '"$ORG_DIR/repo-a"' && gh issue create --title one"}}'
+  run_hook '{"tool_input":{"command":"cd '"$ORG_DIR/repo-a"' && gh pr create --title two"}}'
+  [ "$status" -eq 0 ]
+  [ "$(grep -c OrgLimits "$FAKE_GH_DIR/calls")" -eq 1 ]
+  grep -q 'r2: repository(owner: "acme", name: "repo-gone")' "$FAKE_GH_DIR/calls"
+}
+
+@test "TC23d: without repos, the owner's repositories are counted in one query" {
+  make_org_dir 4
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 1 0)"
+  export GH_ORG_RESPONSE='{"data":{"owner":{"repositories":{"nodes":[{"name":"x","issues":{"totalCount":3},"pullRequests":{"totalCount":1}}]}}}}'
+
+  run_hook '{"tool_input":{"command":"cd '"$ORG_DIR/repo-a"' && gh issue create --title new"}}'
+  [ "$status" -eq 2 ]
+  grep -q 'login=acme' "$FAKE_GH_DIR/calls"
+}
+
+@test "TC23e: org lookup failure fails open" {
+  make_org_dir 1 repo-a
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 1 0)"
+  export GH_ORG_RESPONSE='not json'
+
+  run_hook '{"tool_input":{"command":"cd '"$ORG_DIR/repo-a"' && gh issue create --title new"}}'
+  [ "$status" -eq 0 ]
+}
+
+@test "TC23f: a recorded ai-created create counts toward the org cap" {
+  make_org_dir 10 repo-a repo-b
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 1 0)"
+  export GH_ORG_RESPONSE="$(org_response 2 2 5)"
+
+  run_hook '{"tool_input":{"command":"cd '"$ORG_DIR/repo-a"' && gh issue create --title one"}}'
+  [ "$status" -eq 0 ]
+  record_create "cd $ORG_DIR/repo-a && gh issue create --title one --label ai-created" 'https://github.com/acme/repo-a/issues/9'
+
+  run_hook '{"tool_input":{"command":"cd '"$ORG_DIR/repo-a"' && gh issue create --title two"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "10/10" ]]
+  [ "$(grep -c OrgLimits "$FAKE_GH_DIR/calls")" -eq 1 ]
+}
+
+@test "TC23g: no .issue-limits.yaml means no org query" {
+  export GH_GRAPHQL_RESPONSE="$(graphql_response 3 1 0)"
+
+  run_hook '{"tool_input":{"command":"gh issue create --title new"}}'
+  [ "$status" -eq 0 ]
+  run grep -q OrgLimits "$FAKE_GH_DIR/calls"
+  [ "$status" -ne 0 ]
+}
@@ -0,0 +1,109 @@
+#!/usr/bin/env bats
+# Scale and failure-mode tests for content-guards/scripts/enforce-issue-limits.py
+#
+# Runs the hook against the offline fake gh (tests/helpers/fake_gh.py) with
+# generated fixture repos of up to 10k items, simulated latency and failures.
+#
+# Run with: bats tests/content-guards/enforce-issue-limits/scale.bats
+
+load '../../helpers/gh'
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  SCRIPT="$REPO_ROOT/content-guards/scripts/enforce-issue-limits.py"
+  WORK_DIR="$(mktemp -d)"
+  CONTENT_GUARDS_CACHE_DIR="$WORK_DIR/cache"
+  FAKE_GH_LOG="$WORK_DIR/calls"
+  export CONTENT_GUARDS_CACHE_DIR FAKE_GH_LOG
+  mkdir -p "$WORK_DIR/bin"
+  install_fake_gh "$WORK_DIR/bin" "$WORK_DIR/store.json"
+}
+
+teardown() {
+  rm -rf "$WORK_DIR"
+}
+
+create_issue() {
+  run python3 "$SCRIPT" <<< "{\"tool_input\":{\"command\":\"gh issue create --title \\\"$1\\\"\"}}"
+}
+
+gh_calls() {
+  grep -c "$1" "$FAKE_GH_LOG" || true
+}
+
+@test "TC1: 10k open issues are counted exactly in one call" {
+  make_gh_fixture "$WORK_DIR/store.json" --issues 10000
+
+  create_issue "" # No title: no duplicate check, snapshot only
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "Total Issues: 10000/100" ]]
+  [ "$(gh_calls 'api graphql')" -eq 1 ]
+}
+
+@test "TC2: 10k closed issues do not count toward the open limit" {
+  make_gh_fixture "$WORK_DIR/store.json" --issues 50 --closed 10000
+
+  create_issue "fix: something new"
+  [ "$status" -eq 0 ]
+}
+
+@test "TC3: near-duplicate of an old item in a 2k-issue repo is found" {
+  make_gh_fixture "$WORK_DIR/store.json" --issues 2000 \
+    --title '7=refactor: split the giant settings module'
+
+  # A cold rebuild pages through at most 10 pages (1000 items) per run
+  create_issue "fix: unrelated"
+  [ "$(gh_calls pageInfo)" -eq 10 ]
+  create_issue "refactor: split the giant settings modules"
+  [[ "$output" =~ "Possible duplicate Issue" ]]
+  [[ "$output" =~ "#7" ]]
+}
+
+@test "TC4: a warm title index is updated without paging" {
+  make_gh_fixture "$WORK_DIR/store.json" --issues 2000
+
+  create_issue "fix: first"
+  create_issue "fix: rebuild resumed"
+  [ "$(gh_calls pageInfo)" -eq 20 ]
+
+  rm -rf "$CONTENT_GUARDS_CACHE_DIR/issue-snapshots" "$FAKE_GH_LOG"
+  create_issue "fix: second"
+  [ "$(gh_calls pageInfo)" -eq 0 ]
+  [ "$(gh_calls 'api graphql')" -eq 1 ]
+}
+
+@test "TC5: recent creations by the caller hit the rate limit" {
+  make_gh_fixture "$WORK_DIR/store.json" --issues 30 --mine-recent 25
+
+  create_issue "fix: something new"
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "25 Issues created in the past 24 hours" ]]
+}
+
+@test "TC6: GraphQL failure falls back to capped list calls" {
+  make_gh_fixture "$WORK_DIR/store.json" --issues 10000
+  export FAKE_GH_FAIL=graphql
+
+  create_issue ""
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "Total Issues: 100/100" ]]
+  [ "$(gh_calls ' list ')" -eq 3 ]
+}
+
+@test "TC7: total gh failure fails open" {
+  make_gh_fixture "$WORK_DIR/store.json" --issues 10000
+  export FAKE_GH_FAIL=all
+
+  create_issue "fix: something new"
+  [ "$status" -eq 0 ]
+}
+
+@test "TC8: slow gh lookups overlap in the fallback path" {
+  make_gh_fixture "$WORK_DIR/store.json" --issues 10
+  export FAKE_GH_FAIL=graphql FAKE_GH_LATENCY=1
+
+  local start=$SECONDS
+  create_issue "fix: something new"
+  [ "$status" -eq 0 ]
+  [ $((SECONDS - start)) -lt 4 ]
+}
@@ -0,0 +1,166 @@
+#!/usr/bin/env bats
+# Test suite for incremental (block-level) markdown linting through the
+# lint worker (content-guards/scripts/lint_blocks.py, lint_worker.py)
+#
+# The offline markdownlint-cli2 stand-in logs the number of lines each
+# lint read to $FAKE_MDL_LINES_LOG: a full lint of the test document reads
+# ~600 lines, a block lint a few.
+#
+# Run with: bats tests/content-guards/markdown-validator/incremental-lint.bats
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  SCRIPT="$REPO_ROOT/content-guards/scripts/validate-markdown.sh"
+  CLIENT="$REPO_ROOT/content-guards/scripts/lint_worker.py"
+
+  command -v node &>/dev/null || skip "node not installed"
+
+  # Before the stand-in shadows it
+  REAL_MDL="$(command -v markdownlint-cli2 || true)"
+  WORK_DIR="$(mktemp -d)"
+  export CONTENT_GUARDS_CACHE_DIR="$WORK_DIR/cache"
+  export FAKE_MDL_LOG="$WORK_DIR/lint.log"
+  export FAKE_MDL_LINES_LOG="$WORK_DIR/lines.log"
+  export PATH="$REPO_ROOT/tests/helpers/fake-markdownlint-cli2/bin:$PATH"
+  mkdir -p "$WORK_DIR/docs"
+  git -C "$WORK_DIR/docs" init -q
+  DOC="$WORK_DIR/docs/big.md"
+  local i j
+  {
+    echo "# Big document"
+    for i in $(seq 1 50); do
+      printf '\n## Section %s\n\n' "$i"
+      for j in $(seq 1 9); do echo "Line $j of section $i."; done
+    done
+  } > "$DOC"
+}
+
+teardown() {
+  python3 "$CLIENT" stop 2>/dev/null || true
+  rm -rf "$WORK_DIR"
+}
+
+validate() {
+  echo "{\"tool_input\":{\"file_path\":\"$DOC\"}}" | /bin/bash "$SCRIPT"
+}
+
+last_lines() {
+  tail -n 1 "$FAKE_MDL_LINES_LOG"
+}
+
+@test "TC1: first lint of a large document is a full lint" {
+  run validate
+  [ "$status" -eq 0 ]
+  [ "$(last_lines)" -gt 500 ]
+}
+
+@test "TC2: an edit re-lints only the changed section" {
+  validate
+  sed -i 's/^Line 3 of section 25\.$/Line 3 of section 25, edited./' "$DOC"
+  run validate
+  [ "$status" -eq 0 ]
+  [ "$(wc -l < "$FAKE_MDL_LINES_LOG")" -eq 2 ]
+  [ "$(last_lines)" -lt 20 ]
+}
+
+@test "TC3: unchanged content does not lint at all" {
+  validate
+  run validate
+  [ "$status" -eq 0 ]
+  [ "$(wc -l < "$FAKE_MDL_LINES_LOG")" -eq 1 ]
+}
+
+@test "TC4: a violation in the edited section is confirmed by a full lint" {
+  validate
+  sed -i 's/^Line 3 of section 25\.$/BAD_LINT/' "$DOC"
+  run validate
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "big.md:1 MD999/fake-rule BAD_LINT marker found" ]]
+  [ "$(last_lines)" -gt 500 ]
+  # The failed lint is not cached: fixing it re-lints in full
+  sed -i 's/^BAD_LINT$/Fixed./' "$DOC"
+  run validate
+  [ "$status" -eq 0 ]
+  [ "$(last_lines)" -gt 500 ]
+}
+
+@test "TC5: renaming a heading forces a full lint" {
+  validate
+  sed -i 's/^## Section 25$/## Section twenty-five/' "$DOC"
+  run validate
+  [ "$status" -eq 0 ]
+  [ "$(last_lines)" -gt 500 ]
+}
+
+@test "TC6: changing a markdownlint config forces a full lint" {
+  validate
+  printf '{}\n' > "$WORK_DIR/docs/.markdownlint.json"
+  sed -i 's/^Line 3 of section 25\.$/Edited./' "$DOC"
+  run validate
+  [ "$(last_lines)" -gt 500 ]
+}
+
+@test "TC7: small documents and CONTENT_GUARDS_INCREMENTAL_LINT=0 always lint in full" {
+  validate
+  export CONTENT_GUARDS_INCREMENTAL_LINT=0
+  sed -i 's/^Line 3 of section 25\.$/Edited./' "$DOC"
+  run validate
+  [ "$(last_lines)" -gt 500 ]
+  unset CONTENT_GUARDS_INCREMENTAL_LINT
+  head -n 20 "$DOC" > "$WORK_DIR/docs/small.md"
+  DOC="$WORK_DIR/docs/small.md"
+  validate
+  echo "More." >> "$DOC"
+  validate
+  [ "$(last_lines)" -eq 22 ]
+}
+
+@test "TC8: the block lint call shape lints its units with the real markdownlint-cli2" {
+  # The stand-in accepts any call shape; main() of the real linter must
+  # lint nonFileContents with no file arguments left in argv
+  [ -n "$REAL_MDL" ] || skip "markdownlint-cli2 not installed"
+  local module
+  module="$(PATH="$(dirname "$REAL_MDL"):$PATH" python3 -c '
+import sys
+sys.path.insert(0, sys.argv[1])
+import lint_worker
+print(lint_worker.module_path() or "")' "$REPO_ROOT/content-guards/scripts")"
+  [ -n "$module" ] || skip "markdownlint-cli2 module not found"
+  printf 'config:\n  default: true\nfix: true\n' > "$WORK_DIR/.markdownlint-cli2.yaml"
+
+  local argv
+  for argv in '["big.md"]' "[\"--config\", \"$WORK_DIR/.markdownlint-cli2.yaml\", \"big.md\"]"; do
+    rm -rf "$CONTENT_GUARDS_CACHE_DIR"
+    sed -i 's/^Line 3 of section 25\. $/Line 3 of section 25./' "$DOC"
+    # The payload lint_blocks.py sends after a one-space MD009 edit
+    payload="$(cd "$WORK_DIR/docs" && python3 - "$REPO_ROOT/content-guards/scripts" "$module" "$argv" <<'EOF'
+import json, os, sys
+sys.path.insert(0, sys.argv[1])
+from lint_blocks import incremental_lint, split_blocks
+module, argv = sys.argv[2], json.loads(sys.argv[3])
+cache, _ = incremental_lint(module, os.getcwd(), argv, lambda payload: None)
+with open("big.md", encoding="utf-8") as f:
+    content = f.read()
+cache.record_clean(split_blocks(content), incremental=False)
+with open("big.md", "w", encoding="utf-8") as f:
+    f.write(content.replace("Line 3 of section 25.\n", "Line 3 of section 25. \n"))
+sent = []
+incremental_lint(module, os.getcwd(), argv, lambda payload: sent.append(payload) or {"code": 1})
+print(json.dumps(sent[0]))
+EOF
+)"
+    [ -n "$payload" ]
+    run node --input-type=module -e '
+import { pathToFileURL } from "node:url";
+const [modulePath, payload] = process.argv.slice(1);
+const { main } = await import(pathToFileURL(modulePath).href);
+const lines = [];
+const log = (message) => lines.push(message);
+const code = await main({ ...JSON.parse(payload), logMessage: log, logError: log });
+console.log(lines.join("\n"));
+process.exit(code);' "$module" "$payload"
+    [ "$status" -eq 1 ]
+    [[ "$output" =~ block-0:[0-9]+:?[0-9]*\ MD009 ]]
+    [[ ! "$output" =~ big.md ]]
+  done
+}
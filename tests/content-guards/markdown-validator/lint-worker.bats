@@ -0,0 +1,115 @@
+#!/usr/bin/env bats
+# Test suite for the persistent markdownlint worker used by validate-markdown.sh
+#
+# Uses the offline markdownlint-cli2 stand-in in
+# tests/helpers/fake-markdownlint-cli2, which logs the pid of each lint to
+# $FAKE_MDL_LOG: one pid across calls means the worker was reused.
+#
+# Run with: bats tests/content-guards/markdown-validator/lint-worker.bats
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  SCRIPT="$REPO_ROOT/content-guards/scripts/validate-markdown.sh"
+  CLIENT="$REPO_ROOT/content-guards/scripts/lint_worker.py"
+
+  command -v node &>/dev/null || skip "node not installed"
+
+  WORK_DIR="$(mktemp -d)"
+  export CONTENT_GUARDS_CACHE_DIR="$WORK_DIR/cache"
+  export FAKE_MDL_LOG="$WORK_DIR/lint.log"
+  export PATH="$REPO_ROOT/tests/helpers/fake-markdownlint-cli2/bin:$PATH"
+  mkdir -p "$WORK_DIR/docs"
+  printf '# Title\n' > "$WORK_DIR/docs/good.md"
+  printf '# Title\n\nBAD_LINT\n' > "$WORK_DIR/docs/bad.md"
+}
+
+teardown() {
+  python3 "$CLIENT" stop 2>/dev/null || true
+  rm -rf "$WORK_DIR"
+}
+
+validate() {
+  echo "{\"tool_input\":{\"file_path\":\"$1\"}}" | /bin/bash "$SCRIPT"
+}
+
+lint_pids() {
+  sort -u "$FAKE_MDL_LOG" | wc -l | tr -d ' '
+}
+
+@test "TC1: clean file passes through the worker" {
+  run validate "$WORK_DIR/docs/good.md"
+  [ "$status" -eq 0 ]
+  [ -z "$output" ]
+}
+
+@test "TC2: worker is reused across edits" {
+  validate "$WORK_DIR/docs/good.md"
+  validate "$WORK_DIR/docs/good.md"
+  validate "$WORK_DIR/docs/good.md"
+  [ "$(wc -l < "$FAKE_MDL_LOG" | tr -d ' ')" -eq 3 ]
+  [ "$(lint_pids)" -eq 1 ]
+}
+
+@test "TC3: lint errors from the worker block with exit 2" {
+  run validate "$WORK_DIR/docs/bad.md"
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "markdownlint-cli2 failed:" ]]
+  [[ "$output" =~ "BAD_LINT marker found" ]]
+}
+
+@test "TC4: CONTENT_GUARDS_LINT_WORKER=0 runs the CLI each time" {
+  export CONTENT_GUARDS_LINT_WORKER=0
+  validate "$WORK_DIR/docs/good.md"
+  validate "$WORK_DIR/docs/good.md"
+  [ "$(lint_pids)" -eq 2 ]
+  run validate "$WORK_DIR/docs/bad.md"
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "BAD_LINT marker found" ]]
+}
+
+@test "TC5: falls back to the CLI when the module cannot be found" {
+  export CONTENT_GUARDS_MARKDOWNLINT_MODULE="$WORK_DIR/missing.mjs"
+  run python3 "$CLIENT" lint "$WORK_DIR/docs" good.md
+  [ "$status" -eq 3 ]
+  [[ ! "$output" =~ "Summary" ]]
+  run validate "$WORK_DIR/docs/bad.md"
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "BAD_LINT marker found" ]]
+}
+
+@test "TC6: stop shuts the worker down and the next edit restarts it" {
+  validate "$WORK_DIR/docs/good.md"
+  run python3 "$CLIENT" stop
+  [ "$status" -eq 0 ]
+  run python3 "$CLIENT" stop
+  [ "$status" -ne 0 ]
+  validate "$WORK_DIR/docs/good.md"
+  [ "$(lint_pids)" -eq 2 ]
+}
+
+@test "TC7: config flags and lint directory are passed to the worker" {
+  printf 'config:\n  default: true\n' > "$WORK_DIR/custom.yaml"
+  run python3 "$CLIENT" lint "$WORK_DIR/docs" --config "$WORK_DIR/custom.yaml" bad.md
+  [ "$status" -eq 1 ]
+  [[ "$output" =~ "bad.md:1" ]]
+}
+
+@test "TC8: a socket directory that is not private falls back to the CLI" {
+  export TMPDIR="$WORK_DIR/tmp"
+  mkdir -p "$TMPDIR/content-guards-$(id -u)"
+  chmod 755 "$TMPDIR/content-guards-$(id -u)"
+  run python3 "$CLIENT" lint "$WORK_DIR/docs" good.md
+  [ "$status" -eq 3 ]
+
+  rmdir "$TMPDIR/content-guards-$(id -u)"
+  mkdir -m 700 "$WORK_DIR/elsewhere"
+  ln -s "$WORK_DIR/elsewhere" "$TMPDIR/content-guards-$(id -u)"
+  run python3 "$CLIENT" lint "$WORK_DIR/docs" good.md
+  [ "$status" -eq 3 ]
+  [ -z "$(ls "$WORK_DIR/elsewhere")" ]
+
+  rm "$TMPDIR/content-guards-$(id -u)"
+  run python3 "$CLIENT" lint "$WORK_DIR/docs" good.md
+  [ "$status" -eq 0 ]
+  python3 "$CLIENT" stop
+}
@@ -0,0 +1,142 @@
+#!/usr/bin/env bats
+# Test suite for content-guards/scripts/scan-markdown.py
+#
+# Tests repo-wide discovery, README rules with per-directory config,
+# batched markdownlint-cli2 runs, and the --since incremental mode.
+#
+# markdownlint-cli2 is the offline stand-in in
+# tests/helpers/fake-markdownlint-cli2: "BAD_LINT" in a file is a lint
+# error, and each run appends a line to $FAKE_MDL_LOG.
+#
+# Run with: bats tests/content-guards/markdown-validator/scan-markdown.bats
+
+load '../../helpers/git'
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  SCRIPT="$REPO_ROOT/content-guards/scripts/scan-markdown.py"
+  FAKE_MDL_BIN="$REPO_ROOT/tests/helpers/fake-markdownlint-cli2/bin"
+  WORK_DIR="$(mktemp -d)"
+  REPO="$WORK_DIR/repo"
+
+  export CONTENT_GUARDS_CACHE_DIR="$WORK_DIR/cache"
+  export FAKE_MDL_LOG="$WORK_DIR/lint.log"
+  export ORIG_PATH="$PATH"
+  export PATH="$FAKE_MDL_BIN:$PATH"
+  touch "$FAKE_MDL_LOG"
+
+  make_repo "$REPO" >/dev/null
+  mkdir -p "$REPO/plugin-a" "$REPO/plugin-b" "$REPO/docs"
+  printf '# Root\n\n## Installation\n\n```bash\nmake\n```\n\n## Usage\n\nRun.\n' > "$REPO/README.md"
+  printf '# A\n\n## Usage\n\nRun.\n' > "$REPO/plugin-a/README.md"
+  printf '# B\n\n## Installation\n\n```bash\nmake\n```\n\n## Usage\n\nRun.\n' > "$REPO/plugin-b/README.md"
+  printf '# Guide\n\nBAD_LINT\n' > "$REPO/docs/guide.md"
+  printf '# Notes\n' > "$REPO/docs/notes.md"
+  git -C "$REPO" add -A
+  git -C "$REPO" commit -q -m "docs"
+}
+
+teardown() {
+  rm -rf "$WORK_DIR"
+}
+
+lint_runs() {
+  wc -l < "$FAKE_MDL_LOG" | tr -d ' '
+}
+
+@test "TC1: reports README and lint errors per file and exits 1" {
+  run python3 "$SCRIPT" "$REPO"
+  [ "$status" -eq 1 ]
+  [[ "$output" =~ "FAIL  plugin-a/README.md" ]]
+  [[ "$output" =~ "Missing required sections: Installation" ]]
+  [[ "$output" =~ "FAIL  docs/guide.md" ]]
+  [[ "$output" =~ "line 1: MD999/fake-rule BAD_LINT marker found" ]]
+  [[ ! "$output" =~ "docs/notes.md" ]]
+  [[ "$output" =~ "Checked 5 Markdown files, 2 with errors" ]]
+}
+
+@test "TC2: JSON report lists every file with a status" {
+  local report="$WORK_DIR/report.json"
+  run bash -c 'python3 "$1" "$2" --json > "$3"' _ "$SCRIPT" "$REPO" "$report"
+  [ "$status" -eq 1 ]
+  [ "$(jq '.files | length' "$report")" -eq 5 ]
+  [ "$(jq -r '.files[] | select(.file == "docs/notes.md") | .status' "$report")" = "pass" ]
+  [ "$(jq -r '.files[] | select(.file == "plugin-b/README.md") | .status' "$report")" = "warn" ]
+  [ "$(jq '.failures' "$report")" -eq 2 ]
+  [ "$(jq '.linted' "$report")" = "true" ]
+}
+
+@test "TC3: files without a project config are linted in one run" {
+  run python3 "$SCRIPT" "$REPO"
+  [ "$(lint_runs)" -eq 1 ]
+}
+
+@test "TC4: each project markdownlint config gets its own run" {
+  printf '{}\n' > "$REPO/plugin-b/.markdownlint.json"
+  run python3 "$SCRIPT" "$REPO"
+  [ "$(lint_runs)" -eq 2 ]
+}
+
+@test "TC5: .readme-validator.yaml applies to READMEs below it" {
+  printf 'required_sections:\n  - Usage\n' > "$REPO/plugin-a/.readme-validator.yaml"
+  run python3 "$SCRIPT" "$REPO"
+  [[ ! "$output" =~ "FAIL  plugin-a/README.md" ]]
+  [[ "$output" =~ "1 with errors" ]]
+}
+
+@test "TC6: --since only checks files changed since the ref" {
+  printf '\nMore.\n' >> "$REPO/docs/notes.md"
+  printf '# New\n' > "$REPO/docs/new.md"
+  run python3 "$SCRIPT" "$REPO" --since HEAD
+  [ "$status" -eq 0 ]
+  [[ "$output" =~ "Checked 2 Markdown files, 0 with errors" ]]
+}
+
+@test "TC7: .gitignore'd and .claude files are skipped" {
+  mkdir -p "$REPO/.claude" "$REPO/build"
+  printf 'BAD_LINT\n' > "$REPO/.claude/notes.md"
+  printf 'BAD_LINT\n' > "$REPO/build/out.md"
+  echo "build/" > "$REPO/.gitignore"
+  run python3 "$SCRIPT" "$REPO"
+  [[ ! "$output" =~ ".claude/notes.md" ]]
+  [[ ! "$output" =~ "build/out.md" ]]
+}
+
+@test "TC8: --no-lint and a missing markdownlint-cli2 check README rules only" {
+  run python3 "$SCRIPT" "$REPO" --no-lint
+  [ "$(lint_runs)" -eq 0 ]
+  [[ ! "$output" =~ "docs/guide.md" ]]
+  [[ "$output" =~ "(markdownlint-cli2 not run)" ]]
+  PATH="$ORIG_PATH" run python3 "$SCRIPT" "$REPO"
+  [ "$status" -eq 1 ]
+  [[ "$output" =~ "FAIL  plugin-a/README.md" ]]
+  [[ "$output" =~ "(markdownlint-cli2 not run)" ]]
+}
+
+@test "TC9: --since outside a git work tree is a usage error" {
+  mkdir -p "$WORK_DIR/plain"
+  run python3 "$SCRIPT" "$WORK_DIR/plain" --since HEAD
+  [ "$status" -eq 2 ]
+}
+
+@test "TC10: README results are kept in the index shared with the hook" {
+  python3 "$SCRIPT" "$REPO" --no-lint >/dev/null 2>&1 || true
+  INDEX="$REPO_ROOT/content-guards/scripts/readme_index.py"
+
+  run python3 "$INDEX" failing "$REPO"
+  [ "$status" -eq 1 ]
+  [[ "$output" =~ "plugin-a/README.md" ]]
+  [[ ! "$output" =~ "plugin-b/README.md" ]]
+
+  # Fixing the README through the hook updates the index
+  printf '# A\n\n## Installation\n\n```bash\nmake\n```\n\n## Usage\n\nRun.\n' > "$REPO/plugin-a/README.md"
+  echo "{\"tool_input\":{\"file_path\":\"$REPO/plugin-a/README.md\"}}" \
+    | python3 "$REPO_ROOT/content-guards/scripts/validate-readme.py" 2>/dev/null
+  run python3 "$INDEX" failing "$REPO"
+  [ "$status" -eq 0 ]
+
+  # A deleted README drops out on the next full scan
+  git -C "$REPO" rm -q plugin-b/README.md
+  python3 "$SCRIPT" "$REPO" --no-lint >/dev/null 2>&1 || true
+  [ "$(jq '.entries | keys | length' "$CONTENT_GUARDS_CACHE_DIR"/readme-index/*.json)" -eq 2 ]
+}
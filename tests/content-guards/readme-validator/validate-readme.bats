@@ -9,6 +9,9 @@ setup() {
   REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
   SCRIPT="$REPO_ROOT/content-guards/scripts/validate-readme.py"
   FIXTURES="$(dirname "$BATS_TEST_FILENAME")/fixtures"
+  WORK_DIR="$(mktemp -d)"
+  # Isolate the validation result cache
+  export CONTENT_GUARDS_CACHE_DIR="$WORK_DIR/cache"
 
   if [[ ! -f "$SCRIPT" ]]; then
     echo "ERROR: Script not found at $SCRIPT" >&2
@@ -16,6 +19,10 @@ setup() {
   fi
 }
 
+teardown() {
+  rm -rf "$WORK_DIR"
+}
+
 run_hook() {
   run python3 "$SCRIPT" <<< "$1"
 }
@@ -92,3 +99,48 @@ run_hook() {
   run_hook '{"tool_input":{"file_path":"/tmp/README-ADVANCED.md"}}'
   [ "$status" -eq 0 ]
 }
+
+# ---------------------------------------------------------------------------
+# TC7: Outline parsing ignores headings inside code fences
+# ---------------------------------------------------------------------------
+
+@test "TC7: '# Usage' inside a code fence is not a Usage section" {
+  printf '# Tool\n\n## Installation\n\n```bash\n# Usage\nmake install\n```\n' > "$WORK_DIR/README.md"
+  run_hook '{"tool_input":{"file_path":"'"$WORK_DIR/README.md"'"}}'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "Missing required sections: Usage" ]]
+}
+
+@test "TC7b: code block in an Installation subsection counts" {
+  printf '# Tool\n\n## Installation\n\n### From source\n\n~~~\nmake install\n~~~\n\n## Usage\n\nRun it.\n' > "$WORK_DIR/README.md"
+  run_hook '{"tool_input":{"file_path":"'"$WORK_DIR/README.md"'"}}'
+  [ "$status" -eq 0 ]
+  [[ ! "$output" =~ "no code blocks" ]]
+}
+
+# ---------------------------------------------------------------------------
+# TC8: Results are cached by content and config
+# ---------------------------------------------------------------------------
+
+@test "TC8: unchanged README reuses the cached result" {
+  cp "$FIXTURES/README-missing-sections.md" "$WORK_DIR/README.md"
+  run_hook '{"tool_input":{"file_path":"'"$WORK_DIR/README.md"'"}}'
+  [ "$status" -eq 2 ]
+  ls "$CONTENT_GUARDS_CACHE_DIR"/readme-index/*.json
+  [ ! -e "$CONTENT_GUARDS_CACHE_DIR/readme-results.json" ] # The index is the only cache
+  local first
+  first="$output"
+  run_hook '{"tool_input":{"file_path":"'"$WORK_DIR/README.md"'"}}'
+  [ "$status" -eq 2 ]
+  [ "$output" = "$first" ]
+}
+
+@test "TC8b: a config change is not served a stale cached result" {
+  printf '# Tool\n\n## Usage\n\nRun it.\n' > "$WORK_DIR/README.md"
+  printf 'required_sections:\n  - Usage\n  - License\n' > "$WORK_DIR/.readme-validator.yaml"
+  run_hook '{"tool_input":{"file_path":"'"$WORK_DIR/README.md"'"}}'
+  [ "$status" -eq 2 ]
+  printf 'required_sections:\n  - Usage\n' > "$WORK_DIR/.readme-validator.yaml"
+  run_hook '{"tool_input":{"file_path":"'"$WORK_DIR/README.md"'"}}'
+  [ "$status" -eq 0 ]
+}
@@ -0,0 +1,169 @@
+#!/usr/bin/env bats
+# Test suite for directory_limits in .token-limits.yaml
+#
+# Covers the hook's incremental directory budget check (token_index.py) and
+# the scanner's budget report. atc is mocked with a counter reporting one
+# token per 4 bytes and logging each call, so tests can assert that other
+# files in a budgeted directory are never re-tokenized.
+#
+# Run with: bats tests/content-guards/token-limits/directory-budgets.bats
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  HOOK="$REPO_ROOT/content-guards/scripts/validate-token-limits.py"
+  SCAN="$REPO_ROOT/content-guards/scripts/scan-token-limits.py"
+  FAKE_BIN_DIR="$(mktemp -d)"
+  CONTENT_GUARDS_CACHE_DIR="$(mktemp -d)"
+  PROJECT="$(mktemp -d)"
+  export FAKE_BIN_DIR CONTENT_GUARDS_CACHE_DIR
+  export PATH="$FAKE_BIN_DIR:$PATH"
+
+  cat > "$FAKE_BIN_DIR/atc" <<'EOF'
+#!/usr/bin/env bash
+echo call >> "$FAKE_BIN_DIR/calls"
+echo "$(( $(wc -c) / 4 )) tokens"
+EOF
+  chmod +x "$FAKE_BIN_DIR/atc"
+
+  # skills/ may hold 1000 tokens in total; each file keeps the default limit
+  mkdir -p "$PROJECT/skills/a" "$PROJECT/other"
+  cat > "$PROJECT/.token-limits.yaml" <<'EOF'
+directory_limits:
+  "*/skills": 1000
+EOF
+  cd "$PROJECT"
+}
+
+teardown() {
+  cd /
+  rm -rf "$FAKE_BIN_DIR" "$CONTENT_GUARDS_CACHE_DIR" "$PROJECT"
+}
+
+# Write N bytes to a file on disk.
+# Usage: fill <path> <bytes>
+fill() {
+  head -c "$2" /dev/zero | tr '\0' 'x' > "$1"
+}
+
+# Run the hook for a Write of N bytes to path.
+# Usage: hook_write <path> <bytes>
+hook_write() {
+  local content
+  content="$(head -c "$2" /dev/zero | tr '\0' 'y')"
+  run python3 "$HOOK" <<< "{\"tool_name\":\"Write\",\"tool_input\":{\"file_path\":\"$1\",\"content\":\"$content\"}}"
+}
+
+# Run the hook for an Edit replacing old with new in path.
+# Usage: hook_edit <path> <old> <new>
+hook_edit() {
+  run python3 "$HOOK" <<< "{\"tool_name\":\"Edit\",\"tool_input\":{\"file_path\":\"$1\",\"old_string\":\"$2\",\"new_string\":\"$3\"}}"
+}
+
+calls() {
+  [[ -f "$FAKE_BIN_DIR/calls" ]] && wc -l < "$FAKE_BIN_DIR/calls" || echo 0
+}
+
+@test "TC1: write that keeps the directory within budget is allowed" {
+  fill "$PROJECT/skills/a/one.md" 2000 # 500 tokens
+  python3 "$SCAN" "$PROJECT" > /dev/null || true
+  hook_write "$PROJECT/skills/two.md" 1600 # 400 tokens -> 900
+  [ "$status" -eq 0 ]
+}
+
+@test "TC2: write that pushes the directory over budget is blocked" {
+  fill "$PROJECT/skills/a/one.md" 2000
+  python3 "$SCAN" "$PROJECT" > /dev/null || true
+  hook_write "$PROJECT/skills/two.md" 2400 # 600 tokens -> 1100
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "Directory token budget exceeded: $PROJECT/skills" ]]
+  [[ "$output" =~ "Tokens: 1100 (budget: 1000, excess: +100)" ]]
+}
+
+@test "TC3: files outside budgeted directories are not affected" {
+  fill "$PROJECT/skills/a/one.md" 4000 # directory already at 1000
+  python3 "$SCAN" "$PROJECT" > /dev/null || true
+  hook_write "$PROJECT/other/big.md" 4000
+  [ "$status" -eq 0 ]
+}
+
+@test "TC4: other files in the directory are not re-tokenized" {
+  for i in 1 2 3 4 5; do fill "$PROJECT/skills/a/f$i.md" $((100 + i)); done
+  python3 "$SCAN" "$PROJECT" > /dev/null || true
+  rm -f "$FAKE_BIN_DIR/calls"
+  hook_write "$PROJECT/skills/new.md" 2400
+  [ "$status" -eq 0 ]
+  [ "$(calls)" -eq 1 ]
+}
+
+@test "TC5: rewriting a file replaces its entry instead of adding to it" {
+  python3 "$SCAN" "$PROJECT" > /dev/null || true
+  hook_write "$PROJECT/skills/doc.md" 3200 # 800 tokens
+  [ "$status" -eq 0 ]
+  hook_write "$PROJECT/skills/doc.md" 3600 # 900 tokens, not 1700
+  [ "$status" -eq 0 ]
+}
+
+@test "TC6: files deleted outside the hook are dropped before blocking" {
+  fill "$PROJECT/skills/a/old.md" 3200
+  python3 "$SCAN" "$PROJECT" > /dev/null || true
+  rm "$PROJECT/skills/a/old.md"
+  hook_write "$PROJECT/skills/new.md" 2400
+  [ "$status" -eq 0 ]
+}
+
+@test "TC7: cold start seeds the index from cached counts without counting" {
+  fill "$PROJECT/skills/a/one.md" 2000
+  hook_write "$PROJECT/skills/two.md" 2400
+  [ "$status" -eq 0 ] # one.md was never counted, so it is not charged
+}
+
+@test "TC7a: the cold-start seed reads a bounded number of files" {
+  fill "$PROJECT/skills/a/one.md" 4 # 1 token, cached by the scan
+  python3 "$SCAN" "$PROJECT" > /dev/null || true
+  rm -rf "$CONTENT_GUARDS_CACHE_DIR/token-index"
+  local i
+  for i in $(seq 2 600); do cp "$PROJECT/skills/a/one.md" "$PROJECT/skills/a/$i.md"; done
+  # Seeding all 600 cached files would make this 1100 tokens
+  hook_write "$PROJECT/skills/two.md" 2000
+  [ "$status" -eq 0 ]
+}
+
+@test "TC7b: recorded writes that never happened are not charged" {
+  fill "$PROJECT/skills/doc.md" 400 # 100 tokens
+  python3 "$SCAN" "$PROJECT" > /dev/null || true
+  hook_write "$PROJECT/skills/doc.md" 3200 # recorded; denied by another hook
+  [ "$status" -eq 0 ]
+  hook_write "$PROJECT/skills/gone.md" 400 # recorded, never created
+  [ "$status" -eq 0 ]
+  hook_write "$PROJECT/skills/new.md" 2400 # 100 + 600 on disk
+  [ "$status" -eq 0 ]
+}
+
+@test "TC7c: files changed after the hook recorded them are recounted" {
+  python3 "$SCAN" "$PROJECT" > /dev/null || true
+  hook_write "$PROJECT/skills/doc.md" 3200 # 800 tokens recorded
+  [ "$status" -eq 0 ]
+  fill "$PROJECT/skills/doc.md" 400 # but only 100 tokens on disk
+  hook_write "$PROJECT/skills/new.md" 2400
+  [ "$status" -eq 0 ]
+}
+
+@test "TC7d: an Edit is charged for the file as it will be after the edit" {
+  fill "$PROJECT/skills/a/one.md" 2000
+  printf 'head\n' > "$PROJECT/skills/doc.md"
+  python3 "$SCAN" "$PROJECT" > /dev/null || true
+  hook_edit "$PROJECT/skills/doc.md" "head" "$(head -c 2400 /dev/zero | tr '\0' 'y')"
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "Directory token budget exceeded: $PROJECT/skills" ]]
+  hook_edit "$PROJECT/skills/doc.md" "head" "$(head -c 1600 /dev/zero | tr '\0' 'y')"
+  [ "$status" -eq 0 ]
+}
+
+@test "TC8: scanner reports directories over budget and exits 1" {
+  fill "$PROJECT/skills/a/one.md" 2400
+  fill "$PROJECT/skills/two.md" 2400
+  run python3 "$SCAN" "$PROJECT"
+  [ "$status" -eq 1 ]
+  [[ "$output" =~ "Directory budget violations (1):" ]]
+  [[ "$output" =~ "skills/  1200/1000 (+200)" ]]
+}
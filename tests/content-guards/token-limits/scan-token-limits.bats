@@ -0,0 +1,106 @@
+#!/usr/bin/env bats
+# Test suite for content-guards/scripts/scan-token-limits.py
+#
+# Tests repo-wide scanning, .gitignore and .token-limits.yaml handling,
+# per-directory totals, and the --since incremental mode.
+#
+# atc is mocked with a fake that reports one token per 4 bytes of input.
+#
+# Run with: bats tests/content-guards/token-limits/scan-token-limits.bats
+
+load '../../helpers/git'
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  SCRIPT="$REPO_ROOT/content-guards/scripts/scan-token-limits.py"
+  FAKE_BIN_DIR="$(mktemp -d)"
+  CONTENT_GUARDS_CACHE_DIR="$(mktemp -d)"
+  WORK_DIR="$(mktemp -d)"
+  REPO="$WORK_DIR/repo"
+
+  cat > "$FAKE_BIN_DIR/atc" <<'FAKEOF'
+#!/usr/bin/env bash
+echo "$(( $(wc -c) / 4 )) tokens"
+FAKEOF
+  chmod +x "$FAKE_BIN_DIR/atc"
+
+  export PATH="$FAKE_BIN_DIR:$PATH" CONTENT_GUARDS_CACHE_DIR
+
+  make_repo "$REPO" >/dev/null
+  mkdir -p "$REPO/docs" "$REPO/skills/a"
+  head -c 400 /dev/zero | tr '\0' 'a' > "$REPO/docs/small.md"     # 100 tokens
+  head -c 12000 /dev/zero | tr '\0' 'b' > "$REPO/docs/big.md"     # 3000 tokens
+  head -c 800 /dev/zero | tr '\0' 'c' > "$REPO/skills/a/SKILL.md" # 200 tokens
+  git -C "$REPO" add -A
+  git -C "$REPO" commit -q -m "docs"
+}
+
+teardown() {
+  rm -rf "$FAKE_BIN_DIR" "$CONTENT_GUARDS_CACHE_DIR" "$WORK_DIR"
+}
+
+@test "TC1: reports files over the default limit and exits 1" {
+  run python3 "$SCRIPT" "$REPO"
+  [ "$status" -eq 1 ]
+  [[ "$output" =~ "docs/big.md  3000/2000 (+1000)" ]]
+  [[ ! "$output" =~ "docs/small.md  " ]]
+}
+
+@test "TC2: .token-limits.yaml raises the limit for matching files" {
+  printf 'limits:\n  "*/docs/*": 5000\n' > "$REPO/.token-limits.yaml"
+  run python3 "$SCRIPT" "$REPO"
+  [ "$status" -eq 0 ]
+  [[ "$output" =~ "0 over limit" ]]
+}
+
+@test "TC3: .gitignore'd files are not scanned" {
+  head -c 40000 /dev/zero | tr '\0' 'd' > "$REPO/docs/generated.md"
+  echo "docs/generated.md" > "$REPO/.gitignore"
+  run python3 "$SCRIPT" "$REPO" --json
+  [[ ! "$output" =~ "generated.md" ]]
+}
+
+@test "TC4: per-directory report totals nested files" {
+  python3 "$SCRIPT" "$REPO" --json > "$WORK_DIR/report.json" || true
+  python3 - "$WORK_DIR/report.json" <<'PYEOF'
+import json, sys
+report = json.load(open(sys.argv[1]))
+dirs = {d["directory"]: d for d in report["directories"]}
+assert dirs["docs"]["tokens"] == 3100, dirs["docs"]
+assert dirs["docs"]["violations"] == 1, dirs["docs"]
+assert dirs["skills"]["tokens"] == 200, dirs["skills"]
+assert dirs["skills/a"]["files"] == 1, dirs["skills/a"]
+PYEOF
+}
+
+@test "TC5: --since only recounts files changed since the ref" {
+  head -c 40 /dev/zero | tr '\0' 'e' >> "$REPO/docs/small.md"
+  head -c 40 /dev/zero | tr '\0' 'f' > "$REPO/docs/new.md"
+  run python3 "$SCRIPT" "$REPO" --since HEAD --json
+  [ "$status" -eq 0 ]
+  [[ "$output" =~ "docs/small.md" ]]
+  [[ "$output" =~ "docs/new.md" ]]
+  [[ ! "$output" =~ "docs/big.md" ]]
+  [[ ! "$output" =~ "SKILL.md" ]]
+  # Totals of the changed files alone would understate every directory
+  [[ "$output" =~ '"incremental": true' ]]
+  [[ "$output" =~ '"directories": []' ]]
+  run python3 "$SCRIPT" "$REPO" --since HEAD
+  [[ "$output" =~ "Incremental scan of files changed since HEAD" ]]
+  [[ ! "$output" =~ "Directories by total tokens" ]]
+}
+
+@test "TC6: --since outside a git work tree is a usage error" {
+  mkdir -p "$WORK_DIR/plain"
+  run python3 "$SCRIPT" "$WORK_DIR/plain" --since HEAD
+  [ "$status" -eq 2 ]
+}
+
+@test "TC7: counts are served from the content-hash cache on rescan" {
+  run python3 "$SCRIPT" "$REPO"
+  # Break the counter; cached counts must still produce the same report
+  printf '#!/usr/bin/env bash\nexit 1\n' > "$FAKE_BIN_DIR/atc"
+  run python3 "$SCRIPT" "$REPO"
+  [ "$status" -eq 1 ]
+  [[ "$output" =~ "docs/big.md  3000/2000" ]]
+}
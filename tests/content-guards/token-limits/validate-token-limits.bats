@@ -13,18 +13,20 @@ setup() {
   REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
   SCRIPT="$REPO_ROOT/content-guards/scripts/validate-token-limits.py"
   FAKE_BIN_DIR="$(mktemp -d)"
+  # Isolate the content-hash token cache so counts never leak between tests
+  CONTENT_GUARDS_CACHE_DIR="$(mktemp -d)"
 
   if [[ ! -f "$SCRIPT" ]]; then
     echo "ERROR: Script not found at $SCRIPT" >&2
     return 1
   fi
 
-  export FAKE_BIN_DIR
+  export FAKE_BIN_DIR CONTENT_GUARDS_CACHE_DIR
   export PATH="$FAKE_BIN_DIR:$PATH"
 }
 
 teardown() {
-  rm -rf "$FAKE_BIN_DIR"
+  rm -rf "$FAKE_BIN_DIR" "$CONTENT_GUARDS_CACHE_DIR"
 }
 
 # Install a fake atc that emits a specific token count on stdout.
@@ -38,6 +40,26 @@ EOF
   chmod +x "$FAKE_BIN_DIR/atc"
 }
 
+# Install a fake atc that reports one token per N bytes of input (default 4)
+# and logs each invocation to $FAKE_BIN_DIR/calls.
+# Usage: install_counting_atc [bytes_per_token]
+install_counting_atc() {
+  cat > "$FAKE_BIN_DIR/atc" <<EOF
+#!/usr/bin/env bash
+echo call >> "\$FAKE_BIN_DIR/calls"
+echo "\$(( \$(wc -c) / ${1:-4} )) tokens"
+EOF
+  chmod +x "$FAKE_BIN_DIR/atc"
+}
+
+# Print a Write hook payload whose content is N repeated characters.
+# Usage: write_payload <file_path> <bytes>
+write_payload() {
+  local content
+  content="$(head -c "$2" /dev/zero | tr '\0' 'x')"
+  printf '{"tool_name":"Write","tool_input":{"file_path":"%s","content":"%s"}}' "$1" "$content"
+}
+
 run_hook() {
   run python3 "$SCRIPT" <<< "$1"
 }
@@ -126,7 +148,7 @@ run_hook() {
 
 @test "TC6: Write blocked when token count exceeds 2000" {
   install_fake_atc 2001
-  run_hook '{"tool_name":"Write","tool_input":{"file_path":"/some/big.py","content":"x = 1"}}'
+  run_hook "$(write_payload /some/big.py 2500)"
   [ "$status" -eq 2 ]
   [[ "$output" =~ "Token limit violation" ]]
   [[ "$output" =~ "big.py" ]]
@@ -134,8 +156,108 @@ run_hook() {
 
 @test "TC6b: block message includes token count and limit values" {
   install_fake_atc 3000
-  run_hook '{"tool_name":"Write","tool_input":{"file_path":"/some/large.py","content":"x = 1"}}'
+  run_hook "$(write_payload /some/large.py 2500)"
   [ "$status" -eq 2 ]
   [[ "$output" =~ "3000" ]]
   [[ "$output" =~ "2000" ]]
 }
+
+# ---------------------------------------------------------------------------
+# TC7: Token counts are cached by content hash
+# ---------------------------------------------------------------------------
+
+@test "TC7: identical content is counted once and served from the cache" {
+  install_fake_atc 3000
+  run_hook "$(write_payload /some/a.py 2500)"
+  [ "$status" -eq 2 ]
+
+  # Counter now disagrees; the cached count for the same content still applies
+  install_fake_atc 10
+  run_hook "$(write_payload /some/b.py 2500)"
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "3000" ]]
+}
+
+# ---------------------------------------------------------------------------
+# TC8: Byte-length upper bound skips counting for small content
+# ---------------------------------------------------------------------------
+
+@test "TC8: content with no more bytes than the limit is never counted" {
+  install_counting_atc
+  run_hook "$(write_payload /some/small.py 2000)"
+  [ "$status" -eq 0 ]
+  [ ! -f "$FAKE_BIN_DIR/calls" ]
+}
+
+# ---------------------------------------------------------------------------
+# TC9: Streaming count stops once the limit is exceeded
+# ---------------------------------------------------------------------------
+
+@test "TC9: oversized payload is rejected after counting only limit-sized chunks" {
+  install_counting_atc
+  # 200 KB at 4 bytes/token = 50000 tokens; chunks are 16000 bytes (4000
+  # tokens), so the first chunk alone passes the limit
+  run_hook "$(write_payload /some/huge.py 200000)"
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "Token limit violation" ]]
+  [[ "$output" =~ "4000+" ]]
+  [ "$(wc -l < "$FAKE_BIN_DIR/calls")" -eq 1 ]
+}
+
+@test "TC9b: payload just over the limit gets an exact count" {
+  install_counting_atc
+  run_hook "$(write_payload /some/edge.py 8004)"
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "Tokens: 2001 " ]]
+}
+
+@test "TC9c: large payload within the limit is not recounted as a whole" {
+  install_counting_atc 16
+  # 24000 bytes at 16 bytes/token = 1500 tokens: two chunks (16000 + 8000
+  # bytes) settle it, with no exact count of the full payload afterwards
+  run_hook "$(write_payload /some/long.py 24000)"
+  [ "$status" -eq 0 ]
+  [ "$(wc -l < "$FAKE_BIN_DIR/calls")" -eq 2 ]
+}
+
+@test "TC9d: atc's per-call overhead is charged once, not once per chunk" {
+  # 500 tokens per call plus one per 16 bytes: 22400 bytes is 1900 tokens,
+  # but its two chunks sum to 2400
+  cat > "$FAKE_BIN_DIR/atc" <<'EOF'
+#!/usr/bin/env bash
+echo "$(( $(wc -c) / 16 + 500 )) tokens"
+EOF
+  chmod +x "$FAKE_BIN_DIR/atc"
+  run_hook "$(write_payload /some/overhead.py 22400)"
+  [ "$status" -eq 0 ]
+  # 40000 bytes is 3000 tokens; a streamed verdict reports no more than that
+  run_hook "$(write_payload /some/overhead.py 40000)"
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ Tokens:\ ([0-9]+)\+ ]]
+  [ "${BASH_REMATCH[1]}" -le 3000 ]
+}
+
+# ---------------------------------------------------------------------------
+# TC10: Edits are checked against directory budgets only
+# ---------------------------------------------------------------------------
+
+@test "TC10: Edit that grows a file past the per-file limit is not counted" {
+  install_counting_atc
+  file="$FAKE_BIN_DIR/grow.py"
+  head -c 6000 /dev/zero | tr '\0' 'x' > "$file"
+  printf 'marker\n' >> "$file"
+  long="$(head -c 4000 /dev/zero | tr '\0' 'y')"
+  run_hook '{"tool_name":"Edit","tool_input":{"file_path":"'"$file"'","old_string":"marker","new_string":"'"$long"'"}}'
+  [ "$status" -eq 0 ]
+  [ ! -f "$FAKE_BIN_DIR/calls" ]
+}
+
+@test "TC10b: Edit that does not lengthen an oversized file is allowed uncounted" {
+  install_counting_atc
+  file="$FAKE_BIN_DIR/over.py"
+  head -c 12000 /dev/zero | tr '\0' 'x' > "$file"
+  printf 'marker\n' >> "$file"
+  run_hook '{"tool_name":"Edit","tool_input":{"file_path":"'"$file"'","old_string":"marker","new_string":"m"}}'
+  [ "$status" -eq 0 ]
+  [ ! -f "$FAKE_BIN_DIR/calls" ]
+}
@@ -1,7 +1,8 @@
 #!/usr/bin/env bats
 # Test suite for content-guards/scripts/webfetch-guard.py
 #
-# Tests tool name filtering, blocked year detection, and current year warnings.
+# Tests tool name filtering, blocked year detection, current year warnings,
+# and the URL policy stage (.url-policy.yaml).
 # Blocked years are computed dynamically relative to the current date to match
 # the grace-period logic in the script (Jan-Mar: block 2+ years ago;
 # Apr-Dec: block 1+ years ago).
@@ -20,6 +21,29 @@ setup() {
   # Compute years relative to current date (mirrors the script's logic)
   CURRENT_YEAR=$(python3 -c "from datetime import datetime; print(datetime.now().year)")
   BLOCKED_YEAR=$(python3 -c "from datetime import datetime; now=datetime.now(); print(now.year - 2)")
+
+  WORK_DIR="$(mktemp -d)"
+  export CONTENT_GUARDS_CACHE_DIR="$WORK_DIR/cache"
+  POLICY_DIR="$WORK_DIR/project"
+  mkdir -p "$POLICY_DIR"
+  cat > "$POLICY_DIR/.url-policy.yaml" <<'EOF'
+deny:
+  farm.example: Low-quality content farm
+  example.com/blog: ""
+allow:
+  - mirror.farm.example
+warn:
+  docs.old.example: Use docs.new.example instead
+EOF
+}
+
+teardown() {
+  rm -rf "$WORK_DIR"
+}
+
+# fetch URL [PROMPT]: WebFetch from inside the policy's project
+fetch() {
+  run_hook '{"tool_name":"WebFetch","cwd":"'"$POLICY_DIR"'","tool_input":{"url":"'"$1"'","prompt":"'"${2:-summarize}"'"}}'
 }
 
 run_hook() {
@@ -124,3 +148,65 @@ run_hook() {
   [ "$status" -eq 0 ]
   [[ ! "$output" =~ "deny" ]]
 }
+
+# ---------------------------------------------------------------------------
+# TC9: URL policy stage
+# ---------------------------------------------------------------------------
+
+@test "TC9: denied domain and its subdomains are blocked with the rule's message" {
+  fetch "https://www.farm.example/top-10"
+  [ "$status" -eq 0 ]
+  [[ "$output" =~ "deny" ]]
+  [[ "$output" =~ "farm.example" ]]
+  [[ "$output" =~ "Low-quality content farm" ]]
+}
+
+@test "TC9b: a more specific allow rule overrides a domain deny" {
+  fetch "https://mirror.farm.example/pkg"
+  [ "$status" -eq 0 ]
+  [[ ! "$output" =~ "permissionDecision" ]]
+}
+
+@test "TC9c: path prefix rules match whole segments only" {
+  fetch "https://example.com/blog/post"
+  [[ "$output" =~ "deny" ]]
+  fetch "https://example.com/blogroll"
+  [[ ! "$output" =~ "permissionDecision" ]]
+}
+
+@test "TC9d: warn rules allow with a message, combined with year warnings" {
+  fetch "https://docs.old.example/guide" "changes in $CURRENT_YEAR"
+  [[ "$output" =~ '"permissionDecision": "allow"' ]]
+  [[ "$output" =~ "Use docs.new.example instead" ]]
+  [[ "$output" =~ "current year" ]]
+}
+
+@test "TC9e: WebSearch site: operators are checked against the policy" {
+  run_hook '{"tool_name":"WebSearch","cwd":"'"$POLICY_DIR"'","tool_input":{"query":"best laptops site:farm.example"}}'
+  [[ "$output" =~ "deny" ]]
+  [[ "$output" =~ "farm.example" ]]
+}
+
+@test "TC9e2: WebSearch -site: exclusions of denied domains are allowed" {
+  run_hook '{"tool_name":"WebSearch","cwd":"'"$POLICY_DIR"'","tool_input":{"query":"python tips -site:farm.example"}}'
+  [ "$status" -eq 0 ]
+  [[ ! "$output" =~ "permissionDecision" ]]
+}
+
+@test "TC9e3: percent-escaped hosts are matched against the policy" {
+  fetch "https://%66arm.example/top-10"
+  [[ "$output" =~ "deny" ]]
+  [[ "$output" =~ "Low-quality content farm" ]]
+}
+
+@test "TC9f: the year stage still blocks URLs the policy allows" {
+  fetch "https://mirror.farm.example/$BLOCKED_YEAR/notes"
+  [[ "$output" =~ "deny" ]]
+  [[ "$output" =~ "outdated" ]]
+}
+
+@test "TC9g: without a policy file only the year stage runs" {
+  run_hook '{"tool_name":"WebFetch","cwd":"'"$WORK_DIR"'","tool_input":{"url":"https://farm.example/","prompt":"x"}}'
+  [ "$status" -eq 0 ]
+  [[ ! "$output" =~ "permissionDecision" ]]
+}
@@ -0,0 +1,19 @@
+# Shared BATS helper that counts the external commands a hook runs.
+# Usage: load '../../helpers/child-log'
+#
+# log_children <bin_dir> <log> cmd... writes wrappers for the given commands
+# to <bin_dir>; each invocation appends the command's name to <log> and then
+# runs the real command. Put <bin_dir> first in PATH for the hook only, so
+# the test's own commands are not counted.
+
+log_children() {
+  local bin_dir="$1" log="$2" cmd real
+  shift 2
+  mkdir -p "$bin_dir"
+  : > "$log"
+  for cmd in "$@"; do
+    real="$(command -v "$cmd")" || continue
+    printf '#!/bin/sh\necho %s >> "%s"\nexec "%s" "$@"\n' "$cmd" "$log" "$real" > "$bin_dir/$cmd"
+    chmod +x "$bin_dir/$cmd"
+  done
+}
@@ -0,0 +1,10 @@
+#!/usr/bin/env node
+// CLI entry point of the fake markdownlint-cli2 package
+import { main } from "./markdownlint-cli2.mjs";
+
+process.exitCode = await main({
+  directory: process.cwd(),
+  argv: process.argv.slice(2),
+  logMessage: console.log,
+  logError: console.error,
+});
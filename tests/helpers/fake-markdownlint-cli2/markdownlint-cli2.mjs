@@ -0,0 +1,52 @@
+// Offline stand-in for markdownlint-cli2's module API, for hook tests.
+//
+// main() lints the files named in argv relative to directory, plus any
+// nonFileContents: a file containing "BAD_LINT" is an error (exit 1)
+// unless optionsOverride disables the rule. Every call appends the
+// serving process id to $FAKE_MDL_LOG so tests can tell the persistent
+// worker (same pid each call) from CLI runs (new pid each call), and the
+// number of lines linted to $FAKE_MDL_LINES_LOG when set.
+
+import fs from "node:fs";
+import path from "node:path";
+
+export async function main({
+  directory,
+  argv,
+  nonFileContents,
+  optionsOverride,
+  logMessage,
+  logError,
+}) {
+  if (process.env.FAKE_MDL_LOG) {
+    fs.appendFileSync(process.env.FAKE_MDL_LOG, `${process.pid}\n`);
+  }
+  const files = [];
+  for (let i = 0; i < argv.length; i++) {
+    if (argv[i] === "--config") {
+      i++;
+    } else if (!argv[i].startsWith("--")) {
+      files.push(argv[i]);
+    }
+  }
+  const sources = files.map((file) => [
+    file,
+    fs.readFileSync(path.resolve(directory, file), "utf8"),
+  ]);
+  sources.push(...Object.entries(nonFileContents || {}));
+  const enabled = optionsOverride?.config?.MD999 !== false;
+  let code = 0;
+  let lines = 0;
+  for (const [name, text] of sources) {
+    lines += text.split("\n").length;
+    if (enabled && text.includes("BAD_LINT")) {
+      logError(`${name}:1 MD999/fake-rule BAD_LINT marker found`);
+      code = 1;
+    }
+  }
+  if (process.env.FAKE_MDL_LINES_LOG) {
+    fs.appendFileSync(process.env.FAKE_MDL_LINES_LOG, `${lines}\n`);
+  }
+  logMessage(`Summary: ${code} error(s)`);
+  return code;
+}
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the `gh` CLI, backed by a JSON fixture store.
+
+Answers the calls the limit guards make, with the same output shapes:
+
+  gh issue|pr list --state open|all [--author @me] --json F1,F2 --limit N
+  gh api graphql -f query=... -F owner=... -F name=... [-F recent=...] [-f cursor=...]
+    (the enforce-issue-limits snapshot, title-index page and recent-search
+    queries)
+
+Store (see gh_fixtures.py): {"viewer": "me", "issues": [...], "prs": [...]},
+items being {number, title, state, labels, author, createdAt, updatedAt}.
+
+Environment:
+  FAKE_GH_STORE    fixture store path (required)
+  FAKE_GH_LATENCY  seconds to sleep before answering (default 0)
+  FAKE_GH_FAIL     fail calls of this kind: "graphql", "list" or "all"
+  FAKE_GH_LOG      append one line per call (its argv) to this file
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+
+def _fail(message: str) -> None:
+    print(message, file=sys.stderr)
+    sys.exit(1)
+
+
+def _fields(argv: list[str]) -> dict[str, str]:
+    """-f/-F/--field/--raw-field key=value pairs."""
+    fields = {}
+    for flag, value in zip(argv, argv[1:]):
+        if flag in ("-f", "-F", "--field", "--raw-field") and "=" in value:
+            key, _, val = value.partition("=")
+            fields[key] = val
+    return fields
+
+
+def _flag(argv: list[str], name: str, default: str | None = None) -> str | None:
+    for flag, value in zip(argv, argv[1:]):
+        if flag == name:
+            return value
+    return default
+
+
+def _open(items: list[dict]) -> list[dict]:
+    return [i for i in items if i["state"] == "OPEN"]
+
+
+def _node(item: dict) -> dict:
+    return {k: item[k] for k in ("number", "title", "state", "updatedAt")}
+
+
+def _by_updated(items: list[dict]) -> list[dict]:
+    return sorted(items, key=lambda i: i["updatedAt"], reverse=True)
+
+
+def _graphql(store: dict, fields: dict[str, str]) -> dict:
+    query = fields.get("query", "")
+    kind = "prs" if "pullRequests(" in query else "issues"
+    items = store[kind]
+    if "pageInfo" in query:  # Title-index page of open items
+        start = int(fields.get("cursor") or 0)
+        page = _by_updated(_open(items))[start:start + 100]
+        more = start + 100 < len(_open(items))
+        return {"data": {"repository": {"page": {
+            "nodes": [_node(i) for i in page],
+            "pageInfo": {"hasNextPage": more, "endCursor": str(start + 100) if more else None},
+        }}}}
+
+    label = re.search(r'labels: \["([^"]+)"\]', query)
+    repo = {
+        "open": {
+            "totalCount": len(_open(items)),
+            "nodes": [
+                {"number": i["number"], "title": i["title"]}
+                for i in sorted(_open(items), key=lambda i: i["createdAt"], reverse=True)[:100]
+            ],
+        },
+        "ai": {"totalCount": sum(
+            1 for i in _open(items) if label and label.group(1) in i["labels"]
+        )},
+        "updated": {"nodes": [_node(i) for i in _by_updated(items)[:100]]},
+    }
+    data: dict = {"repository": repo}
+    if "recent" in fields:
+        since = re.search(r"created:>=(\S+)", fields["recent"])
+        kind = "prs" if "is:pr" in fields["recent"] else "issues"
+        mine = sorted(
+            (i for i in store[kind]
+             if i["author"] == store["viewer"] and since and i["createdAt"] >= since.group(1)),
+            key=lambda i: i["createdAt"], reverse=True,
+        )
+        data["recent"] = {
+            "issueCount": len(mine),
+            "nodes": [{"createdAt": i["createdAt"]} for i in mine[:100]],
+        }
+    return {"data": data}
+
+
+def _list(store: dict, kind: str, argv: list[str]) -> list[dict]:
+    items = store[kind]
+    if _flag(argv, "--state", "open") == "open":
+        items = _open(items)
+    if _flag(argv, "--author") == "@me":
+        items = [i for i in items if i["author"] == store["viewer"]]
+    items = sorted(items, key=lambda i: i["number"], reverse=True)
+    items = items[:int(_flag(argv, "--limit", "30") or 30)]
+    wanted = (_flag(argv, "--json") or "number").split(",")
+    out = []
+    for item in items:
+        row = {k: item[k] for k in wanted if k in item and k != "labels"}
+        if "labels" in wanted:
+            row["labels"] = [{"name": name} for name in item["labels"]]
+        out.append(row)
+    return out
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    if os.environ.get("FAKE_GH_LOG"):
+        with open(os.environ["FAKE_GH_LOG"], "a", encoding="utf-8") as f:
+            f.write(" ".join(argv).replace("\n", " ") + "\n")
+    time.sleep(float(os.environ.get("FAKE_GH_LATENCY", "0")))
+
+    kind = "graphql" if argv[:2] == ["api", "graphql"] else "list"
+    if os.environ.get("FAKE_GH_FAIL") in (kind, "all"):
+        _fail(f"fake gh: simulated {kind} failure")
+    try:
+        with open(os.environ["FAKE_GH_STORE"], encoding="utf-8") as f:
+            store = json.load(f)
+    except (KeyError, OSError, ValueError) as e:
+        _fail(f"fake gh: no fixture store: {e}")
+
+    if kind == "graphql":
+        print(json.dumps(_graphql(store, _fields(argv))))
+    elif len(argv) >= 2 and argv[0] in ("issue", "pr") and argv[1] == "list":
+        print(json.dumps(_list(store, "prs" if argv[0] == "pr" else "issues", argv)))
+    else:
+        _fail(f"fake gh: unsupported command: {' '.join(argv)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the local MLX model server (OpenAI-style
+/v1/chat/completions), for the script-guards model-backed checks.
+
+Verdicts are deterministic: a prompt naming a path under a directory
+called "scratch" is answered "deny Throwaway script in a scratch
+location", anything else "allow Looks like a committed artifact".
+
+Usage:
+  fake_model_server.py PORT_FILE
+
+Listens on 127.0.0.1 on a free port, writes the port to PORT_FILE once
+ready, and serves until killed.
+
+Environment:
+  FAKE_MODEL_LATENCY  seconds to sleep before answering (default 0)
+  FAKE_MODEL_LOG      append one line per request (the prompt's path)
+  FAKE_MODEL_CONN_LOG append one line per accepted connection, to check
+                      that clients keep connections alive
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_PATH_RE = re.compile(r"created at: (\S+)")
+
+
+def answer(prompt: str) -> str:
+    match = _PATH_RE.search(prompt)
+    path = match.group(1) if match else ""
+    if "/scratch/" in path:
+        return "deny Throwaway script in a scratch location"
+    return "allow Looks like a committed artifact"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        log = os.environ.get("FAKE_MODEL_CONN_LOG")
+        if log:
+            with open(log, "a", encoding="utf-8") as f:
+                f.write("connection\n")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length))
+            prompt = request["messages"][-1]["content"]
+        except (ValueError, LookupError, TypeError):
+            self.send_error(400)
+            return
+        log = os.environ.get("FAKE_MODEL_LOG")
+        if log:
+            match = _PATH_RE.search(prompt)
+            with open(log, "a", encoding="utf-8") as f:
+                f.write((match.group(1) if match else "?") + "\n")
+        time.sleep(float(os.environ.get("FAKE_MODEL_LATENCY") or 0))
+        body = json.dumps({
+            "choices": [{"message": {"role": "assistant", "content": answer(prompt)}}]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def main() -> None:
+    if len(sys.argv) != 2:
+        print("usage: fake_model_server.py PORT_FILE", file=sys.stderr)
+        sys.exit(2)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    tmp = sys.argv[1] + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(str(server.server_address[1]))
+    os.replace(tmp, sys.argv[1])
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# Shared BATS helpers for tests that need an offline `gh`.
+# Usage: load '../../helpers/gh'
+#
+# fake_gh.py answers the list and GraphQL calls the limit guards make from a
+# fixture store generated by gh_fixtures.py; see both files for options.
+
+GH_HELPERS_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+# Put a fake gh backed by the given fixture store first in PATH.
+# Usage: install_fake_gh <bin_dir> <store>
+install_fake_gh() {
+  ln -sf "$GH_HELPERS_DIR/fake_gh.py" "$1/gh"
+  export PATH="$1:$PATH"
+  export FAKE_GH_STORE="$2"
+}
+
+# Generate a fixture store (arguments as for gh_fixtures.py).
+# Usage: make_gh_fixture <store> [--issues N] [--closed N] ...
+make_gh_fixture() {
+  python3 "$GH_HELPERS_DIR/gh_fixtures.py" "$@"
+}
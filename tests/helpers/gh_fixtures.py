@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Generate fixture stores for fake_gh.py.
+
+Usage:
+  gh_fixtures.py STORE [--issues N] [--prs N] [--closed N] [--ai N]
+                       [--mine-recent N] [--title NUMBER=TITLE ...] [--seed S]
+
+  --issues N       open issues (default 10)
+  --prs N          open pull requests (default 0)
+  --closed N       closed issues, on top of the open ones (default 0)
+  --ai N           open issues labeled ai-created (default 0)
+  --mine-recent N  issues and PRs each created by the viewer in the last
+                   hour (default 0); older items belong to other authors
+  --title N=TITLE  give item number N this title (repeatable)
+  --seed S         random seed for titles and timestamps (default 0)
+
+Generated titles are random word sequences, so unrelated items are not
+near-duplicates of each other.
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta, timezone
+
+WORDS = (
+    "cache index parser hook token limit branch readme lint guard config "
+    "schema worker socket ledger budget fixture scanner policy outline "
+    "marketplace plugin release workflow matrix snapshot search label"
+).split()
+
+
+def _stamp(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def build(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    titles = dict(t.split("=", 1) for t in args.title)
+
+    def item(number: int, state: str, labels: list[str], mine: bool) -> dict:
+        created = now - (timedelta(minutes=rng.randint(1, 59)) if mine else timedelta(days=rng.randint(2, 900)))
+        updated = created + (now - created) * rng.random()
+        return {
+            "number": number,
+            "title": titles.get(str(number)) or " ".join(rng.sample(WORDS, 5)) + f" {number}",
+            "state": state,
+            "labels": labels,
+            "author": "me" if mine else f"user{rng.randint(1, 50)}",
+            "createdAt": _stamp(created),
+            "updatedAt": _stamp(updated),
+        }
+
+    issues, prs = [], []
+    number = 0
+    for i in range(args.issues + args.closed):
+        number += 1
+        is_open = i < args.issues
+        issues.append(item(
+            number,
+            "OPEN" if is_open else "CLOSED",
+            ["ai-created"] if is_open and i < args.ai else [],
+            mine=is_open and i >= args.issues - args.mine_recent,
+        ))
+    for i in range(args.prs):
+        number += 1
+        prs.append(item(number, "OPEN", [], mine=i >= args.prs - args.mine_recent))
+    return {"viewer": "me", "issues": issues, "prs": prs}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a fake_gh.py fixture store.")
+    parser.add_argument("store")
+    parser.add_argument("--issues", type=int, default=10)
+    parser.add_argument("--prs", type=int, default=0)
+    parser.add_argument("--closed", type=int, default=0)
+    parser.add_argument("--ai", type=int, default=0)
+    parser.add_argument("--mine-recent", type=int, default=0)
+    parser.add_argument("--title", action="append", default=[])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    with open(args.store, "w", encoding="utf-8") as f:
+        json.dump(build(args), f)
+
+
+if __name__ == "__main__":
+    main()
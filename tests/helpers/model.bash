@@ -0,0 +1,44 @@
+# Shared BATS helpers for tests of model-backed guards.
+# Usage: load '../../helpers/model'
+#
+# fake_model_server.py answers chat-completion requests deterministically;
+# see it for the verdict rules and options. Guards reach it through the
+# model gateway (script-guards/scripts/model-gateway-server.py), one per
+# cache directory; stop_model_gateway ends the test's gateway.
+
+MODEL_HELPERS_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+# Start the fake model server and point the guards at it. Options such as
+# FAKE_MODEL_LATENCY are read from the environment at start.
+# Usage: start_fake_model <work_dir>
+start_fake_model() {
+  local port_file="$1/model.port" i
+  rm -f "$port_file"
+  python3 "$MODEL_HELPERS_DIR/fake_model_server.py" "$port_file" >/dev/null 2>&1 3>&- &
+  FAKE_MODEL_PID=$!
+  for i in $(seq 50); do
+    [[ -s "$port_file" ]] && break
+    sleep 0.1
+  done
+  export SCRIPT_GUARDS_MODEL_URL="http://127.0.0.1:$(cat "$port_file")/v1/chat/completions"
+}
+
+stop_fake_model() {
+  if [[ -n "${FAKE_MODEL_PID:-}" ]]; then
+    kill "$FAKE_MODEL_PID" 2>/dev/null || true
+    wait "$FAKE_MODEL_PID" 2>/dev/null || true
+  fi
+}
+
+stop_model_gateway() {
+  python3 "$MODEL_HELPERS_DIR/../../script-guards/scripts/model_gateway.py" stop >/dev/null 2>&1 || true
+}
+
+# Restart the fake model server (and the gateway pointing at it), e.g. to
+# apply new FAKE_MODEL_* options.
+# Usage: restart_fake_model <work_dir>
+restart_fake_model() {
+  stop_model_gateway
+  stop_fake_model
+  start_fake_model "$1"
+}
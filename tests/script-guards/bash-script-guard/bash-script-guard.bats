@@ -0,0 +1,103 @@
+#!/usr/bin/env bats
+# Test suite for script-guards/scripts/bash-script-guard.sh and the shared
+# hook-input helper (hook-input.sh)
+#
+# Tests redirect, heredoc and chmod +x detection, and that a command none
+# of the checks apply to costs a single child process (the one jq run that
+# extracts the hook input) in each shell guard.
+#
+# Run with: bats tests/script-guards/bash-script-guard/bash-script-guard.bats
+
+load '../../helpers/child-log'
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  SCRIPTS="$REPO_ROOT/script-guards/scripts"
+  SCRIPT="$SCRIPTS/bash-script-guard.sh"
+  WORK_DIR="$(mktemp -d)"
+  export SCRIPT_GUARDS_CACHE_DIR="$WORK_DIR/cache"
+}
+
+teardown() {
+  rm -rf "$WORK_DIR"
+}
+
+bash_cmd() {
+  jq -n --arg c "$1" '{tool_name: "Bash", tool_input: {command: $c}}' | bash "$SCRIPT"
+}
+
+children() {
+  wc -l < "$WORK_DIR/children.log" | tr -d ' '
+}
+
+@test "TC1: redirects to script files are blocked" {
+  run bash_cmd 'echo "echo hi" > run.sh'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "not Bash redirects" ]]
+  run bash_cmd 'printf "%s\n" x >> /tmp/tool.py'
+  [ "$status" -eq 2 ]
+  run bash_cmd 'cat notes.txt > out.rb'
+  [ "$status" -eq 2 ]
+}
+
+@test "TC2: heredocs into script files are blocked" {
+  run bash_cmd $'tee run.sh <<EOF\necho hi\nEOF'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "not heredocs" ]]
+}
+
+@test "TC3: chmod +x on a missing file is blocked, on an existing file allowed" {
+  run bash_cmd "chmod +x $WORK_DIR/new.sh"
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "scripts/ directory" ]]
+  touch "$WORK_DIR/existing.sh"
+  run bash_cmd "chmod +x $WORK_DIR/existing.sh && $WORK_DIR/existing.sh"
+  [ "$status" -eq 0 ]
+}
+
+@test "TC4: ordinary commands are allowed" {
+  run bash_cmd 'git status'
+  [ "$status" -eq 0 ]
+  run bash_cmd 'echo hi > notes.txt'
+  [ "$status" -eq 0 ]
+  run bash_cmd 'concat > x.sh'
+  [ "$status" -eq 0 ]
+  run bash_cmd 'echo hi | grep h > out.shell'
+  [ "$status" -eq 0 ]
+  run bash_cmd $'echo hi\n> run.sh'
+  [ "$status" -eq 0 ]
+}
+
+@test "TC5: invalid or empty input fails open" {
+  run bash -c 'echo "not json" | bash "$1"' _ "$SCRIPT"
+  [ "$status" -eq 0 ]
+  run bash -c 'echo "{}" | bash "$1"' _ "$SCRIPT"
+  [ "$status" -eq 0 ]
+}
+
+@test "TC6: hook_input_read extracts multi-line fields in order" {
+  run bash -c 'source "$1/hook-input.sh"; hook_input_read a=.x b=.y c=.z || exit 9; printf "[%s][%s][%s]" "$a" "$b" "$c"' \
+    _ "$SCRIPTS" <<< '{"x": "one\ntwo", "y": null, "z": false}'
+  [ "$status" -eq 0 ]
+  [[ "$output" == *"[one"$'\n'"two][][]" ]]
+}
+
+@test "TC7: a call no check applies to costs one child process per guard" {
+  local input log="$WORK_DIR/children.log" bin="$WORK_DIR/bin"
+  log_children "$bin" "$log" jq cat grep sed head tr dirname python3 awk
+
+  input='{"tool_name": "Bash", "tool_input": {"command": "git status && ls -la | wc -l"}}'
+  PATH="$bin:$PATH" bash "$SCRIPT" <<< "$input"
+  [ "$(children)" -eq 1 ]
+
+  : > "$log"
+  input='{"tool_name": "Edit", "tool_input": {"file_path": "/x/README.md", "old_string": "a", "new_string": "b"}}'
+  PATH="$bin:$PATH" bash "$SCRIPTS/inline-script-guard.sh" <<< "$input"
+  [ "$(children)" -eq 1 ]
+
+  : > "$log"
+  input='{"tool_name": "Write", "tool_input": {"file_path": "/x/notes.md", "content": "# Notes"}}'
+  PATH="$bin:$PATH" bash "$SCRIPTS/write-script-guard.sh" <<< "$input"
+  [ "$(children)" -eq 1 ]
+  [ "$(cat "$log")" = "jq" ]
+}
@@ -0,0 +1,155 @@
+#!/usr/bin/env bats
+# Test suite for script-guards/scripts/inline-script-guard.sh
+#
+# Tests that edits are judged on the post-edit file: Nix strings and
+# workflow run: blocks are found structurally, blocks that only cross the
+# limit because of the edit are caught, untouched blocks and Nix's own
+# if/then/else are ignored, and fragments are judged when the file cannot
+# be reconstructed.
+#
+# Run with: bats tests/script-guards/inline-script-guard/inline-script-guard.bats
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  SCRIPT="$REPO_ROOT/script-guards/scripts/inline-script-guard.sh"
+  WORK_DIR="$(mktemp -d)"
+  export SCRIPT_GUARDS_CACHE_DIR="$WORK_DIR/cache"
+}
+
+teardown() {
+  rm -rf "$WORK_DIR"
+}
+
+# Usage: edit <file> <old_string> <new_string> [replace_all]
+edit() {
+  jq -n --arg fp "$1" --arg old "$2" --arg new "$3" --argjson all "${4:-false}" \
+    '{tool_name: "Edit", tool_input: {file_path: $fp, old_string: $old, new_string: $new, replace_all: $all}}' \
+    | bash "$SCRIPT"
+}
+
+workflow() {
+  cat > "$WORK_DIR/ci.yml" <<'YAML'
+jobs:
+  build:
+    steps:
+      - name: Build
+        run: |
+          make deps
+          make build
+          make test
+      - name: Lint
+        run: make lint
+YAML
+}
+
+@test "TC1: non-Nix/YAML files and empty edits are allowed" {
+  run edit "$WORK_DIR/a.sh" "x" "if a; then b; fi && c || d"
+  [ "$status" -eq 0 ]
+  run edit "$WORK_DIR/ci.yml" "x" ""
+  [ "$status" -eq 0 ]
+}
+
+@test "TC2: a run block that crosses the limit only after the edit is blocked" {
+  workflow
+  # The edit adds two lines; the block grows from 3 to 6 lines
+  run edit "$WORK_DIR/ci.yml" "          make test" $'          make test\n          make package\n          make sign\n          make upload'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "Complex inline bash in workflow YAML $WORK_DIR/ci.yml (line 5: 6-line run block)" ]]
+}
+
+@test "TC3: small run blocks and single-line run: steps are allowed" {
+  workflow
+  run edit "$WORK_DIR/ci.yml" "make lint" "make lint-all"
+  [ "$status" -eq 0 ]
+  run edit "$WORK_DIR/ci.yml" "make build" "make build-all"
+  [ "$status" -eq 0 ]
+}
+
+@test "TC4: an edit outside an existing oversized run block is allowed" {
+  cat > "$WORK_DIR/ci.yml" <<'YAML'
+jobs:
+  build:
+    steps:
+      - run: |
+          echo 1
+          echo 2
+          echo 3
+          echo 4
+          echo 5
+          echo 6
+      - name: Old
+        run: make lint
+YAML
+  run edit "$WORK_DIR/ci.yml" "name: Old" "name: New"
+  [ "$status" -eq 0 ]
+  run edit "$WORK_DIR/ci.yml" "echo 6" "echo six"
+  [ "$status" -eq 2 ]
+}
+
+@test "TC5: shell control flow in a Nix '' string is blocked" {
+  cat > "$WORK_DIR/module.nix" <<'NIX'
+{ pkgs, ... }:
+{
+  script = ''
+    echo start
+  '';
+}
+NIX
+  run edit "$WORK_DIR/module.nix" "    echo start" $'    if [ -f x ]; then\n      rm x\n    fi\n    test -d y && rm -r y\n    for f in *; do echo "$f"; done'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "Inline script detected in Nix file $WORK_DIR/module.nix (line 3: 4 lines of shell control flow)" ]]
+}
+
+@test "TC6: Nix's own if/then/else and comments are not shell" {
+  cat > "$WORK_DIR/module.nix" <<'NIX'
+{ lib, cfg, ... }:
+{
+  x = 1;
+}
+NIX
+  run edit "$WORK_DIR/module.nix" "  x = 1;" $'  # if then else fi for done\n  x = if cfg.a then 1 else 2;\n  y = if cfg.b then "a && b" else "c || d";\n  z = lib.optional (cfg.c || cfg.d) "e";\n  w = if cfg.e then 3 else 4;'
+  [ "$status" -eq 0 ]
+}
+
+@test "TC7: Nix escapes and antiquotes do not end the string early" {
+  cat > "$WORK_DIR/module.nix" <<'NIX'
+{
+  script = ''
+    echo ''${HOME} ${pkgs.hello}/bin/hello '''quoted'''
+    echo done
+  '';
+  other = "x";
+}
+NIX
+  run edit "$WORK_DIR/module.nix" "    echo done" $'    if a; then\n      b\n    fi\n    c && d\n    e || f'
+  [ "$status" -eq 2 ]
+  run edit "$WORK_DIR/module.nix" '"x"' '"if then fi && || do done"'
+  [ "$status" -eq 0 ]
+}
+
+@test "TC8: without the file, the new_string fragment is judged" {
+  run edit "$WORK_DIR/missing.nix" "x" $'if a; then\n  b\nfi\nc && d\ne || f'
+  [ "$status" -eq 2 ]
+  run edit "$WORK_DIR/missing.yml" "x" $'- run: |\n    a\n    b\n    c\n    d\n    e\n    f'
+  [ "$status" -eq 2 ]
+  run edit "$WORK_DIR/missing.yml" "x" $'- run: |\n    a\n    b'
+  [ "$status" -eq 0 ]
+}
+
+@test "TC9: shell control flow in a Nix double-quoted string is blocked" {
+  cat > "$WORK_DIR/module.nix" <<'NIX'
+{
+  a = 1;
+}
+NIX
+  # Real line breaks inside the string
+  run edit "$WORK_DIR/module.nix" "  a = 1;" $'  b = "if [ -f a ]; then\n    echo && b || c\n    for x in y; do\n    done; fi";'
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "(line 2: 4 lines of shell control flow)" ]]
+  # \n escapes count as line breaks
+  run edit "$WORK_DIR/module.nix" "  a = 1;" '  b = "if [ -f a ]; then\n echo && b || c\n for x in y; do\n done; fi";'
+  [ "$status" -eq 2 ]
+  # Short strings are fine, escaped quotes do not end them early
+  run edit "$WORK_DIR/module.nix" "  a = 1;" $'  b = "say \\"if\\" && done";\n  c = "x\\ny";'
+  [ "$status" -eq 0 ]
+}
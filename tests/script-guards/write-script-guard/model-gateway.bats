@@ -0,0 +1,136 @@
+#!/usr/bin/env bats
+# Test suite for script-guards/scripts/model-gateway-server.py and its client
+# (model_gateway.py)
+#
+# Tests that guards reach the model through one resident gateway, which
+# keeps its HTTP connections alive, batches concurrent requests (identical
+# ones share a model call), enforces latency budgets and fails open.
+#
+# The model is the offline stand-in in tests/helpers/fake_model_server.py;
+# $FAKE_MODEL_CONN_LOG gets one line per HTTP connection it accepts.
+#
+# Run with: bats tests/script-guards/write-script-guard/model-gateway.bats
+
+load '../../helpers/model'
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  SCRIPTS="$REPO_ROOT/script-guards/scripts"
+  SCRIPT="$SCRIPTS/write-script-guard.sh"
+  WORK_DIR="$(mktemp -d)"
+  export SCRIPT_GUARDS_CACHE_DIR="$WORK_DIR/cache"
+  export FAKE_MODEL_LOG="$WORK_DIR/model.log"
+  export FAKE_MODEL_CONN_LOG="$WORK_DIR/conn.log"
+  touch "$FAKE_MODEL_LOG" "$FAKE_MODEL_CONN_LOG"
+  start_fake_model "$WORK_DIR"
+}
+
+teardown() {
+  stop_model_gateway
+  stop_fake_model
+  rm -rf "$WORK_DIR"
+}
+
+write_file() {
+  jq -n --arg fp "$1" '{tool_name: "Write", tool_input: {file_path: $fp, content: "echo hi"}}' \
+    | bash "$SCRIPT"
+}
+
+stat_of() {
+  python3 "$SCRIPTS/model_gateway.py" stats | jq ".$1"
+}
+
+# Send N chat requests at once from one process.
+# Usage: concurrent_chats <n> <distinct|same> <budget>
+concurrent_chats() {
+  python3 - "$SCRIPTS" "$@" <<'PYEOF'
+import sys, threading
+sys.path.insert(0, sys.argv[1])
+import model_gateway
+from model_verdict import cache_dir, model_url
+n, mode, budget = int(sys.argv[2]), sys.argv[3], float(sys.argv[4])
+results = [None] * n
+def ask(i):
+    path = f"/work/scratch/run{i if mode == 'distinct' else 0}.sh"
+    body = {"messages": [{"role": "user", "content": f"A file is being created at: {path}"}]}
+    results[i] = model_gateway.chat(cache_dir(), model_url(), body, budget)
+threads = [threading.Thread(target=ask, args=(i,)) for i in range(n)]
+for t in threads: t.start()
+for t in threads: t.join()
+print(sum(1 for r in results if r and "content" in r))
+PYEOF
+}
+
+@test "TC1: guards share one gateway and one kept-alive connection" {
+  run write_file "$WORK_DIR/scratch/run.sh"
+  [ "$status" -eq 2 ]
+  run write_file "$WORK_DIR/a/run.sh"
+  [ "$status" -eq 0 ]
+  run write_file "$WORK_DIR/b/run.py"
+  [ "$status" -eq 0 ]
+  [ "$(wc -l < "$FAKE_MODEL_LOG")" -eq 3 ]
+  [ "$(wc -l < "$FAKE_MODEL_CONN_LOG")" -eq 1 ]
+  [ "$(stat_of requests)" -eq 3 ]
+}
+
+@test "TC2: concurrent identical requests in a batch share one model call" {
+  [ "$(concurrent_chats 8 same 5 2>/dev/null)" = "8" ]
+  [ "$(wc -l < "$FAKE_MODEL_LOG")" -eq 1 ]
+}
+
+@test "TC3: concurrent distinct requests are batched and run in parallel" {
+  export FAKE_MODEL_LATENCY=1
+  restart_fake_model "$WORK_DIR"
+  local start elapsed answered
+  start=$(date +%s)
+  answered=$(concurrent_chats 4 distinct 5 2>/dev/null)
+  elapsed=$(( $(date +%s) - start ))
+  [ "$answered" = "4" ]
+  [ "$(wc -l < "$FAKE_MODEL_LOG")" -eq 4 ]
+  [ "$elapsed" -lt 4 ]
+  [ "$(stat_of batches)" -lt 4 ]
+}
+
+@test "TC4: a request over its latency budget fails open" {
+  export FAKE_MODEL_LATENCY=3
+  restart_fake_model "$WORK_DIR"
+  local start elapsed answered
+  start=$(date +%s)
+  answered=$(concurrent_chats 1 same 0.5 2>/dev/null)
+  elapsed=$(( $(date +%s) - start ))
+  [ "$answered" = "0" ]
+  [ "$elapsed" -lt 3 ]
+}
+
+@test "TC5: the guard fails open when the model server is down" {
+  stop_fake_model
+  run write_file "$WORK_DIR/scratch/run.sh"
+  [ "$status" -eq 0 ]
+}
+
+@test "TC6: SCRIPT_GUARDS_MODEL_GATEWAY=0 calls the model directly" {
+  export SCRIPT_GUARDS_MODEL_GATEWAY=0
+  run write_file "$WORK_DIR/scratch/run.sh"
+  [ "$status" -eq 2 ]
+  run python3 "$SCRIPTS/model_gateway.py" stats
+  [ "$status" -eq 1 ]
+}
+
+@test "TC7: a stopped gateway is restarted by the next request" {
+  run write_file "$WORK_DIR/a/run.sh"
+  python3 "$SCRIPTS/model_gateway.py" stop
+  run write_file "$WORK_DIR/scratch/run.sh"
+  [ "$status" -eq 2 ]
+  [ "$(stat_of requests)" -eq 1 ]
+}
+
+@test "TC8: a socket directory that is not private is not used" {
+  export TMPDIR="$WORK_DIR/tmp"
+  mkdir -p "$TMPDIR/script-guards-$(id -u)"
+  chmod 755 "$TMPDIR/script-guards-$(id -u)"
+  run write_file "$WORK_DIR/scratch/run.sh"
+  [ "$status" -eq 2 ] # Verdict from the model server, called directly
+  [ -z "$(ls "$TMPDIR/script-guards-$(id -u)")" ]
+  run python3 "$SCRIPTS/model_gateway.py" stats
+  [ "$status" -eq 1 ]
+}
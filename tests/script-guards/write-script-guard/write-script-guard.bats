@@ -0,0 +1,118 @@
+#!/usr/bin/env bats
+# Test suite for script-guards/scripts/write-script-guard.sh
+#
+# Tests the fast allow paths, the model-backed verdict for new scripts,
+# verdict caching by directory and script type, and coalescing of
+# concurrent identical requests.
+#
+# The model is the offline stand-in in tests/helpers/fake_model_server.py:
+# paths under a "scratch" directory are denied, others allowed, and each
+# request appends its path to $FAKE_MODEL_LOG.
+#
+# Run with: bats tests/script-guards/write-script-guard/write-script-guard.bats
+
+load '../../helpers/model'
+
+setup() {
+  REPO_ROOT="$(cd "$(dirname "$BATS_TEST_FILENAME")/../../.." && pwd)"
+  SCRIPT="$REPO_ROOT/script-guards/scripts/write-script-guard.sh"
+  WORK_DIR="$(mktemp -d)"
+  export SCRIPT_GUARDS_CACHE_DIR="$WORK_DIR/cache"
+  export FAKE_MODEL_LOG="$WORK_DIR/model.log"
+  touch "$FAKE_MODEL_LOG"
+  start_fake_model "$WORK_DIR"
+}
+
+teardown() {
+  stop_model_gateway
+  stop_fake_model
+  rm -rf "$WORK_DIR"
+}
+
+# Usage: write_file <path> [content]
+write_file() {
+  jq -n --arg fp "$1" --arg c "${2:-echo hi}" '{tool_name: "Write", tool_input: {file_path: $fp, content: $c}}' \
+    | bash "$SCRIPT"
+}
+
+model_calls() {
+  wc -l < "$FAKE_MODEL_LOG" | tr -d ' '
+}
+
+@test "TC1: non-script files and known script directories skip the model" {
+  run write_file "$WORK_DIR/scratch/notes.md" "# Notes"
+  [ "$status" -eq 0 ]
+  run write_file "$WORK_DIR/scratch/scripts/run.sh"
+  [ "$status" -eq 0 ]
+  [ "$(model_calls)" -eq 0 ]
+}
+
+@test "TC2: the model's deny blocks a new script" {
+  run write_file "$WORK_DIR/scratch/run.sh"
+  [ "$status" -eq 2 ]
+  [[ "$output" =~ "Throwaway script in a scratch location" ]]
+  run write_file "$WORK_DIR/project/build.sh"
+  [ "$status" -eq 0 ]
+  [ "$(model_calls)" -eq 2 ]
+}
+
+@test "TC3: scripts of the same type in the same directory reuse the verdict" {
+  run write_file "$WORK_DIR/scratch/one.sh"
+  [ "$status" -eq 2 ]
+  run write_file "$WORK_DIR/scratch/two.bash"
+  [ "$status" -eq 2 ]
+  [ "$(model_calls)" -eq 1 ]
+
+  # Another script type or directory is a new question
+  run write_file "$WORK_DIR/scratch/three.py"
+  [ "$status" -eq 2 ]
+  run write_file "$WORK_DIR/other/four.sh"
+  [ "$status" -eq 0 ]
+  [ "$(model_calls)" -eq 3 ]
+}
+
+@test "TC4: verdicts expire after the TTL, and TTL 0 disables the cache" {
+  run write_file "$WORK_DIR/scratch/one.sh"
+  SCRIPT_GUARDS_VERDICT_TTL=0 run write_file "$WORK_DIR/scratch/two.sh"
+  [ "$status" -eq 2 ]
+  [ "$(model_calls)" -eq 2 ]
+
+  jq 'map_values(.expires = 0)' "$SCRIPT_GUARDS_CACHE_DIR/verdicts.json" > "$WORK_DIR/v.json"
+  mv "$WORK_DIR/v.json" "$SCRIPT_GUARDS_CACHE_DIR/verdicts.json"
+  run write_file "$WORK_DIR/scratch/three.sh"
+  [ "$(model_calls)" -eq 3 ]
+}
+
+@test "TC5: concurrent identical requests share one model call" {
+  export FAKE_MODEL_LATENCY=1
+  restart_fake_model "$WORK_DIR"
+  local i pids=()
+  for i in 1 2 3 4 5 6; do
+    write_file "$WORK_DIR/scratch/run$i.sh" > /dev/null 2>&1 &
+    pids+=($!)
+  done
+  for i in "${pids[@]}"; do wait "$i" || true; done
+  [ "$(model_calls)" -eq 1 ]
+}
+
+@test "TC6: an unreachable model fails open and is not retried at once" {
+  stop_fake_model
+  run write_file "$WORK_DIR/scratch/one.sh"
+  [ "$status" -eq 0 ]
+  [ "$(jq -c '[.[].verdict]' "$SCRIPT_GUARDS_CACHE_DIR/verdicts.json")" = '[[]]' ]
+}
+
+@test "TC7: the cache keeps at most MAX_ENTRIES patterns, evicting the least recently used" {
+  python3 - "$REPO_ROOT/script-guards/scripts" <<'PYEOF'
+import sys, time
+sys.path.insert(0, sys.argv[1])
+from model_verdict import MAX_ENTRIES, VerdictCache, cache_dir
+cache = VerdictCache(cache_dir())
+now = time.time()
+for n in range(MAX_ENTRIES + 10):
+    cache.put(f"/d{n}/*.shell", ["allow", ""], now + 3600, now + n)
+entries = cache._load()
+assert len(entries) == MAX_ENTRIES, len(entries)
+assert "/d0/*.shell" not in entries and f"/d{MAX_ENTRIES + 9}/*.shell" in entries
+PYEOF
+}